@@ -0,0 +1,63 @@
+# Reading and writing the lifts table through NumPy-backed pandas vs Arrow.
+# Run from the repository root: python -m benchmarks.bench_arrow_results
+import argparse
+import tempfile
+import time
+
+import pyarrow as pa
+
+from benchmarks.generators import synthetic_lifts
+from modules.connection_pool import close_all_pools
+from modules.duckdb import DuckDBManager
+
+
+def result_bytes(result) -> int:
+    if isinstance(result, pa.Table):
+        return result.nbytes
+    return int(result.memory_usage(deep=True).sum())
+
+
+def timed(func, repeat: int):
+    result = func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        lifts_df = synthetic_lifts(n_rows)
+        lifts_table = pa.Table.from_pandas(lifts_df, preserve_index=False)
+
+        with tempfile.TemporaryDirectory() as db_dir:
+            db_manager = DuckDBManager(db_dir=db_dir, cache=False)
+            print(f"{n_rows:,} rows")
+            for label, data in [("pandas", lifts_df), ("arrow", lifts_table)]:
+                seconds, _ = timed(
+                    lambda: db_manager.setup_table("historic_exercises", data),
+                    args.repeat,
+                )
+                print(f"  write {label:<13} {seconds * 1000:8.1f}ms")
+
+            for format in ["pandas", "pandas_arrow", "arrow"]:
+                seconds, result = timed(
+                    lambda: db_manager.get_data(
+                        table_name="historic_exercises", format=format
+                    ),
+                    args.repeat,
+                )
+                print(
+                    f"  read  {format:<13} {seconds * 1000:8.1f}ms, "
+                    f"{result_bytes(result) / 1024**2:6.1f} MiB"
+                )
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
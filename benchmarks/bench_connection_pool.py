@@ -0,0 +1,62 @@
+# Queries per second with a fresh connection per query vs the shared pool.
+# Run from the repository root: python -m benchmarks.bench_connection_pool
+import argparse
+import tempfile
+import threading
+import time
+
+import duckdb as duckdb
+
+from benchmarks.generators import synthetic_lifts
+from modules.connection_pool import close_all_pools
+from modules.duckdb import DuckDBManager
+
+QUERY = "SELECT * FROM historic_exercises WHERE Exercise = 'SQUAT' LIMIT 50"
+
+
+def run_threads(target, n_threads: int, n_queries: int) -> float:
+    """Run ``target`` n_queries times in each of n_threads threads, return QPS."""
+
+    def worker():
+        for _ in range(n_queries):
+            target()
+
+    threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return n_threads * n_queries / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        manager = DuckDBManager(db_dir=db_dir, pool_size=args.threads)
+        manager.setup_table("historic_exercises", synthetic_lifts(args.rows))
+        manager.close()
+
+        def fresh_connection():
+            # the old DuckDBManager connected and closed on every call
+            with duckdb.connect(manager.db_path) as con:
+                con.execute(QUERY).fetchdf()
+
+        def pooled():
+            manager.get_data(query=QUERY)
+
+        before = run_threads(fresh_connection, args.threads, args.queries)
+        after = run_threads(pooled, args.threads, args.queries)
+        close_all_pools()
+
+    print(f"fresh connection per query: {before:,.0f} qps")
+    print(f"pooled cursors:             {after:,.0f} qps ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Row-by-row concat / list building vs the columnar frame builders.
+# Run from the repository root: python -m benchmarks.bench_fitbit_frames
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.generators import (
+    synthetic_activities_response,
+    synthetic_fitbit_days,
+    synthetic_sleep_response,
+)
+
+sys.path.insert(0, "fitbit")
+from frames import build_activity_frame, build_sleep_agg_frame  # noqa: E402
+
+SLEEP_AGG_COLUMNS = [
+    "dateOfSleep",
+    "isMainSleep",
+    "efficiency",
+    "duration",
+    "minutesAsleep",
+    "minutesAwake",
+    "awakeCount",
+    "restlessCount",
+    "restlessDuration",
+    "timeInBed",
+]
+
+
+def concat_sleep_agg(responses):
+    # the original get_x_days_sleep_agg loop
+    agg_df = pd.DataFrame(columns=SLEEP_AGG_COLUMNS)
+    for response in responses:
+        sleep_func = response["sleep"][0]
+        agg_df_temp = pd.DataFrame(
+            {column: sleep_func[column] for column in SLEEP_AGG_COLUMNS}, index=[0]
+        )
+        agg_df = pd.concat([agg_df, agg_df_temp], join="inner")
+    return agg_df
+
+
+def list_side_effect_activity(responses):
+    # the original get_x_days_activity loop
+    id_list, name_list, calories_list, steps_list, date_list = [], [], [], [], []
+    for response in responses:
+        activities = response["activities"]
+        [id_list.append(x) for x in [action["activityId"] for action in activities]]
+        [name_list.append(x) for x in [action["name"] for action in activities]]
+        [calories_list.append(x) for x in [action["calories"] for action in activities]]
+        [steps_list.append(x) for x in [action["steps"] for action in activities]]
+        [date_list.append(x) for x in [action["startDate"] for action in activities]]
+    df = pd.DataFrame(
+        {
+            "id": id_list,
+            "Name": name_list,
+            "Start_Date": date_list,
+            "Calories": calories_list,
+            "Steps": steps_list,
+        }
+    )
+    df["id"] = df["id"].astype(int)
+    df["Name"] = df["Name"].astype(str)
+    df["Start_Date"] = pd.to_datetime(df["Start_Date"], format="%Y-%m-%d")
+    df["Steps"] = df["Steps"].astype(int)
+    df["Calories"] = df["Calories"].astype(int)
+    return df
+
+
+def timed(func, responses) -> float:
+    start = time.perf_counter()
+    func(responses)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, nargs="+", default=[365, 3650])
+    args = parser.parse_args()
+
+    for n_days in args.days:
+        days = synthetic_fitbit_days(n_days)
+        sleep = [synthetic_sleep_response(day, minutes=1) for day in days]
+        activities = [synthetic_activities_response(day) for day in days]
+
+        before = timed(concat_sleep_agg, sleep)
+        after = timed(build_sleep_agg_frame, sleep)
+        print(
+            f"{n_days:>5} days sleep agg: concat {before:.3f}s, "
+            f"columnar {after:.3f}s ({before / after:.0f}x)"
+        )
+
+        before = timed(list_side_effect_activity, activities)
+        after = timed(build_activity_frame, activities)
+        print(
+            f"{n_days:>5} days activity:  lists {before:.3f}s, "
+            f"columnar {after:.3f}s ({before / after:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
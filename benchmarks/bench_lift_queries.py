@@ -0,0 +1,67 @@
+# Chart datasets for performance tracking and PB comparison: loading the whole
+# lifts table and filtering in pandas vs pushing the query down to DuckDB.
+# Run from the repository root: python -m benchmarks.bench_lift_queries
+import argparse
+import tempfile
+import time
+
+from benchmarks.generators import synthetic_lifts
+from modules.connection_pool import close_all_pools
+from modules.duckdb import DuckDBManager
+
+PB_EXERCISES = ["BENCH PRESS", "SQUAT", "DEADLIFT"]
+
+
+def pandas_charts(db_manager: DuckDBManager) -> int:
+    # the original path: load_data, then filter and drop_duplicates per rerun
+    lifts_df = db_manager.get_data(table_name="historic_exercises")
+    history = lifts_df[lifts_df["Exercise"] == "SQUAT"]
+    pbs = (
+        lifts_df[lifts_df["Exercise"].isin(PB_EXERCISES)]
+        .sort_values(
+            by=["User", "Exercise", "Weight", "Day"],
+            ascending=[False, False, False, True],
+        )
+        .drop_duplicates(["User", "Exercise"])
+    )
+    return len(history) + len(pbs)
+
+
+def sql_charts(db_manager: DuckDBManager) -> int:
+    history = db_manager.get_exercise_history("SQUAT")
+    pbs = db_manager.get_personal_bests(PB_EXERCISES)
+    return len(history) + len(pbs)
+
+
+def timed(func, db_manager: DuckDBManager, repeat: int) -> float:
+    func(db_manager)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(db_manager)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as db_dir:
+            db_manager = DuckDBManager(db_dir=db_dir)
+            db_manager.setup_table("historic_exercises", synthetic_lifts(n_rows))
+
+            before = timed(pandas_charts, db_manager, args.repeat)
+            after = timed(sql_charts, db_manager, args.repeat)
+            print(
+                f"{n_rows:>10,} rows: pandas {before * 1000:8.1f}ms, "
+                f"sql {after * 1000:8.1f}ms ({before / after:.0f}x)"
+            )
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Rerun cost of load_data's two reads with and without the result cache.
+# Run from the repository root: python -m benchmarks.bench_query_cache
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.generators import EXERCISES, synthetic_lifts
+from modules.connection_pool import close_all_pools
+from modules.duckdb import DuckDBManager
+from modules.query_cache import get_query_cache
+
+
+def reruns(db_manager: DuckDBManager, n_reruns: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n_reruns):
+        db_manager.get_data(table_name="historic_exercises")
+        db_manager.get_data(table_name="exercises")
+    return (time.perf_counter() - start) / n_reruns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as db_dir:
+            db_manager = DuckDBManager(db_dir=db_dir)
+            db_manager.setup_table("historic_exercises", synthetic_lifts(n_rows))
+            db_manager.setup_table(
+                "exercises", pd.DataFrame({"Day": "MISC", "Exercise": EXERCISES})
+            )
+
+            before = reruns(DuckDBManager(db_dir=db_dir, cache=False), args.reruns)
+            after = reruns(db_manager, args.reruns)
+            print(
+                f"{n_rows:>10,} rows: uncached {before * 1000:8.1f}ms, "
+                f"cached {after * 1000:8.1f}ms per rerun ({before / after:.0f}x), "
+                f"hit rate {get_query_cache().stats()['hit_rate']:.0%}"
+            )
+            close_all_pools()
+            get_query_cache().clear()
+
+
+if __name__ == "__main__":
+    main()
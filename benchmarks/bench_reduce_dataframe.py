@@ -0,0 +1,66 @@
+# reduce_dataframe_size: the original sort and drop_duplicates vs the hash
+# groupby in pandas vs the same reduction in DuckDB (get_reduced_lifts).
+# Each run checks the hash and SQL results keep the same sets as the original.
+# At 5M rows hash is ~4.5x and SQL ~9x faster than the sort.
+# Run from the repository root: python -m benchmarks.bench_reduce_dataframe
+import argparse
+import tempfile
+import time
+
+from benchmarks.generators import synthetic_lifts
+from modules.connection_pool import close_all_pools
+from modules.dedup import REDUCE_KEYS
+from modules.duckdb import DuckDBManager
+from modules.util import reduce_dataframe_size
+
+COMPARED = REDUCE_KEYS + ["Day"]
+
+
+def timed(func, repeat: int):
+    result = func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def same_sets(left, right) -> bool:
+    def canonical(df):
+        return df[COMPARED].sort_values(COMPARED).reset_index(drop=True)
+
+    return canonical(left).equals(canonical(right))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 1_000_000, 5_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as db_dir:
+            db_manager = DuckDBManager(db_dir=db_dir, cache=False)
+            db_manager.setup_table("historic_exercises", synthetic_lifts(n_rows))
+            lifts_df = db_manager.get_data(table_name="historic_exercises")
+
+            expected, before = timed(
+                lambda: reduce_dataframe_size(lifts_df, method="sort"), args.repeat
+            )
+            hashed, pandas_hash = timed(
+                lambda: reduce_dataframe_size(lifts_df), args.repeat
+            )
+            reduced, sql = timed(db_manager.get_reduced_lifts, args.repeat)
+
+            assert same_sets(hashed, expected) and same_sets(reduced, expected)
+            print(
+                f"{n_rows:>10,} rows -> {len(expected):,}: sort {before * 1000:7.1f}ms, "
+                f"hash {pandas_hash * 1000:7.1f}ms ({before / pandas_hash:.1f}x), "
+                f"sql {sql * 1000:7.1f}ms ({before / sql:.1f}x)"
+            )
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# Per-cell applymap upper-casing vs normalise_sheet_data on synthetic sheets.
+# Run from the repository root: python -m benchmarks.bench_sheet_normalisation
+import argparse
+import time
+
+from benchmarks.generators import synthetic_sheet_lifts
+from modules.get_google_sheets_data import SHEET_NORMALISATION, normalise_sheet_data
+
+
+def per_cell_upper(df):
+    # the original get_google_sheet normalisation
+    return df.map(lambda s: s.upper() if type(s) == str else s)
+
+
+def timed(func, df) -> float:
+    start = time.perf_counter()
+    func(df)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        df = synthetic_sheet_lifts(n_rows)
+        before = timed(per_cell_upper, df)
+        after = timed(lambda d: normalise_sheet_data(d, categorical=[]), df)
+        with_categories = timed(
+            lambda d: normalise_sheet_data(d, **SHEET_NORMALISATION["Lifts"]), df
+        )
+        print(
+            f"{n_rows:>9,} rows: applymap {before:.2f}s, vectorised {after:.2f}s "
+            f"({before / after:.1f}x), with categories {with_categories:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
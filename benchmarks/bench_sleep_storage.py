@@ -0,0 +1,45 @@
+# Memory footprint of a year of minute-level sleep: the original string frame,
+# the compact typed frame and the run-length encoded runs.
+# Run from the repository root: python -m benchmarks.bench_sleep_storage
+import argparse
+import sys
+
+from benchmarks.generators import synthetic_fitbit_days, synthetic_sleep_response
+
+sys.path.insert(0, "fitbit")
+from frames import build_sleep_frame  # noqa: E402
+from sleep_storage import encode_sleep_runs, sleep_memory_report  # noqa: E402
+
+
+def legacy_sleep_frame(sleep_df):
+    # the original get_x_days_sleep stored every column as Python strings
+    return sleep_df.assign(
+        State=sleep_df["State"].astype(str),
+        Time=sleep_df["Time"].dt.strftime("%H:%M:%S"),
+        Date=sleep_df["Date"].dt.strftime("%Y-%m-%d"),
+        State_Detail=sleep_df["State_Detail"].astype(str),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    days = synthetic_fitbit_days(args.days)
+    sleep_df = build_sleep_frame([synthetic_sleep_response(day) for day in days])
+
+    report = sleep_memory_report(
+        {
+            "legacy": legacy_sleep_frame(sleep_df),
+            "compact": sleep_df,
+            "runs": encode_sleep_runs(sleep_df),
+        }
+    )
+    report["vs_legacy"] = report.loc["legacy", "bytes"] / report["bytes"]
+    print(f"{args.days} days of minute-level sleep")
+    print(report.to_string(float_format="{:.1f}".format))
+
+
+if __name__ == "__main__":
+    main()
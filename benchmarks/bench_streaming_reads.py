@@ -0,0 +1,85 @@
+# Peak RSS of aggregating the lifts table from one get_data call vs iter_batches,
+# as the table grows. Each measurement runs in a fresh interpreter. What
+# iter_batches still gains is mostly DuckDB's block cache and allocator slack,
+# not result rows.
+# Run from the repository root: python -m benchmarks.bench_streaming_reads
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.generators import create_synthetic_lifts_table
+
+
+def max_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(db_dir: str, mode: str, batch_size: int) -> None:
+    from modules.duckdb import DuckDBManager
+
+    db_manager = DuckDBManager(db_dir=db_dir, cache=False)
+    db_manager.execute_query("SET threads = 1")
+    # cap DuckDB's buffer pool so cached table pages don't hide the result memory
+    db_manager.execute_query("SET memory_limit = '16MB'")
+    baseline = max_rss_mib()
+
+    query = "SELECT * FROM historic_exercises"
+    if mode == "get_data":
+        df = db_manager.get_data(query=query)
+        volume = (df["Weight"] * df["Reps"]).sum()
+    else:
+        volume = 0.0
+        for chunk in db_manager.iter_batches(query, batch_size, format="pandas"):
+            volume += (chunk["Weight"] * chunk["Reps"]).sum()
+
+    print(f"{max_rss_mib() - baseline:.1f} {volume:.0f}")
+
+
+def measure(db_dir: str, mode: str, batch_size: int) -> float:
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_streaming_reads",
+            "--child",
+            db_dir,
+            mode,
+            str(batch_size),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    return float(output[0])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000]
+    )
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--child", nargs=3, metavar=("DB_DIR", "MODE", "BATCH_SIZE"))
+    args = parser.parse_args()
+
+    if args.child:
+        db_dir, mode, batch_size = args.child
+        child(db_dir, mode, int(batch_size))
+        return
+
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as db_dir:
+            create_synthetic_lifts_table(f"{db_dir}/fit.db", n_rows)
+            full = measure(db_dir, "get_data", args.batch_size)
+            streamed = measure(db_dir, "iter_batches", args.batch_size)
+            print(
+                f"{n_rows:>10,} rows: peak RSS growth get_data {full:7.1f} MiB, "
+                f"iter_batches {streamed:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
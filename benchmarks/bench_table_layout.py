@@ -0,0 +1,80 @@
+# Filtered query latency on historic_exercises as appended (unsorted), after
+# compact_table sorts it by (User, Exercise, Day), and with the lookup index
+# created on top. Queries run with the result cache off. At 10M rows sorting
+# cuts the filtered queries 5-14x; the index adds little over sorted zone maps.
+# Run from the repository root: python -m benchmarks.bench_table_layout
+import argparse
+import tempfile
+import time
+
+from benchmarks.generators import create_synthetic_lifts_table
+from modules.connection_pool import close_all_pools
+from modules.duckdb import DuckDBManager
+
+QUERIES = {
+    "exercise history": (
+        "SELECT Day, Weight, Reps FROM historic_exercises "
+        "WHERE User = ? AND Exercise = ? ORDER BY Day",
+        ["JM", "SQUAT"],
+    ),
+    "one day": (
+        "SELECT * FROM historic_exercises "
+        "WHERE User = ? AND Exercise = ? AND Day = ?",
+        ["JM", "SQUAT", "2022-06-01"],
+    ),
+    "best set": (
+        "SELECT max(Weight) AS Weight FROM historic_exercises "
+        "WHERE User = ? AND Exercise = ?",
+        ["AB", "DEADLIFT"],
+    ),
+}
+
+
+def timed(db_manager: DuckDBManager, query: str, params: list, repeat: int) -> float:
+    db_manager.get_data(query=query, params=params)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        db_manager.get_data(query=query, params=params)
+    return (time.perf_counter() - start) / repeat
+
+
+def measure(db_manager: DuckDBManager, repeat: int) -> dict:
+    return {
+        name: timed(db_manager, query, params, repeat)
+        for name, (query, params) in QUERIES.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as db_dir:
+            create_synthetic_lifts_table(f"{db_dir}/fit.db", n_rows)
+            db_manager = DuckDBManager(db_dir=db_dir, cache=False)
+
+            unsorted = measure(db_manager, args.repeat)
+            compaction = db_manager.compact_table("historic_exercises")
+            compacted = measure(db_manager, args.repeat)
+            db_manager.create_indexes("historic_exercises")
+            indexed = measure(db_manager, args.repeat)
+
+            print(
+                f"{n_rows:>10,} rows, compaction took {compaction['total']:.1f}s "
+                f"(rewrite {compaction['rewrite']:.1f}s)"
+            )
+            for name in QUERIES:
+                print(
+                    f"  {name:<17} unsorted {unsorted[name] * 1000:7.1f}ms, "
+                    f"compacted {compacted[name] * 1000:7.1f}ms "
+                    f"({unsorted[name] / compacted[name]:.1f}x), "
+                    f"indexed {indexed[name] * 1000:7.1f}ms"
+                )
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Per-stage timings of the typed bulk ingest of worksheet-shaped lifts, and the
+# per-rerun read with and without clean_lifts_data.
+# Run from the repository root: python -m benchmarks.bench_typed_ingest
+import argparse
+import tempfile
+import time
+
+from benchmarks.generators import synthetic_sheet_lifts
+from modules.connection_pool import close_all_pools
+from modules.duckdb import DuckDBManager
+from modules.util import clean_lifts_data
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        lifts_df = synthetic_sheet_lifts(n_rows)
+        lifts_df["Notes"] = lifts_df["Notes"].astype(str)
+
+        with tempfile.TemporaryDirectory() as db_dir:
+            db_manager = DuckDBManager(db_dir=db_dir, cache=False)
+            timings = db_manager.bulk_ingest(
+                "historic_exercises", lifts_df, replace=True
+            )
+            stages = ", ".join(
+                f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in timings.items()
+            )
+            print(f"{n_rows:>10,} rows ingest: {stages}")
+
+            def read():
+                return db_manager.get_data(table_name="historic_exercises")
+
+            before = timed(lambda: clean_lifts_data(read()), args.repeat)
+            after = timed(read, args.repeat)
+            print(
+                f"{'':>10} rerun read: read + clean_lifts_data {before * 1000:.0f}ms, "
+                f"typed read {after * 1000:.0f}ms ({before / after:.1f}x)"
+            )
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# pytest-benchmark suite for the data layer and pages. Run from the repository root:
+#   python -m pytest benchmarks --bench-scale medium
+# Every run is saved as JSON under .benchmarks/, compare two runs with
+#   pytest-benchmark compare 0001 0002
+# or fail on regressions against the last saved run with
+#   python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+import os
+import sys
+
+import pytest
+
+from benchmarks.generators import synthetic_exercises, synthetic_lifts
+from modules.connection_pool import close_all_pools
+from modules.duckdb import DuckDBManager
+from modules.query_cache import get_query_cache
+
+# the fakes used by the tests, and the fitbit scripts, which import each other by name
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "test"))
+sys.path.insert(0, os.path.join(ROOT, "fitbit"))
+
+# lift history rows and Fitbit days generated at each scale
+SCALES = {
+    "small": {"rows": [1_000, 10_000], "days": [30]},
+    "medium": {"rows": [1_000, 100_000], "days": [30, 365]},
+    "large": {"rows": [1_000, 100_000, 1_000_000], "days": [30, 365, 1825]},
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-scale",
+        choices=list(SCALES),
+        default="medium",
+        help="Sizes of the synthetic data the benchmarks run on",
+    )
+
+
+def pytest_configure(config):
+    # keep every run as JSON so later runs can be compared against it, tagged
+    # with the commit and date like --benchmark-autosave does
+    option = config.option
+    if hasattr(option, "benchmark_autosave") and not (
+        option.benchmark_autosave or option.benchmark_save
+    ):
+        from pytest_benchmark.utils import get_tag
+
+        option.benchmark_autosave = get_tag()
+
+
+def pytest_generate_tests(metafunc):
+    scale = SCALES[metafunc.config.getoption("--bench-scale")]
+    if "n_rows" in metafunc.fixturenames:
+        metafunc.parametrize("n_rows", scale["rows"], scope="module")
+    if "n_days" in metafunc.fixturenames:
+        metafunc.parametrize("n_days", scale["days"], scope="module")
+
+
+@pytest.fixture(scope="module")
+def lifts_df(n_rows):
+    return synthetic_lifts(n_rows)
+
+
+@pytest.fixture(scope="module")
+def db_dir(tmp_path_factory, lifts_df):
+    db_dir = str(tmp_path_factory.mktemp("bench"))
+    db_manager = DuckDBManager(db_dir=db_dir)
+    db_manager.setup_table("historic_exercises", lifts_df)
+    db_manager.setup_table("exercises", synthetic_exercises())
+    yield db_dir
+    close_all_pools()
+    get_query_cache().clear()
+
+
+@pytest.fixture
+def manager(db_dir):
+    # reads are measured without the result cache, which would serve every round
+    return DuckDBManager(db_dir=db_dir, cache=False)
@@ -0,0 +1,202 @@
+import datetime
+
+import duckdb as duckdb
+import numpy as np
+import pandas as pd
+
+EXERCISES = [
+    "BENCH PRESS",
+    "SQUAT",
+    "DEADLIFT",
+    "OVERHEAD PRESS",
+    "PULL UPS",
+    "BARBELL ROW",
+    "LEG PRESS",
+    "BICEP CURL",
+    "TRICEP DIP",
+    "LUNGES",
+]
+USERS = ["JM", "AB", "CD", "EF"]
+
+
+def synthetic_lifts(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate a synthetic lift history shaped like historic_exercises.
+
+    Args:
+        n_rows (int): Number of rows to generate.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        pd.DataFrame: Day, Exercise, Weight, Reps, Sets, Notes and User columns.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(datetime.date(2020, 1, 1))
+    return pd.DataFrame(
+        {
+            "Day": (start + rng.integers(0, 365 * 5, n_rows)).astype("datetime64[D]"),
+            "Exercise": rng.choice(EXERCISES, n_rows),
+            "Weight": rng.integers(10, 200, n_rows).astype(float),
+            "Reps": rng.integers(1, 13, n_rows),
+            "Sets": rng.integers(1, 6, n_rows),
+            "Notes": "",
+            "User": rng.choice(USERS, n_rows),
+        }
+    )
+
+
+def synthetic_exercises(sessions: int = 4) -> pd.DataFrame:
+    """
+    Generate an exercises table, every exercise in each of a few sessions.
+
+    Args:
+        sessions (int): Number of sessions, named DAY 1, DAY 2 and so on.
+
+    Returns:
+        pd.DataFrame: Day and Exercise columns.
+    """
+    return pd.DataFrame(
+        [
+            {"Day": f"DAY {session + 1}", "Exercise": exercise}
+            for session in range(sessions)
+            for exercise in EXERCISES
+        ]
+    )
+
+
+def create_synthetic_lifts_table(
+    db_path: str, n_rows: int, table_name: str = "historic_exercises"
+) -> None:
+    """
+    Create a synthetic lift history table directly in a database file.
+
+    Rows are generated in DuckDB, so the calling process never holds the
+    table, and land in no particular order, like years of appends.
+
+    Args:
+        db_path (str): Path of the database file.
+        n_rows (int): Number of rows to generate.
+        table_name (str): Name of the table to create.
+    """
+    con = duckdb.connect(db_path)
+    con.execute(
+        f"""
+        CREATE TABLE {table_name} AS
+        SELECT
+            DATE '2020-01-01' + (hash(range) % 1825)::INTEGER AS Day,
+            list_extract(?, (hash(range * 3) % {len(EXERCISES)})::INTEGER + 1) AS Exercise,
+            (10 + hash(range * 7) % 190)::DECIMAL(18,3) AS Weight,
+            (1 + range % 12)::INTEGER AS Reps,
+            (1 + range % 5)::INTEGER AS Sets,
+            '' AS Notes,
+            list_extract(?, (hash(range * 5) % {len(USERS)})::INTEGER + 1) AS User
+        FROM range({n_rows})
+        """,
+        [EXERCISES, USERS],
+    )
+    con.close()
+
+
+def synthetic_sheet_lifts(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate lift rows as they come back from the Lifts worksheet.
+
+    Dates are dd/mm/yyyy strings and text is mixed case, as typed by users.
+
+    Args:
+        n_rows (int): Number of rows to generate.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        pd.DataFrame: Worksheet-shaped lift data.
+    """
+    df = synthetic_lifts(n_rows, seed=seed)
+    df["Day"] = df["Day"].dt.strftime("%d/%m/%Y")
+    df["Exercise"] = df["Exercise"].str.title()
+    df["User"] = df["User"].str.lower()
+    df["Notes"] = np.where(df.index % 7 == 0, "felt strong", "")
+    return df
+
+
+def synthetic_fitbit_days(n_days: int) -> list:
+    """
+    Days in the YYYY-MM-DD format used by the Fitbit API, most recent first.
+
+    Args:
+        n_days (int): Number of days.
+
+    Returns:
+        list: Day strings.
+    """
+    end = datetime.date(2024, 12, 31)
+    return [(end - datetime.timedelta(days=i)).isoformat() for i in range(n_days)]
+
+
+def synthetic_activities_response(day: str, seed: int = 0) -> dict:
+    """
+    An activities response for one day with zero to three logged activities.
+
+    Args:
+        day (str): Day as YYYY-MM-DD.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        dict: Response shaped like fitbit.Fitbit.activities.
+    """
+    rng = np.random.default_rng(abs(hash((day, seed))) % 2**32)
+    return {
+        "activities": [
+            {
+                "activityId": int(rng.integers(90000, 91000)),
+                "name": str(rng.choice(["Walk", "Run", "Weights", "Bike"])),
+                "calories": int(rng.integers(50, 900)),
+                "steps": int(rng.integers(0, 12000)),
+                "startDate": day,
+            }
+            for _ in range(int(rng.integers(0, 4)))
+        ]
+    }
+
+
+def synthetic_sleep_response(day: str, minutes: int = 480, seed: int = 0) -> dict:
+    """
+    A sleep response for one night with minute-level data.
+
+    Args:
+        day (str): Day the sleep ended, as YYYY-MM-DD.
+        minutes (int): Length of the night in minutes.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        dict: Response shaped like fitbit.Fitbit.sleep.
+    """
+    rng = np.random.default_rng(abs(hash((day, seed))) % 2**32)
+    start = datetime.datetime.fromisoformat(day) - datetime.timedelta(hours=1)
+    states = rng.choice(["1", "2", "3"], minutes, p=[0.9, 0.08, 0.02])
+    asleep = int((states == "1").sum())
+    return {
+        "sleep": [
+            {
+                "dateOfSleep": day,
+                "startTime": start.isoformat(timespec="milliseconds"),
+                "isMainSleep": True,
+                "efficiency": int(100 * asleep / minutes),
+                "duration": minutes * 60_000,
+                "minutesAsleep": asleep,
+                "minutesAwake": minutes - asleep,
+                "awakeCount": int((states == "2").sum()),
+                "restlessCount": int((states == "3").sum()),
+                "restlessDuration": int((states == "3").sum()),
+                "timeInBed": minutes,
+                "minuteData": [
+                    {
+                        "dateTime": (start + datetime.timedelta(minutes=m)).strftime(
+                            "%H:%M:%S"
+                        ),
+                        "value": state,
+                    }
+                    for m, state in enumerate(states)
+                ],
+            }
+        ]
+    }
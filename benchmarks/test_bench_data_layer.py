@@ -0,0 +1,67 @@
+import pytest
+
+from benchmarks.generators import EXERCISES, synthetic_lifts, synthetic_sheet_lifts
+from modules.duckdb import DuckDBManager
+from modules.maintenance import MaintenanceSchedule
+from modules.util import clean_lifts_data, load_data, reduce_dataframe_size
+
+
+def test_load_data(benchmark, manager, n_rows):
+    lifts_df, _, exercises = benchmark(load_data, manager)
+    assert len(lifts_df) == n_rows
+    assert len(exercises) == len(EXERCISES)
+
+
+@pytest.mark.parametrize("dtype_backend", ["numpy", "pyarrow"])
+def test_clean_lifts_data(benchmark, n_rows, dtype_backend):
+    sheet_df = synthetic_sheet_lifts(n_rows)
+    cleaned = benchmark(clean_lifts_data, sheet_df, dtype_backend=dtype_backend)
+    assert len(cleaned) == n_rows
+
+
+@pytest.mark.parametrize("method", ["hash", "sort"])
+def test_reduce_dataframe_size(benchmark, lifts_df, method):
+    reduced = benchmark(reduce_dataframe_size, lifts_df, method=method)
+    assert 0 < len(reduced) <= len(lifts_df)
+
+
+@pytest.mark.parametrize("format", ["pandas", "arrow"])
+def test_get_data(benchmark, manager, n_rows, format):
+    result = benchmark(manager.get_data, table_name="historic_exercises", format=format)
+    assert len(result) == n_rows
+
+
+def test_get_exercise_history(benchmark, manager):
+    history = benchmark(manager.get_exercise_history, "SQUAT")
+    assert not history.empty
+
+
+def test_append_to_table(benchmark, monkeypatch, tmp_path_factory, lifts_df):
+    # one session's worth of sets, appended to a fresh copy of the full history
+    # every round, with maintenance that never comes due
+    schedule = MaintenanceSchedule(
+        compact_after_rows=float("inf"), checkpoint_after_writes=float("inf")
+    )
+    monkeypatch.setattr("modules.duckdb.get_maintenance_schedule", lambda: schedule)
+    session = synthetic_lifts(50, seed=1)
+
+    def setup():
+        db_manager = DuckDBManager(db_dir=str(tmp_path_factory.mktemp("append")))
+        db_manager.setup_table("historic_exercises", lifts_df)
+        return (db_manager,), {}
+
+    appended = benchmark.pedantic(
+        lambda db_manager: db_manager.append_to_table(session, "historic_exercises"),
+        setup=setup,
+        rounds=5,
+    )
+    assert appended
+
+
+def test_get_personal_bests(benchmark, manager):
+    pbs = benchmark(manager.get_personal_bests, EXERCISES)
+    assert not pbs.empty
+
+
+def test_rebuild_personal_bests(benchmark, manager):
+    benchmark(manager.rebuild_personal_bests)
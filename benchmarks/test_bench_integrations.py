@@ -0,0 +1,67 @@
+import pytest
+
+from benchmarks.generators import synthetic_sheet_lifts
+from modules.connection_pool import close_all_pools
+from modules.get_google_sheets_data import rewrite_worksheet, sync_worksheet
+
+# on sys.path from conftest
+from concurrent_fetch import TokenBucket
+from fake_fitbit import FakeFitbit
+from fake_gspread import FakeWorksheet
+from get_fitbit_data import FitbitAnalysis
+from response_cache import FitbitResponseCache
+
+
+def worksheet_rows(df):
+    return [list(df.columns)] + df.astype(object).values.tolist()
+
+
+@pytest.fixture(scope="module")
+def sheet_history(n_rows):
+    return worksheet_rows(synthetic_sheet_lifts(n_rows))
+
+
+@pytest.fixture(scope="module")
+def new_sets():
+    # a session's sets, none of them in the history
+    return synthetic_sheet_lifts(20, seed=1)
+
+
+@pytest.mark.parametrize("mode", ["delta", "full"])
+def test_sheets_sync(benchmark, sheet_history, new_sets, mode):
+    def setup():
+        return (FakeWorksheet(rows=sheet_history),), {}
+
+    def sync(sheet):
+        if mode == "delta":
+            sync_worksheet(sheet, new_sets, {})
+        else:
+            rewrite_worksheet(sheet, new_sets)
+        return sheet
+
+    sheet = benchmark.pedantic(sync, setup=setup, rounds=5)
+    assert len(sheet.values) == len(sheet_history) + len(new_sets)
+    benchmark.extra_info["api_calls"] = sheet.api_calls
+    benchmark.extra_info["bytes_sent"] = sheet.bytes_sent
+
+
+@pytest.mark.parametrize("aggregate", ["get_x_days_sleep_agg", "get_x_days_activity"])
+def test_fitbit_aggregation(benchmark, tmp_path_factory, n_days, aggregate):
+    # a fresh response cache each round, so every day is fetched from the fake
+    # client, which has no rate limit to respect
+    def setup():
+        analysis = FitbitAnalysis(
+            "client",
+            "secret",
+            fit=FakeFitbit(),
+            rate_limiter=TokenBucket(rate=1e9, capacity=10**9),
+            cache=FitbitResponseCache(db_dir=str(tmp_path_factory.mktemp("fitbit"))),
+        )
+        return (analysis,), {}
+
+    df = benchmark.pedantic(
+        lambda analysis: getattr(analysis, aggregate)(n_days), setup=setup, rounds=3
+    )
+    close_all_pools()
+    if aggregate == "get_x_days_sleep_agg":
+        assert len(df) == n_days
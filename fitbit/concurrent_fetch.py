@@ -0,0 +1,108 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, Type
+
+# Fitbit allows 150 API requests per user per hour
+FITBIT_REQUESTS_PER_HOUR = 150
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Thread-safe token bucket used to stay under an API rate limit
+
+        Args:
+            rate (float): tokens added per second
+            capacity (int): maximum tokens held, i.e. the allowed burst
+            clock (Callable[[], float]): time source, overridable for tests
+            sleep (Callable[[float], None]): sleep function, overridable for tests
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_hour(cls, requests_per_hour: int = FITBIT_REQUESTS_PER_HOUR):
+        """Returns a bucket allowing a full hour's quota as a burst
+
+        Args:
+            requests_per_hour (int): hourly request quota
+
+        Returns:
+            TokenBucket: the bucket
+        """
+        return cls(rate=requests_per_hour / 3600, capacity=requests_per_hour)
+
+    def acquire(self) -> None:
+        """Blocks until a token is available, then takes it"""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self._sleep(wait)
+
+
+def fetch_days(
+    fetch: Callable[[str], dict],
+    days: List[str],
+    max_workers: int = 8,
+    rate_limiter: Optional[TokenBucket] = None,
+    retry_on: Tuple[Type[Exception], ...] = (),
+    max_retries: int = 5,
+    backoff: float = 1.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> list:
+    """Calls fetch for every day on a bounded thread pool
+
+    Args:
+        fetch (Callable[[str], dict]): makes the API request for one day
+        days (List[str]): days to fetch
+        max_workers (int): maximum concurrent requests
+        rate_limiter (Optional[TokenBucket]): bucket to take a token from before each request
+        retry_on (Tuple[Type[Exception], ...]): errors to retry, e.g. HTTP 429
+        max_retries (int): retries per day before the error is raised
+        backoff (float): base delay in seconds for exponential backoff, used when
+            the error has no retry_after_secs
+        sleep (Callable[[float], None]): sleep function, overridable for tests
+
+    Returns:
+        list: responses in the same order as days
+    """
+
+    def fetch_one(day: str) -> dict:
+        for attempt in range(max_retries + 1):
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                return fetch(day)
+            except retry_on as e:
+                if attempt == max_retries:
+                    raise
+                delay = getattr(e, "retry_after_secs", None)
+                if delay is None:
+                    delay = backoff * 2**attempt * (1 + random.random())
+                sleep(delay)
+
+    if not days:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(days))) as pool:
+        return list(pool.map(fetch_one, days))
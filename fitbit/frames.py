@@ -0,0 +1,215 @@
+from array import array
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# array typecodes for the numeric dtypes a builder can hold unboxed
+_TYPECODES = {"int64": "q", "int16": "h", "int8": "b", "float64": "d", "bool": "b"}
+
+ACTIVITY_DTYPES = {
+    "id": "int64",
+    "Name": "object",
+    "Start_Date": "datetime64[ns]",
+    "Calories": "int64",
+    "Steps": "int64",
+}
+
+SLEEP_MINUTE_DTYPES = {
+    "State": "int8",
+    "Time": "datetime64[ns]",
+    "Date": "datetime64[ns]",
+    "State_Detail": "category",
+}
+
+SLEEP_AGG_DTYPES = {
+    "dateOfSleep": "datetime64[ns]",
+    "isMainSleep": "bool",
+    "efficiency": "int64",
+    "duration": "int64",
+    "minutesAsleep": "int64",
+    "minutesAwake": "int64",
+    "awakeCount": "int64",
+    "restlessCount": "int64",
+    "restlessDuration": "int64",
+    "timeInBed": "int64",
+}
+
+SLEEP_STATE_DETAIL = {1: "Asleep", 2: "Awake", 3: "Alert"}
+STATE_DETAIL_DTYPE = pd.CategoricalDtype(list(SLEEP_STATE_DETAIL.values()))
+
+
+class ColumnarBuilder:
+    def __init__(self, dtypes: Dict[str, str], formats: Optional[Dict[str, str]] = None):
+        """Collects records column by column and builds one DataFrame at the end
+
+        Numeric columns are held in typed arrays, so values are stored unboxed
+        and become numpy arrays without conversion.
+
+        Args:
+            dtypes (Dict[str, str]): dtype of each column, in column order
+            formats (Optional[Dict[str, str]]): strptime format for datetime columns
+        """
+        self.dtypes = dtypes
+        self.formats = formats or {}
+        self.columns = {
+            column: array(_TYPECODES[dtype]) if dtype in _TYPECODES else []
+            for column, dtype in dtypes.items()
+        }
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), []))
+
+    def append(self, record: dict) -> None:
+        """Adds one record
+
+        Args:
+            record (dict): value for every column
+        """
+        for column, values in self.columns.items():
+            values.append(record[column])
+
+    def extend(self, records: List[dict]) -> None:
+        """Adds many records
+
+        Args:
+            records (List[dict]): records with a value for every column
+        """
+        for column, values in self.columns.items():
+            values.extend([record[column] for record in records])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Builds the DataFrame with the declared dtypes
+
+        Returns:
+            pd.DataFrame: one column per declared dtype
+        """
+        data = {}
+        for column, dtype in self.dtypes.items():
+            values = self.columns[column]
+            if dtype in _TYPECODES:
+                data[column] = np.frombuffer(values, dtype=values.typecode).astype(
+                    dtype, copy=dtype == "bool"
+                )
+            elif dtype.startswith("datetime64"):
+                data[column] = pd.to_datetime(
+                    pd.Series(values, dtype=object), format=self.formats.get(column)
+                ).astype(dtype)
+            else:
+                data[column] = pd.Series(values, dtype=dtype)
+        return pd.DataFrame(data)
+
+
+def build_activity_frame(responses: List[dict]) -> pd.DataFrame:
+    """Builds the activity frame from activities responses
+
+    Args:
+        responses (List[dict]): one activities response per day
+
+    Returns:
+        pd.DataFrame: activity data frame
+    """
+    builder = ColumnarBuilder(ACTIVITY_DTYPES, formats={"Start_Date": "%Y-%m-%d"})
+    for response in responses:
+        for action in response["activities"]:
+            builder.append(
+                {
+                    "id": action["activityId"],
+                    "Name": str(action["name"]),
+                    "Start_Date": action["startDate"],
+                    "Calories": action["calories"],
+                    "Steps": action["steps"],
+                }
+            )
+    return builder.to_frame()
+
+
+def sleep_state_detail(states) -> pd.Categorical:
+    """Maps integer sleep states to their categorical description
+
+    Args:
+        states: integer sleep state codes
+
+    Returns:
+        pd.Categorical: Asleep / Awake / Alert
+    """
+    codes = np.asarray(states, dtype=np.int8) - 1
+    codes[(codes < 0) | (codes >= len(SLEEP_STATE_DETAIL))] = -1
+    return pd.Categorical.from_codes(codes, dtype=STATE_DETAIL_DTYPE)
+
+
+def build_sleep_frame(responses: List[dict]) -> pd.DataFrame:
+    """Builds the minute-level sleep frame from sleep responses
+
+    Each minute has an int8 state code, the timestamp of the minute, the date
+    of the sleep and a categorical state description.
+
+    Args:
+        responses (List[dict]): one sleep response per day
+
+    Returns:
+        pd.DataFrame: sleep data frame
+    """
+    states = array("b")
+    times = []
+    dates = []
+    starts = []
+    counts = []
+    for response in responses:
+        sleep = response["sleep"][0]
+        minutes = sleep["minuteData"]
+        states.extend([int(minute["value"]) for minute in minutes])
+        times.extend([minute["dateTime"] for minute in minutes])
+        dates.append(sleep["dateOfSleep"])
+        starts.append(sleep.get("startTime", "")[:10] or None)
+        counts.append(len(minutes))
+
+    night = np.repeat(np.arange(len(counts)), counts)
+    time_of_day = pd.to_timedelta(pd.Series(times, dtype=object)).to_numpy()
+
+    # minute data is a time of day, count each wrap past midnight within a night
+    wrapped = np.zeros(len(times), dtype=np.int64)
+    if len(times) > 1:
+        wrapped[1:] = (np.diff(time_of_day) < np.timedelta64(0)) & (
+            night[1:] == night[:-1]
+        )
+    wraps = pd.Series(wrapped).groupby(night).cumsum().to_numpy()
+
+    # nights start on the startTime date, or the day before dateOfSleep if they wrap
+    date_of_sleep = pd.to_datetime(pd.Series(dates, dtype=object), format="%Y-%m-%d")
+    start_date = pd.to_datetime(pd.Series(starts, dtype=object), format="%Y-%m-%d")
+    night_wraps = pd.Series(wrapped).groupby(night).max().reindex(
+        range(len(counts)), fill_value=0
+    )
+    start_date = start_date.fillna(
+        date_of_sleep - pd.to_timedelta(night_wraps.to_numpy(), unit="D")
+    )
+
+    time = (
+        np.repeat(start_date.to_numpy(), counts)
+        + time_of_day
+        + wraps * np.timedelta64(1, "D")
+    )
+
+    return pd.DataFrame(
+        {
+            "State": np.frombuffer(states, dtype=np.int8),
+            "Time": pd.Series(time, dtype="datetime64[ns]"),
+            "Date": pd.Series(np.repeat(date_of_sleep.to_numpy(), counts)),
+            "State_Detail": sleep_state_detail(np.frombuffer(states, dtype=np.int8)),
+        }
+    )
+
+
+def build_sleep_agg_frame(responses: List[dict]) -> pd.DataFrame:
+    """Builds the one-row-per-night sleep summary frame from sleep responses
+
+    Args:
+        responses (List[dict]): one sleep response per day
+
+    Returns:
+        pd.DataFrame: aggregated sleep data frame
+    """
+    builder = ColumnarBuilder(SLEEP_AGG_DTYPES, formats={"dateOfSleep": "%Y-%m-%d"})
+    builder.extend([response["sleep"][0] for response in responses])
+    return builder.to_frame()
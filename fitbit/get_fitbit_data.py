@@ -1,18 +1,40 @@
-import os
-import json
 import pandas as pd
 import datetime
 import fitbit
+from fitbit.exceptions import HTTPTooManyRequests
 from gather_keys_oauth2 import OAuth2Server
-from typing import List
+from concurrent_fetch import TokenBucket, fetch_days
+from response_cache import FitbitResponseCache
+from frames import build_activity_frame, build_sleep_agg_frame, build_sleep_frame
+from typing import List, Optional
 
 
 class FitbitAnalysis:
 
-    def __init__(self, client_id: str, client_secret: str):
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        fit: Optional[fitbit.Fitbit] = None,
+        max_workers: int = 8,
+        rate_limiter: Optional[TokenBucket] = None,
+        cache: Optional[FitbitResponseCache] = None,
+    ):
+        """
+        Args:
+            client_id (str): Fitbit app client id
+            client_secret (str): Fitbit app client secret
+            fit (Optional[fitbit.Fitbit]): authorised client, if None the browser OAuth2 flow is run
+            max_workers (int): maximum concurrent day requests
+            rate_limiter (Optional[TokenBucket]): shared rate limiter, defaults to Fitbit's hourly quota
+            cache (Optional[FitbitResponseCache]): response cache, defaults to database/fitbit_cache.db
+        """
         self.client_id = client_id
         self.client_secret = client_secret
-        self.fit = self.authorize_fitbit()
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter or TokenBucket.per_hour()
+        self.cache = cache or FitbitResponseCache()
+        self.fit = fit if fit is not None else self.authorize_fitbit()
 
     def authorize_fitbit(self):
         server = OAuth2Server(self.client_id, self.client_secret)
@@ -45,6 +67,30 @@ class FitbitAnalysis:
             for i in range(1, no_days_ago + 1)
         ]
 
+    def fetch_days(self, endpoint: str, days_list: List[str]) -> List[dict]:
+        """Fetches one endpoint for each day through the response cache.
+        Days missing from the cache are requested concurrently, within the rate limit
+
+        Args:
+            endpoint (str): name of the fitbit.Fitbit method, e.g. "sleep"
+            days_list (List[str]): days to fetch, as YYYY-MM-DD
+
+        Returns:
+            List[dict]: responses in the same order as days_list
+        """
+        request = getattr(self.fit, endpoint)
+        return self.cache.fetch(
+            endpoint,
+            days_list,
+            lambda missing: fetch_days(
+                lambda day: request(date=day),
+                missing,
+                max_workers=self.max_workers,
+                rate_limiter=self.rate_limiter,
+                retry_on=(HTTPTooManyRequests,),
+            ),
+        )
+
     def get_x_days_activity(self, no_days_ago: int) -> pd.DataFrame:
         """Returns activity data for the last x days
 
@@ -58,50 +104,8 @@ class FitbitAnalysis:
         # define last 10 days of data
         days_list = self.get_days_list(no_days_ago)
 
-        # variable list
-        id_list = []
-        name_list = []
-        calories_list = []
-        steps_list = []
-        date_list = []
-
         # get activities for last x days
-        for day in days_list:
-            activities = self.fit.activities(date=day)["activities"]
-            [id_list.append(x) for x in [action["activityId"] for action in activities]]
-            [name_list.append(x) for x in [action["name"] for action in activities]]
-            [
-                calories_list.append(x)
-                for x in [action["calories"] for action in activities]
-            ]
-            [steps_list.append(x) for x in [action["steps"] for action in activities]]
-            [
-                date_list.append(x)
-                for x in [action["startDate"] for action in activities]
-            ]
-
-        # make DataFrame
-        activity_df = pd.DataFrame(
-            {
-                "id": id_list,
-                "Name": name_list,
-                "Start_Date": date_list,
-                "Calories": calories_list,
-                "Steps": steps_list,
-            }
-        )
-
-        # cast data types
-        activity_df["id"] = activity_df["id"].astype(int)
-        activity_df["Name"] = activity_df["Name"].astype(str)
-        activity_df["Start_Date"] = pd.to_datetime(
-            activity_df["Start_Date"], format="%Y-%m-%d"
-        )
-        activity_df["Steps"] = activity_df["Steps"].astype(int)
-        activity_df["Calories"] = activity_df["Calories"].astype(int)
-
-        # return DataFrame
-        return activity_df
+        return build_activity_frame(self.fetch_days("activities", days_list))
 
     def get_x_days_sleep(self, no_days_ago: int) -> pd.DataFrame:
         """Returns sleep data for the last x days
@@ -116,26 +120,7 @@ class FitbitAnalysis:
         # define last 10 days of data
         days_list = self.get_days_list(no_days_ago)
 
-        # get activities for last x days
-        sleep_time_list = []
-        sleep_val_list = []
-        date_of_sleep = []
-
-        for day in days_list:
-            sleep_func = self.fit.sleep(date=day)
-            for i in sleep_func["sleep"][0]["minuteData"]:
-                date_of_sleep.append(sleep_func["sleep"][0]["dateOfSleep"])
-                sleep_time_list.append(i["dateTime"])
-                sleep_val_list.append(i["value"])
-
-        df = pd.DataFrame(
-            {"State": sleep_val_list, "Time": sleep_time_list, "Date": date_of_sleep}
-        )
-        df["State_Detail"] = df["State"].map(
-            {"2": "Awake", "3": "Alert", "1": "Asleep"}
-        )
-
-        return df
+        return build_sleep_frame(self.fetch_days("sleep", days_list))
 
     def get_x_days_sleep_agg(self, no_days_ago: int) -> pd.DataFrame:
         """Return aggregated sleep data for last x days
@@ -150,55 +135,5 @@ class FitbitAnalysis:
         # define last 10 days of data
         days_list = self.get_days_list(no_days_ago)
 
-        # create blank DataFrame
-        agg_df = pd.DataFrame(
-            columns=[
-                "dateOfSleep",
-                "isMainSleep",
-                "efficiency",
-                "duration",
-                "minutesAsleep",
-                "minutesAwake",
-                "awakeCount",
-                "restlessCount",
-                "restlessDuration",
-                "timeInBed",
-            ]
-        )
-
-        for day in days_list:
-            sleep_func = self.fit.sleep(date=day)["sleep"][0]
-
-            agg_df_temp = pd.DataFrame(
-                {
-                    "dateOfSleep": sleep_func["dateOfSleep"],
-                    "isMainSleep": sleep_func["isMainSleep"],
-                    "efficiency": sleep_func["efficiency"],
-                    "duration": sleep_func["duration"],
-                    "minutesAsleep": sleep_func["minutesAsleep"],
-                    "minutesAwake": sleep_func["minutesAwake"],
-                    "awakeCount": sleep_func["awakeCount"],
-                    "restlessCount": sleep_func["restlessCount"],
-                    "restlessDuration": sleep_func["restlessDuration"],
-                    "timeInBed": sleep_func["timeInBed"],
-                },
-                index=[0],
-            )
-
-            agg_df = pd.concat([agg_df, agg_df_temp], join="inner")
-
-        return agg_df
-
-
-if __name__ == "__main__":
-    # get credentials for api and google sheet source
-    with open("cred.json") as data_file:
-        data = json.load(data_file)
-
-    # export fitbit data to pkl file
-    fitinst = FitbitAnalysis(data["client_id"], data["client_secret"])
-    activity = fitinst.get_x_days_activity(no_days_ago=30)
-    activity.to_pickle("activity.pkl")
+        return build_sleep_agg_frame(self.fetch_days("sleep", days_list))
 
-    sleep = fitinst.get_x_days_sleep_agg(no_days_ago=30)
-    sleep.to_pickle("sleep.pkl")
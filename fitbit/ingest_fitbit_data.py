@@ -0,0 +1,133 @@
+import datetime
+import json
+from typing import Dict, Optional
+
+from modules.duckdb import DuckDBManager
+from get_fitbit_data import FitbitAnalysis
+from sleep_storage import SLEEP_RUNS_COLUMNS, SLEEP_RUNS_TABLE, encode_sleep_runs
+
+# table name -> (column definitions, key columns used to upsert)
+FITBIT_TABLES = {
+    "fitbit_activity": (
+        "id BIGINT, Name VARCHAR, Start_Date DATE, Calories BIGINT, Steps BIGINT",
+        ["Start_Date", "id"],
+    ),
+    "fitbit_sleep_summary": (
+        "dateOfSleep DATE, isMainSleep BOOLEAN, efficiency BIGINT, duration BIGINT, "
+        "minutesAsleep BIGINT, minutesAwake BIGINT, awakeCount BIGINT, "
+        "restlessCount BIGINT, restlessDuration BIGINT, timeInBed BIGINT",
+        ["dateOfSleep"],
+    ),
+    # minute-level sleep is stored run-length encoded, see sleep_storage
+    SLEEP_RUNS_TABLE: (SLEEP_RUNS_COLUMNS, ["Date"]),
+}
+
+
+def setup_fitbit_tables(db_manager: DuckDBManager) -> None:
+    """Creates the Fitbit tables and the ingestion high-water mark table if missing
+
+    Args:
+        db_manager (DuckDBManager): manager of the target database
+    """
+    for table_name, (columns, _) in FITBIT_TABLES.items():
+        db_manager.execute_query(f"CREATE TABLE IF NOT EXISTS {table_name} ({columns})")
+    db_manager.execute_query(
+        "CREATE TABLE IF NOT EXISTS fitbit_ingest_state (source VARCHAR, high_water DATE)"
+    )
+
+
+def get_high_water_mark(
+    db_manager: DuckDBManager, source: str = "fitbit"
+) -> Optional[datetime.date]:
+    """Returns the last day ingested for a source
+
+    Args:
+        db_manager (DuckDBManager): manager of the target database
+        source (str): name of the ingested source
+
+    Returns:
+        Optional[datetime.date]: last ingested day, None if nothing was ingested yet
+    """
+    df = db_manager.get_data(
+        query="SELECT max(high_water) AS high_water FROM fitbit_ingest_state WHERE source = ?",
+        params=[source],
+    )
+    if df is None or df.empty or df["high_water"].isna().all():
+        return None
+    return df["high_water"].iloc[0].date()
+
+
+def set_high_water_mark(
+    db_manager: DuckDBManager, high_water: datetime.date, source: str = "fitbit"
+) -> None:
+    """Records the last day ingested for a source
+
+    Args:
+        db_manager (DuckDBManager): manager of the target database
+        high_water (datetime.date): last ingested day
+        source (str): name of the ingested source
+    """
+    db_manager.execute_query(
+        "DELETE FROM fitbit_ingest_state WHERE source = ?", params=[source]
+    )
+    db_manager.execute_query(
+        "INSERT INTO fitbit_ingest_state VALUES (?, ?)", params=[source, high_water]
+    )
+
+
+def ingest_fitbit_data(
+    fitinst: FitbitAnalysis,
+    db_manager: Optional[DuckDBManager] = None,
+    backfill_days: int = 30,
+) -> Dict[str, int]:
+    """Upserts the days after the high-water mark up to yesterday into DuckDB
+
+    Args:
+        fitinst (FitbitAnalysis): authorised Fitbit client
+        db_manager (Optional[DuckDBManager]): manager of the target database, defaults to database/fit.db
+        backfill_days (int): days to fetch on the first run
+
+    Returns:
+        Dict[str, int]: rows written to each table
+    """
+    if db_manager is None:
+        db_manager = DuckDBManager()
+
+    setup_fitbit_tables(db_manager)
+
+    # get_days_list covers yesterday back to no_days_ago days ago
+    yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    high_water = get_high_water_mark(db_manager)
+    if high_water is None:
+        no_days_ago = backfill_days
+    else:
+        no_days_ago = (yesterday - high_water).days
+
+    written = {table_name: 0 for table_name in FITBIT_TABLES}
+    if no_days_ago <= 0:
+        return written
+
+    frames = {
+        "fitbit_activity": fitinst.get_x_days_activity(no_days_ago),
+        "fitbit_sleep_summary": fitinst.get_x_days_sleep_agg(no_days_ago),
+        SLEEP_RUNS_TABLE: encode_sleep_runs(fitinst.get_x_days_sleep(no_days_ago)),
+    }
+
+    for table_name, df in frames.items():
+        if df.empty:
+            continue
+        if not db_manager.upsert_to_table(df, table_name, FITBIT_TABLES[table_name][1]):
+            raise RuntimeError(f"Could not upsert Fitbit data into {table_name}")
+        written[table_name] = len(df)
+
+    set_high_water_mark(db_manager, yesterday)
+    return written
+
+
+if __name__ == "__main__":
+    # get credentials for api, run from the repository root with it on PYTHONPATH
+    with open("cred.json") as data_file:
+        data = json.load(data_file)
+
+    fitinst = FitbitAnalysis(data["client_id"], data["client_secret"])
+    print(ingest_fitbit_data(fitinst))
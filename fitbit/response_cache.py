@@ -0,0 +1,112 @@
+import datetime
+import json
+from typing import Callable, Dict, List
+
+import pandas as pd
+from modules.duckdb import DuckDBManager
+
+
+class FitbitResponseCache:
+    def __init__(
+        self,
+        db_dir: str = "database",
+        db_name: str = "fitbit_cache.db",
+        today_ttl: datetime.timedelta = datetime.timedelta(minutes=15),
+        clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+    ):
+        """Persistent cache of Fitbit API responses keyed by endpoint and day
+
+        A day's response is treated as final once it was fetched after that day
+        ended. Responses for days still in progress are reused for today_ttl.
+
+        Args:
+            db_dir (str): directory of the cache database
+            db_name (str): file name of the cache database
+            today_ttl (datetime.timedelta): how long an unfinished day's response is reused
+            clock (Callable[[], datetime.datetime]): time source, overridable for tests
+        """
+        self.today_ttl = today_ttl
+        self._clock = clock
+        self.db = DuckDBManager(db_dir=db_dir, db_name=db_name)
+        self.db.execute_query(
+            """
+            CREATE TABLE IF NOT EXISTS fitbit_responses (
+                endpoint VARCHAR,
+                day DATE,
+                payload VARCHAR,
+                fetched_at TIMESTAMP
+            )
+            """
+        )
+
+    def get_many(self, endpoint: str, days_list: List[str]) -> Dict[str, dict]:
+        """Returns the cached responses that are still valid
+
+        Args:
+            endpoint (str): name of the API endpoint, e.g. "sleep"
+            days_list (List[str]): days to look up, as YYYY-MM-DD
+
+        Returns:
+            Dict[str, dict]: response for each day found in the cache
+        """
+        if not days_list:
+            return {}
+
+        now = self._clock()
+        rows = self.db.get_data(
+            query="""
+            SELECT strftime(day, '%Y-%m-%d') AS day, payload
+            FROM fitbit_responses
+            WHERE endpoint = ?
+              AND list_contains(?::DATE[], day)
+              AND (fetched_at >= day + INTERVAL 1 DAY OR fetched_at >= ?)
+            """,
+            params=[endpoint, days_list, now - self.today_ttl],
+        )
+        if rows is None:
+            return {}
+        return dict(zip(rows["day"], map(json.loads, rows["payload"])))
+
+    def put_many(self, endpoint: str, responses: Dict[str, dict]) -> None:
+        """Stores responses, replacing any older response for the same day
+
+        Args:
+            endpoint (str): name of the API endpoint, e.g. "sleep"
+            responses (Dict[str, dict]): response for each day, keyed YYYY-MM-DD
+        """
+        if not responses:
+            return
+
+        df = pd.DataFrame(
+            {
+                "endpoint": endpoint,
+                "day": pd.to_datetime(list(responses)).date,
+                "payload": [json.dumps(r, separators=(",", ":")) for r in responses.values()],
+                "fetched_at": self._clock(),
+            }
+        )
+        self.db.upsert_to_table(df, "fitbit_responses", ["endpoint", "day"])
+
+    def fetch(
+        self,
+        endpoint: str,
+        days_list: List[str],
+        fetch_missing: Callable[[List[str]], List[dict]],
+    ) -> List[dict]:
+        """Reads through the cache, fetching and storing only the missing days
+
+        Args:
+            endpoint (str): name of the API endpoint, e.g. "sleep"
+            days_list (List[str]): days to return, as YYYY-MM-DD
+            fetch_missing (Callable[[List[str]], List[dict]]): fetches responses for the given days, in order
+
+        Returns:
+            List[dict]: responses in the same order as days_list
+        """
+        cached = self.get_many(endpoint, days_list)
+        missing = [day for day in dict.fromkeys(days_list) if day not in cached]
+        if missing:
+            fetched = dict(zip(missing, fetch_missing(missing)))
+            self.put_many(endpoint, fetched)
+            cached.update(fetched)
+        return [cached[day] for day in days_list]
@@ -0,0 +1,138 @@
+import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from modules.duckdb import DuckDBManager
+from frames import sleep_state_detail
+
+SLEEP_RUNS_TABLE = "fitbit_sleep_runs"
+SLEEP_RUNS_COLUMNS = "Date DATE, start_time TIMESTAMP, state TINYINT, minutes SMALLINT"
+
+
+def encode_sleep_runs(sleep_df: pd.DataFrame) -> pd.DataFrame:
+    """Run-length encodes minute-level sleep data
+
+    Consecutive minutes of the same night and state become one run, so a night
+    is stored as a few dozen rows instead of several hundred.
+
+    Args:
+        sleep_df (pd.DataFrame): minute-level frame from FitbitAnalysis.get_x_days_sleep
+
+    Returns:
+        pd.DataFrame: Date, start_time, state (int8) and minutes (int16), sorted by start_time
+    """
+    df = sleep_df.sort_values("Time", kind="stable")
+    state = df["State"].to_numpy(dtype=np.int8)
+    time = df["Time"].to_numpy(dtype="datetime64[ns]")
+    date = df["Date"].to_numpy(dtype="datetime64[ns]")
+
+    # a new run starts when the state or night changes, or minutes are missing
+    starts = np.ones(len(df), dtype=bool)
+    if len(df) > 1:
+        starts[1:] = (
+            (state[1:] != state[:-1])
+            | (date[1:] != date[:-1])
+            | (time[1:] - time[:-1] != np.timedelta64(1, "m"))
+        )
+    run_start = np.flatnonzero(starts)
+    run_length = np.diff(np.append(run_start, len(df)))
+
+    return pd.DataFrame(
+        {
+            "Date": date[run_start],
+            "start_time": time[run_start],
+            "state": state[run_start],
+            "minutes": run_length.astype(np.int16),
+        }
+    )
+
+
+def decode_sleep_runs(runs: pd.DataFrame) -> pd.DataFrame:
+    """Expands sleep runs back to the minute-level frame
+
+    Args:
+        runs (pd.DataFrame): frame from encode_sleep_runs or load_sleep_runs
+
+    Returns:
+        pd.DataFrame: State (int8), Time, Date and State_Detail (category), one row per minute
+    """
+    minutes = runs["minutes"].to_numpy(dtype=np.int64)
+    offsets = np.arange(minutes.sum()) - np.repeat(np.cumsum(minutes) - minutes, minutes)
+    state = np.repeat(runs["state"].to_numpy(dtype=np.int8), minutes)
+
+    return pd.DataFrame(
+        {
+            "State": state,
+            "Time": np.repeat(runs["start_time"].to_numpy(dtype="datetime64[ns]"), minutes)
+            + offsets.astype("timedelta64[m]"),
+            "Date": np.repeat(runs["Date"].to_numpy(dtype="datetime64[ns]"), minutes),
+            "State_Detail": sleep_state_detail(state),
+        }
+    )
+
+
+def load_sleep_runs(
+    db_manager: DuckDBManager,
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+) -> pd.DataFrame:
+    """Loads sleep runs through Arrow into Arrow-backed pandas columns, without copying
+
+    Args:
+        db_manager (DuckDBManager): manager of the database holding the runs
+        start_date (Optional[datetime.date]): first night to load
+        end_date (Optional[datetime.date]): last night to load
+
+    Returns:
+        pd.DataFrame: sleep runs sorted by start_time
+    """
+    return db_manager.get_data(
+        query=f"""
+        SELECT * FROM {SLEEP_RUNS_TABLE}
+        WHERE Date >= coalesce(?::DATE, Date) AND Date <= coalesce(?::DATE, Date)
+        ORDER BY start_time
+        """,
+        params=[start_date, end_date],
+        format="pandas_arrow",
+    )
+
+
+def export_sleep_runs_parquet(db_manager: DuckDBManager, path: str) -> None:
+    """Writes the sleep runs to Parquet, partitioned by month of the night
+
+    Args:
+        db_manager (DuckDBManager): manager of the database holding the runs
+        path (str): output directory
+    """
+    db_manager.execute_query(
+        f"""
+        COPY (
+            SELECT *, strftime(Date, '%Y-%m') AS month
+            FROM {SLEEP_RUNS_TABLE}
+            ORDER BY start_time
+        ) TO '{path}' (FORMAT PARQUET, PARTITION_BY (month), OVERWRITE_OR_IGNORE 1)
+        """
+    )
+
+
+def sleep_memory_report(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Compares the in-memory footprint of sleep frames
+
+    Args:
+        frames (Dict[str, pd.DataFrame]): frames to compare, keyed by a label
+
+    Returns:
+        pd.DataFrame: rows, total bytes and bytes per row for each frame
+    """
+    report = pd.DataFrame(
+        {
+            "rows": {label: len(df) for label, df in frames.items()},
+            "bytes": {
+                label: int(df.memory_usage(deep=True, index=False).sum())
+                for label, df in frames.items()
+            },
+        }
+    )
+    report["bytes_per_row"] = report["bytes"] / report["rows"].clip(lower=1)
+    return report
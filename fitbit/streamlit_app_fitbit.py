@@ -4,6 +4,7 @@ import pandas as pd
 import streamlit as st
 import os
 from functions.get_google_sheets_data import get_google_sheet
+from modules.duckdb import DuckDBManager
 from fitbit.get_fitbit_data import FitbitAnalysis
 from fitbit.gather_keys_oauth2 import OAuth2Server
 import datetime
@@ -107,25 +108,27 @@ st.subheader("General Activity Data")
 # activity_df = fitinst.get_x_days_activity(30)
 # sleep_df = fitinst.get_x_days_sleep_agg(30)
 
-# read from pkl file as API not working in streamlit currently
-activity_df = pd.read_pickle("activity.pkl")
-activity_list = activity_df["Name"].drop_duplicates().to_list()
+# read from DuckDB, filled by fitbit/ingest_fitbit_data.py as the API does not work in streamlit
+duckdb_manager = DuckDBManager()
+activity_list = duckdb_manager.get_data(
+    query="SELECT DISTINCT Name FROM fitbit_activity ORDER BY Name"
+)["Name"].to_list()
 
 # filter activities
 activity_choice = st.sidebar.multiselect("Select your Activity", activity_list)
 st.write("You selected:", activity_choice)
 
-if not activity_choice:
-    activity_filt_df = activity_df.copy()
-else:
-    activity_filt_df = activity_df.loc[activity_df["Name"].isin(activity_choice)]
-
-# filter dates
-activity_filt_df["Start_Date"] = pd.to_datetime(
-    activity_filt_df["Start_Date"], format="%d/%m/%Y"
-).dt.date
-activity_filt_df = activity_filt_df.loc[activity_filt_df["Start_Date"] >= start_date]
-activity_filt_df = activity_filt_df.loc[activity_filt_df["Start_Date"] <= end_date]
+# filter activities and dates in SQL, no selection means all activities
+activity_filt_df = duckdb_manager.get_data(
+    query="""
+    SELECT Name, Start_Date, Calories, Steps
+    FROM fitbit_activity
+    WHERE Start_Date BETWEEN ? AND ?
+      AND (len(?::VARCHAR[]) = 0 OR list_contains(?::VARCHAR[], Name))
+    ORDER BY Start_Date
+    """,
+    params=[start_date, end_date, activity_choice, activity_choice],
+)
 
 # create and write graph
 st.write("Calories Burnt")
@@ -147,13 +150,16 @@ st.write(steps_fig)
 
 # sleep data
 
-# read from pkl file as API not working in streamlit currently
-sleep_df = pd.read_pickle("sleep.pkl")
-
-# filter dates
-sleep_df["dateOfSleep"] = pd.to_datetime(sleep_df["dateOfSleep"]).dt.date
-sleep_filt_df = sleep_df.loc[sleep_df["dateOfSleep"] >= start_date]
-sleep_filt_df = sleep_filt_df.loc[sleep_filt_df["dateOfSleep"] <= end_date]
+# read from DuckDB, filtering dates in SQL
+sleep_filt_df = duckdb_manager.get_data(
+    query="""
+    SELECT dateOfSleep, minutesAsleep
+    FROM fitbit_sleep_summary
+    WHERE dateOfSleep BETWEEN ? AND ?
+    ORDER BY dateOfSleep
+    """,
+    params=[start_date, end_date],
+)
 
 # create and write graph
 st.write("Sleep Data")
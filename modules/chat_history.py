@@ -0,0 +1,114 @@
+import re
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+DIGEST_HEADER = "Summary of the earlier conversation, oldest first:"
+DEFAULT_WINDOW = 6
+DEFAULT_PREVIEW_ROWS = 5
+
+_SQL_BLOCK = re.compile(r"```sql\n(.*?)\n```", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _clip(text: str, max_chars: int) -> str:
+    text = _WHITESPACE.sub(" ", text).strip()
+    if len(text) <= max_chars:
+        return text
+    return text[: max_chars - 3].rstrip() + "..."
+
+
+def preview_results(message: dict, rows: int = DEFAULT_PREVIEW_ROWS) -> dict:
+    """
+    Replace a message's query results with their first rows.
+
+    Args:
+        message (dict): Chat message, optionally with a ``results`` DataFrame.
+        rows (int): Rows kept.
+
+    Returns:
+        dict: The message, with ``results`` cut to a preview and the full
+            row count in ``result_rows``.
+    """
+    results = message.get("results")
+    if isinstance(results, pd.DataFrame) and "result_rows" not in message:
+        message["result_rows"] = len(results)
+        message["results"] = results.head(rows).copy()
+    return message
+
+
+def digest_lines(message: dict, max_chars: int = 200) -> List[str]:
+    """
+    Compact lines recording what a message asked or answered.
+
+    Args:
+        message (dict): Chat message.
+        max_chars (int): Length each line is clipped to.
+
+    Returns:
+        List[str]: A question, the SQL an answer ran and how many rows it
+            returned, or the start of an answer without SQL.
+    """
+    if message.get("digest"):
+        return message["content"].splitlines()[1:]
+    content = message["content"]
+    if message["role"] == "user":
+        return [f"- User asked: {_clip(content, max_chars)}"]
+
+    sql = _SQL_BLOCK.search(content)
+    if sql is None:
+        return [f"  Answered: {_clip(content, max_chars)}"]
+    line = f"  Ran: {_clip(sql.group(1), max_chars)}"
+    if "result_rows" in message:
+        line += f" ({message['result_rows']} rows)"
+    return [line]
+
+
+def compact_history(
+    messages: List[dict],
+    window: int = DEFAULT_WINDOW,
+    max_digest_chars: int = 2000,
+    preview_rows: int = DEFAULT_PREVIEW_ROWS,
+    summarize: Optional[Callable[[str], str]] = None,
+) -> List[dict]:
+    """
+    Keep the system prompt, a digest of older turns and the latest messages.
+
+    Messages beyond the window are folded into a single digest message
+    after the system prompt, and every message's query results are cut to
+    a preview, so the request sent to the model and the page rendered on
+    each rerun stop growing with the conversation. The window always
+    starts at a question, so turns are not split.
+
+    Args:
+        messages (List[dict]): Chat messages, the first being the system prompt.
+        window (int): Most recent messages kept as they are.
+        max_digest_chars (int): Length of the digest, oldest lines are
+            dropped first.
+        preview_rows (int): Rows of query results kept per message.
+        summarize (Optional[Callable[[str], str]]): Rewrites the digest,
+            e.g. with the LLM client. The digest is kept as it is by default.
+
+    Returns:
+        List[dict]: The compacted messages.
+    """
+    messages = [preview_results(m, preview_rows) for m in messages]
+    system, rest = messages[:1], messages[1:]
+    start = max(len(rest) - window, 0)
+    while start < len(rest) and rest[start]["role"] != "user":
+        start += 1
+    older, recent = rest[:start], rest[start:]
+    if not older or (len(older) == 1 and older[0].get("digest")):
+        return messages
+
+    lines = [line for message in older for line in digest_lines(message)]
+    while lines and len("\n".join(lines)) > max_digest_chars:
+        lines.pop(0)
+    digest = "\n".join(lines)
+    if summarize is not None:
+        digest = summarize(digest)
+    return (
+        system
+        + [{"role": "system", "content": f"{DIGEST_HEADER}\n{digest}", "digest": True}]
+        + recent
+    )
@@ -0,0 +1,175 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+import duckdb as duckdb
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no cursor becomes available within the checkout timeout."""
+
+
+class DuckDBConnectionPool:
+    def __init__(
+        self, db_path: str, pool_size: int = 4, checkout_timeout: float = 30.0
+    ) -> None:
+        """
+        Initialize a connection pool over a single long-lived DuckDB handle.
+
+        The database file is opened once and every caller gets its own cursor
+        (a child connection sharing the same database instance), so concurrent
+        Streamlit sessions do not reopen the file or reload the catalog.
+
+        Args:
+            db_path (str): Path to the database file.
+            pool_size (int): Maximum number of cursors handed out at once.
+            checkout_timeout (float): Seconds to wait for a free cursor.
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self._con = None
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _database(self) -> duckdb.DuckDBPyConnection:
+        """
+        Helper method to open the shared database handle on first use.
+        """
+        with self._lock:
+            if self._con is None:
+                self._con = duckdb.connect(self.db_path)
+                self._closed = False
+            return self._con
+
+    def _is_healthy(self, cursor: duckdb.DuckDBPyConnection) -> bool:
+        """
+        Helper method to check a cursor still answers queries.
+        """
+        try:
+            cursor.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def _checkout(self) -> duckdb.DuckDBPyConnection:
+        """
+        Helper method to take an idle cursor, replacing it if it is unhealthy.
+        """
+        try:
+            cursor = self._idle.get_nowait()
+        except queue.Empty:
+            return self._database().cursor()
+
+        if self._is_healthy(cursor):
+            return cursor
+
+        try:
+            cursor.close()
+        except Exception:
+            pass
+        return self._database().cursor()
+
+    @contextmanager
+    def cursor(self):
+        """
+        Borrow a cursor for the duration of a ``with`` block.
+
+        Yields:
+            duckdb.DuckDBPyConnection: A cursor owned by the calling thread
+            until the block exits.
+        """
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise PoolTimeoutError(
+                f"No DuckDB cursor available for {self.db_path} after "
+                f"{self.checkout_timeout}s (pool_size={self.pool_size})"
+            )
+
+        cursor = None
+        try:
+            cursor = self._checkout()
+            yield cursor
+        finally:
+            if cursor is not None:
+                if self._closed:
+                    cursor.close()
+                else:
+                    self._idle.put(cursor)
+            self._slots.release()
+
+    def health_check(self) -> bool:
+        """
+        Check that the shared database handle can serve queries.
+
+        Returns:
+            bool: True if a round-trip query succeeded.
+        """
+        try:
+            with self.cursor() as cursor:
+                return self._is_healthy(cursor)
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        """
+        Close idle cursors and the shared database handle.
+
+        The pool reopens the database lazily if it is used again afterwards.
+        """
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+                except Exception:
+                    pass
+
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, pool_size: int = 4) -> DuckDBConnectionPool:
+    """
+    Return the process-wide pool for a database file, creating it if needed.
+
+    Args:
+        db_path (str): Path to the database file.
+        pool_size (int): Pool size used when the pool is first created.
+
+    Returns:
+        DuckDBConnectionPool: The shared pool for ``db_path``.
+    """
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = DuckDBConnectionPool(db_path, pool_size=pool_size)
+            _pools[db_path] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    """
+    Close every pool created by this process.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
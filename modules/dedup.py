@@ -0,0 +1,74 @@
+from typing import List
+
+import pandas as pd
+
+# a set is a repeat if it matches on these, only its latest Day is kept
+REDUCE_KEYS = ["Weight", "Reps", "Sets", "Exercise"]
+
+
+def row_hash(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """
+    64-bit hash of each row's values in the given columns.
+
+    Args:
+        df (pd.DataFrame): Rows to hash.
+        columns (List[str]): Columns the hash covers.
+
+    Returns:
+        pd.Series: uint64 hash per row, aligned with df.
+    """
+    return pd.util.hash_pandas_object(df[columns], index=False)
+
+
+def latest_by_hash(
+    df: pd.DataFrame, key_columns: List[str], order_column: str = "Day"
+) -> pd.DataFrame:
+    """
+    Keep the row with the latest order_column value for each key.
+
+    Rows are grouped by a hash of their key, so the work is a groupby-max
+    and a hash dedup with no sort. Rows keep their input order and ties on
+    the latest value keep the first row. Keys whose 64-bit hashes collide
+    would be merged, which is vanishingly unlikely at these sizes.
+
+    Args:
+        df (pd.DataFrame): Rows to reduce.
+        key_columns (List[str]): Columns identifying a repeat.
+        order_column (str): Column whose maximum marks the row to keep.
+
+    Returns:
+        pd.DataFrame: One row per key.
+    """
+    hashes = row_hash(df, key_columns).to_numpy()
+    order = pd.to_datetime(df[order_column]).to_numpy()
+    latest = pd.Series(order).groupby(hashes, sort=False).transform("max").to_numpy()
+    # keys with no order value at all still keep a row
+    is_latest = (order == latest) | pd.isna(latest)
+    first = ~pd.Series(hashes[is_latest]).duplicated().to_numpy()
+    return df[is_latest][first]
+
+
+def latest_by_hash_query(
+    table_name: str, key_columns: List[str], order_column: str = "Day"
+) -> str:
+    """
+    SQL doing latest_by_hash inside DuckDB.
+
+    Rows are grouped by DuckDB's 64-bit hash of the key and arg_max picks
+    the rowid of the latest row of each group, without sorting the table.
+    Which row wins a tie is up to DuckDB.
+
+    Args:
+        table_name (str): Table to reduce, rowid makes subqueries unsuitable.
+        key_columns (List[str]): Columns identifying a repeat.
+        order_column (str): DATE or TIMESTAMP column whose maximum marks the row to keep.
+
+    Returns:
+        str: SELECT returning the table's columns, one row per key.
+    """
+    key = ", ".join(f'"{column}"' for column in key_columns)
+    latest = f"coalesce(\"{order_column}\", '-infinity')"
+    return (
+        f"SELECT * FROM {table_name} WHERE rowid IN "
+        f"(SELECT arg_max(rowid, {latest}) FROM {table_name} GROUP BY hash({key}))"
+    )
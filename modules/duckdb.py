@@ -1,27 +1,143 @@
-import duckdb as duckdb
 import pandas as pd
+import pyarrow as pa
 import os
+import time
+from typing import Dict, Iterator, Union
+from modules.connection_pool import get_pool
+from modules.query_cache import (
+    cacheable_tables,
+    get_query_cache,
+    is_select,
+    normalize_sql,
+)
+from modules.dedup import REDUCE_KEYS, latest_by_hash_query
+from modules.maintenance import (
+    get_background_maintenance,
+    get_maintenance_schedule,
+    table_write_lock,
+)
+from modules.schema import (
+    cast_columns,
+    column_definitions,
+    get_layout,
+    get_schema,
+    order_by,
+)
+from modules.personal_bests import (
+    PERSONAL_BESTS_TABLE,
+    rebuild_personal_bests,
+    tracks_personal_bests,
+    update_personal_bests,
+)
+
+RESULT_FORMATS = ("pandas", "arrow", "pandas_arrow", "polars")
+
+# data accepted by the write methods
+TableData = Union[pd.DataFrame, pa.Table, pa.RecordBatch, pa.RecordBatchReader]
+
+
+def _as_table_data(df: TableData) -> Union[pd.DataFrame, pa.Table]:
+    """
+    Helper to turn Arrow record batches into a Table DuckDB can register and scan twice.
+    """
+    if isinstance(df, pa.RecordBatch):
+        return pa.Table.from_batches([df])
+    if isinstance(df, pa.RecordBatchReader):
+        return df.read_all()
+    return df
+
+
+def _column_names(df: Union[pd.DataFrame, pa.Table]) -> list:
+    if isinstance(df, pa.Table):
+        return df.column_names
+    return list(df.columns)
+
+
+def _is_empty(df: Union[pd.DataFrame, pa.Table]) -> bool:
+    if isinstance(df, pa.Table):
+        return df.num_rows == 0
+    return df.empty
 
 
 class DuckDBManager:
-    def __init__(self, db_dir: str = "database", db_name: str = "fit.db") -> None:
+    def __init__(
+        self,
+        db_dir: str = "database",
+        db_name: str = "fit.db",
+        pool_size: int = 4,
+        cache: bool = True,
+    ) -> None:
         """
         Initialize DuckDBManager.
 
         Args:
             db_dir (str): Directory where the database file is stored.
             db_name (str): Name of the database file.
+            pool_size (int): Maximum number of concurrent cursors on the shared
+                connection. Only used by the first manager for a given file.
+            cache (bool): Serve repeated SELECTs from the process-wide result
+                cache. Writes invalidate it either way.
         """
         self.db_dir = db_dir
         self.db_name = db_name
         self.db_path = os.path.join(db_dir, db_name)
+        self.pool_size = pool_size
+        self.cache = get_query_cache() if cache else None
         os.makedirs(db_dir, exist_ok=True)
 
     def _connect_to_database(self):
         """
-        Helper method to connect to the DuckDB database.
+        Helper method to borrow a cursor on the shared DuckDB connection.
+        """
+        return get_pool(self.db_path, self.pool_size).cursor()
+
+    def health_check(self) -> bool:
+        """
+        Check that the shared DuckDB connection can serve queries.
+
+        Returns:
+            bool: True if the database answered a test query.
+        """
+        return get_pool(self.db_path, self.pool_size).health_check()
+
+    def close(self) -> None:
+        """
+        Close the shared DuckDB connection for this database file.
+
+        Any manager for the same file reopens it on its next query.
+        """
+        get_pool(self.db_path, self.pool_size).close()
+        self._invalidate()
+
+    def _invalidate(self, tables: list = None) -> None:
+        """
+        Helper method to mark tables as written, or the whole database if None.
+        """
+        get_query_cache().bump(self.db_path, tables)
+
+    def table_version(self, table_name: str) -> tuple:
         """
-        return duckdb.connect(self.db_path)
+        Version of a table, changed by every write through a DuckDBManager.
+
+        Pass it to cached functions that read the table so they recompute
+        after a write.
+
+        Args:
+            table_name (str): Name of the table.
+
+        Returns:
+            tuple: Opaque, comparable version.
+        """
+        return get_query_cache().table_version(self.db_path, table_name)
+
+    def cache_stats(self) -> dict:
+        """
+        Hit and miss metrics of the process-wide result cache.
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries and bytes.
+        """
+        return get_query_cache().stats()
 
     def _handle_error(self, message: str, error: Exception):
         """
@@ -29,98 +145,590 @@ class DuckDBManager:
         """
         print(f"Error: {message} - {error}")
 
-    def setup_table(
-        self, table_name: str, df: pd.DataFrame, schema: dict = None
-    ) -> None:
+    def _typed_rows(self, table_name: str, df, schema: dict = None) -> str:
         """
-        Setup a table in DuckDB.
+        Helper method returning a SELECT over temp_table that casts the rows to
+        the table's declared schema, or takes them as they are without one.
+        """
+        schema = schema or get_schema(table_name)
+        if not schema:
+            return "SELECT * FROM temp_table"
+        return f"SELECT {cast_columns(schema, _column_names(df))} FROM temp_table"
+
+    def _index_definitions(self, con, table_name: str) -> list:
+        """
+        Helper method returning the CREATE INDEX statements of a table's
+        indexes, so they can be recreated after the table is rewritten.
+        """
+        return [
+            sql
+            for (sql,) in con.execute(
+                "SELECT sql FROM duckdb_indexes() WHERE table_name = ?", [table_name]
+            ).fetchall()
+        ]
+
+    def bulk_ingest(
+        self,
+        table_name: str,
+        df: TableData,
+        replace: bool = False,
+        schema: dict = None,
+    ) -> Dict[str, float]:
+        """
+        Write rows with one typed INSERT ... SELECT and time each stage.
+
+        Rows are cast to the table's schema from modules.schema inside DuckDB,
+        so reads come back typed and need no cleaning. Tables without a
+        schema take the rows as they are. A replaced table is written in its
+        declared sort order and keeps its indexes, appends queue a
+        maintenance() check in the background. Errors are raised, the write
+        is rolled back.
 
         Args:
             table_name (str): Name of the table.
-            df (pd.DataFrame): DataFrame to register as a table.
-            schema (Optional[Dict[str, str]]): Dictionary specifying the column names and their types.
+            df (TableData): DataFrame, Arrow table or record batches to write.
+            replace (bool): Replace the table instead of appending to it.
+            schema (Optional[Dict[str, str]]): Column types overriding the declared schema.
 
         Returns:
-            None
+            Dict[str, float]: Seconds spent registering the rows, inserting
+                them, maintaining personal bests and in total.
         """
-        if df.empty:
-            raise ValueError("df must be a non-empty DataFrame")
+        start = lap_start = time.perf_counter()
+        timings = {}
 
-        try:
-            with self._connect_to_database() as con:
-                con.register(table_name, df)
+        def lap(stage: str) -> None:
+            nonlocal lap_start
+            now = time.perf_counter()
+            timings[stage] = now - lap_start
+            lap_start = now
 
-                if schema:
-                    columns_with_types = ", ".join(
-                        f"{col} {dtype}" for col, dtype in schema.items()
-                    )
+        df = _as_table_data(df)
+        if _is_empty(df):
+            raise ValueError("df must be a non-empty DataFrame")
+        schema = schema or get_schema(table_name)
+        rows = self._typed_rows(table_name, df, schema)
+        columns = list(schema) if schema else _column_names(df)
+
+        lock = table_write_lock(self.db_path, table_name)
+        with lock, self._connect_to_database() as con:
+            # register under a temporary name so the view does not shadow
+            # the table on the pooled cursor once it is handed back
+            con.register("temp_table", df)
+            lap("register")
+            try:
+                con.begin()
+                indexes = self._index_definitions(con, table_name) if replace else []
+                if replace and schema:
                     con.execute(
-                        f"CREATE OR REPLACE TABLE {table_name} ({columns_with_types}) AS SELECT * FROM {table_name}"
+                        f"CREATE OR REPLACE TABLE {table_name} ({column_definitions(schema)})"
                     )
+                    rows += order_by(table_name)
+                if replace and not schema:
+                    con.execute(f"CREATE OR REPLACE TABLE {table_name} AS {rows}")
                 else:
-                    con.execute(
-                        f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {table_name}"
-                    )
+                    con.execute(f"INSERT INTO {table_name} {rows}")
+                for index in indexes:
+                    con.execute(index)
+                lap("insert")
+
+                if tracks_personal_bests(table_name, columns):
+                    if replace:
+                        rebuild_personal_bests(con)
+                    else:
+                        update_personal_bests(con, new_rows=f"({rows}) AS new_rows")
+                    lap("personal_bests")
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+            finally:
+                con.unregister("temp_table")
+                self._invalidate([table_name, PERSONAL_BESTS_TABLE])
+
+        if not replace:
+            self._record_write(table_name, len(df))
+        timings["total"] = time.perf_counter() - start
+        return timings
+
+    def _record_write(self, table_name: str, rows: int) -> None:
+        """
+        Helper method to count a write towards maintenance and queue a check
+        of what is due on the background maintenance thread. Maintenance
+        errors are printed there, the write itself already committed.
+        """
+        get_maintenance_schedule().record_write(self.db_path, table_name, rows)
+        get_background_maintenance().submit(
+            (self.db_path, table_name), lambda: self.maintain(table_name)
+        )
+
+    def maintain(self, table_name: str, force: bool = False) -> Dict[str, float]:
+        """
+        Run the maintenance the schedule in modules.maintenance says is due.
+
+        Compaction is due once enough rows were appended out of sort order.
+        ANALYZE and CHECKPOINT are due after a number of writes or some time.
+
+        Args:
+            table_name (str): Name of the table.
+            force (bool): Compact now, whatever the schedule says.
+
+        Returns:
+            Dict[str, float]: Seconds spent on each step that ran, empty if nothing was due.
+        """
+        schedule = get_maintenance_schedule()
+        if force:
+            due = ["compact"]
+        elif not schedule.needs_check(self.db_path, table_name):
+            return {}
+        else:
+            with self._connect_to_database() as con:
+                (table_rows,) = con.execute(
+                    f"SELECT count(*) FROM {table_name}"
+                ).fetchone()
+            due = schedule.due(self.db_path, table_name, table_rows)
+
+        if not due:
+            return {}
+        if "compact" in due and get_layout(table_name)["sort_by"]:
+            timings = self.compact_table(table_name)
+        else:
+            timings = self.analyze_table(table_name)
+        schedule.done(self.db_path, table_name, due[0])
+        return timings
+
+    def compact_table(self, table_name: str) -> Dict[str, float]:
+        """
+        Rewrite a table in its declared sort order, then ANALYZE and CHECKPOINT.
+
+        Sorted row groups have narrow min/max zone maps, so filters on the
+        leading sort columns skip most of the table. The table's indexes are
+        recreated. Writes to the table wait for the rewrite, see
+        table_write_lock in modules.maintenance. Errors are raised, the
+        rewrite is rolled back.
+
+        Args:
+            table_name (str): Name of the table, see TABLE_LAYOUTS in modules.schema.
+
+        Returns:
+            Dict[str, float]: Seconds spent rewriting, on ANALYZE, on
+                CHECKPOINT and in total.
+        """
+        start = time.perf_counter()
+        lock = table_write_lock(self.db_path, table_name)
+        with lock, self._connect_to_database() as con:
+            try:
+                con.begin()
+                indexes = self._index_definitions(con, table_name)
+                con.execute(
+                    f"CREATE OR REPLACE TABLE {table_name} AS "
+                    f"SELECT * FROM {table_name}{order_by(table_name)}"
+                )
+                for index in indexes:
+                    con.execute(index)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+            finally:
+                self._invalidate([table_name])
+        get_maintenance_schedule().done(self.db_path, table_name, "compact")
+
+        timings = {"rewrite": time.perf_counter() - start}
+        timings.update(self.analyze_table(table_name))
+        timings["total"] = time.perf_counter() - start
+        return timings
+
+    def analyze_table(self, table_name: str) -> Dict[str, float]:
+        """
+        Refresh a table's statistics and checkpoint the WAL into the database file.
+
+        CHECKPOINT is skipped with a message while another transaction is open.
+
+        Args:
+            table_name (str): Name of the table.
+
+        Returns:
+            Dict[str, float]: Seconds spent on ANALYZE and CHECKPOINT.
+        """
+        timings = {}
+        with self._connect_to_database() as con:
+            start = time.perf_counter()
+            con.execute(f"ANALYZE {table_name}")
+            timings["analyze"] = time.perf_counter() - start
+            start = time.perf_counter()
+            try:
+                con.execute("CHECKPOINT")
+            except Exception as e:
+                self._handle_error("Error checkpointing DuckDB database", e)
+            timings["checkpoint"] = time.perf_counter() - start
+        get_maintenance_schedule().done(self.db_path, table_name, "checkpoint")
+        return timings
+
+    def create_indexes(self, table_name: str) -> list:
+        """
+        Create the ART indexes declared for a table in TABLE_LAYOUTS.
+
+        Indexes speed up point lookups on their keys but slow down writes,
+        so they are opt-in. They survive compaction and replacing the table.
+
+        Args:
+            table_name (str): Name of the table.
+
+        Returns:
+            list: Names of the declared indexes.
+        """
+        indexes = get_layout(table_name)["indexes"]
+        with self._connect_to_database() as con:
+            for name, columns in indexes.items():
+                column_list = ", ".join(f'"{column}"' for column in columns)
+                con.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({column_list})"
+                )
+        return list(indexes)
+
+    def drop_indexes(self, table_name: str) -> list:
+        """
+        Drop every index on a table.
+
+        Args:
+            table_name (str): Name of the table.
+
+        Returns:
+            list: Names of the dropped indexes.
+        """
+        with self._connect_to_database() as con:
+            names = [
+                name
+                for (name,) in con.execute(
+                    "SELECT index_name FROM duckdb_indexes() WHERE table_name = ?",
+                    [table_name],
+                ).fetchall()
+            ]
+            for name in names:
+                con.execute(f"DROP INDEX {name}")
+        return names
+
+    def setup_table(self, table_name: str, df: TableData, schema: dict = None) -> None:
+        """
+        Setup a table in DuckDB.
+
+        Args:
+            table_name (str): Name of the table.
+            df (TableData): DataFrame, Arrow table or record batches to register as a table.
+            schema (Optional[Dict[str, str]]): Column types, defaults to the
+                table's schema in modules.schema.
+
+        Returns:
+            None
+        """
+        df = _as_table_data(df)
+        if _is_empty(df):
+            raise ValueError("df must be a non-empty DataFrame")
+
+        try:
+            self.bulk_ingest(table_name, df, replace=True, schema=schema)
         except Exception as e:
-            self._handle_error(f"Error setting up DuckDB table: {e}")
+            self._handle_error("Error setting up DuckDB table", e)
 
-    def get_data(self, table_name: str = None, query: str = None) -> pd.DataFrame:
+    def get_data(
+        self,
+        table_name: str = None,
+        query: str = None,
+        params: list = None,
+        format: str = "pandas",
+    ) -> pd.DataFrame:
         """
         Retrieve data from DuckDB.
 
+        SELECTs over tables are served from the result cache until one of
+        the tables is written to. Any other statement invalidates the cache
+        for this database.
+
         Args:
             table_name (str): Name of the table.
             query (str): SQL query to execute.
+            params (Optional[list]): Values for ``?`` placeholders in the query.
+            format (str): "pandas" for a NumPy-backed DataFrame, "arrow" for a
+                pyarrow.Table, "pandas_arrow" for a DataFrame of pd.ArrowDtype
+                columns or "polars" for a polars.DataFrame. The Arrow formats
+                skip the conversion to NumPy and Python string objects.
 
         Returns:
             pd.DataFrame: DataFrame containing the retrieved data.
         """
+        if format not in RESULT_FORMATS:
+            raise ValueError(f"Unknown result format {format}")
+        if format == "polars":
+            # optional dependency, only needed for this format
+            import polars
+
         try:
             with self._connect_to_database() as con:
                 if query is None:
                     query = f"SELECT * FROM {table_name}"
-                df = con.execute(query).fetchdf()
+
+                tables = None
+                if self.cache is not None:
+                    tables = cacheable_tables(con, query)
+                if tables:
+                    key = (self.db_path, normalize_sql(query), repr(params), format)
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        return cached
+                    versions = self.cache.versions(self.db_path, tables)
+
+                try:
+                    result = con.execute(query, params)
+                finally:
+                    if not is_select(query):
+                        self._invalidate()
+                if format == "pandas":
+                    df = result.fetchdf()
+                elif format == "arrow":
+                    df = result.arrow()
+                elif format == "pandas_arrow":
+                    df = result.arrow().to_pandas(types_mapper=pd.ArrowDtype)
+                else:
+                    df = polars.from_arrow(result.arrow())
+                if tables:
+                    self.cache.put(key, df, tables, versions)
                 return df
         except Exception as e:
-            self._handle_error(f"Error fetching data from DuckDB: {e}")
+            self._handle_error("Error fetching data from DuckDB", e)
+
+    def iter_batches(
+        self,
+        query: str,
+        batch_size: int = 100_000,
+        params: list = None,
+        format: str = "arrow",
+    ) -> Iterator[Union[pa.RecordBatch, pd.DataFrame]]:
+        """
+        Stream the result of a SELECT in batches, so memory stays bounded by the batch size.
+
+        The cursor stays checked out of the pool until the iterator is
+        exhausted or closed. Results are never cached, and errors are raised
+        rather than ending the stream early.
+
+        Args:
+            query (str): SELECT query to execute.
+            batch_size (int): Maximum rows per batch.
+            params (Optional[list]): Values for ``?`` placeholders in the query.
+            format (str): "arrow" for pyarrow.RecordBatch, "pandas" or
+                "pandas_arrow" for DataFrame chunks, see get_data.
 
-    def execute_query(self, query: str) -> None:
+        Yields:
+            Union[pa.RecordBatch, pd.DataFrame]: The next batch of rows.
+        """
+        if format not in ("arrow", "pandas", "pandas_arrow"):
+            raise ValueError(f"Unknown batch format {format}")
+        if not is_select(query):
+            raise ValueError("iter_batches only runs a single SELECT statement")
+
+        with self._connect_to_database() as con:
+            reader = con.execute(query, params).fetch_record_batch(batch_size)
+            for batch in reader:
+                if format == "arrow":
+                    yield batch
+                elif format == "pandas_arrow":
+                    yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+                else:
+                    yield batch.to_pandas()
+
+    def get_exercise_history(
+        self,
+        exercise: str,
+        table_name: str = "historic_exercises",
+        format: str = "pandas",
+    ) -> pd.DataFrame:
+        """
+        Retrieve every set of one exercise, oldest first, for the performance chart.
+
+        Args:
+            exercise (str): Exercise to retrieve.
+            table_name (str): Name of the lifts table.
+            format (str): Result format, see get_data.
+
+        Returns:
+            pd.DataFrame: Day, Weight, Reps, Notes and User of each set.
+        """
+        return self.get_data(
+            query=f"""
+            SELECT Day, Weight, Reps, Notes, User
+            FROM {table_name}
+            WHERE Exercise = ?
+            ORDER BY Day
+            """,
+            params=[exercise],
+            format=format,
+        )
+
+    def get_personal_bests(self, exercises: list, format: str = "pandas") -> pd.DataFrame:
+        """
+        Retrieve each user's heaviest set of each exercise.
+
+        Reads the personal bests table, so the cost does not grow with the
+        lift history. Ties on weight go to the earliest day, then to the
+        most reps.
+
+        Args:
+            exercises (list): Exercises to retrieve.
+            format (str): Result format, see get_data.
+
+        Returns:
+            pd.DataFrame: One row per user and exercise, ordered by user and
+                exercise descending.
+        """
+        tables = self.get_data(
+            query="SELECT 1 FROM duckdb_tables() WHERE table_name = ?",
+            params=[PERSONAL_BESTS_TABLE],
+        )
+        if tables is not None and tables.empty:
+            self.rebuild_personal_bests()
+
+        return self.get_data(
+            query=f"""
+            SELECT Day, Exercise, Weight, Reps, Notes, User
+            FROM {PERSONAL_BESTS_TABLE}
+            WHERE list_contains(?::VARCHAR[], Exercise)
+            QUALIFY row_number() OVER (
+                PARTITION BY User, Exercise
+                ORDER BY Weight DESC, Day ASC, Reps DESC
+            ) = 1
+            ORDER BY User DESC, Exercise DESC
+            """,
+            params=[list(exercises)],
+            format=format,
+        )
+
+    def get_reduced_lifts(
+        self, table_name: str = "historic_exercises", format: str = "pandas"
+    ) -> pd.DataFrame:
+        """
+        Fetch the lift history with only the latest run of each set.
+
+        SQL version of util.reduce_dataframe_size, so the full history
+        never leaves DuckDB. Rows come back in no particular order.
+
+        Args:
+            table_name (str): Name of the lifts table.
+            format (str): Result format, one of RESULT_FORMATS.
+
+        Returns:
+            pd.DataFrame: The table's columns, one row per set.
+        """
+        return self.get_data(
+            query=latest_by_hash_query(table_name, REDUCE_KEYS, order_column="Day"),
+            format=format,
+        )
+
+    def rebuild_personal_bests(self) -> None:
+        """
+        Recompute the personal bests table from the full lift history.
+
+        Appends keep the table up to date, this repairs it after the lift
+        history was edited some other way.
+        """
+        try:
+            with self._connect_to_database() as con:
+                try:
+                    rebuild_personal_bests(con)
+                finally:
+                    self._invalidate([PERSONAL_BESTS_TABLE])
+        except Exception as e:
+            self._handle_error("Error rebuilding personal bests", e)
+
+    def execute_query(self, query: str, params: list = None) -> None:
         """
         Execute a SQL query in DuckDB.
 
+        The statement's target table can't be told from the query reliably,
+        so it invalidates the result cache for the whole database.
+
         Args:
             query (str): SQL query to execute.
+            params (Optional[list]): Values for ``?`` placeholders in the query.
 
         Returns:
             None
         """
         try:
             with self._connect_to_database() as con:
-                con.execute(query)
+                try:
+                    con.execute(query, params)
+                finally:
+                    self._invalidate()
         except Exception as e:
-            self._handle_error(f"Error executing DuckDB query: {e}")
+            self._handle_error("Error executing DuckDB query", e)
 
-    def append_to_table(self, df: pd.DataFrame, table_name: str) -> None:
+    def append_to_table(self, df: TableData, table_name: str) -> bool:
         """
-        Append data to a table in DuckDB.
+        Append data to a table in DuckDB, cast to the table's schema.
 
         Args:
-            df (pd.DataFrame): DataFrame containing data to append.
+            df (TableData): DataFrame, Arrow table or record batches to append.
             table_name (str): Name of the table.
 
         Returns:
-            None
+            bool: True if the rows were appended.
         """
         try:
-            with self._connect_to_database() as con:
-                if df.empty:
-                    print("Error: The DataFrame df is empty.")
-                    return
+            df = _as_table_data(df)
+            if _is_empty(df):
+                print("Error: The DataFrame df is empty.")
+                return False
+
+            self.bulk_ingest(table_name, df)
+            return True
+        except Exception as e:
+            self._handle_error("Error appending to DuckDB table", e)
+            return False
 
+    def upsert_to_table(self, df: TableData, table_name: str, key_columns: list) -> bool:
+        """
+        Replace rows whose key matches a row of df, then insert df, in one transaction.
+
+        Args:
+            df (TableData): DataFrame, Arrow table or record batches to write.
+            table_name (str): Name of the table.
+            key_columns (list): Columns identifying a row.
+
+        Returns:
+            bool: True if the rows were written.
+        """
+        df = _as_table_data(df)
+        if _is_empty(df):
+            print("Error: The DataFrame df is empty.")
+            return False
+
+        matches = " AND ".join(
+            f'{table_name}."{col}" = new_rows."{col}"' for col in key_columns
+        )
+        try:
+            rows = self._typed_rows(table_name, df)
+            lock = table_write_lock(self.db_path, table_name)
+            with lock, self._connect_to_database() as con:
                 con.register("temp_table", df)
-                con.execute(f"INSERT INTO {table_name} SELECT * FROM temp_table")
+                try:
+                    con.begin()
+                    con.execute(
+                        f"DELETE FROM {table_name} WHERE EXISTS "
+                        f"(SELECT 1 FROM ({rows}) AS new_rows WHERE {matches})"
+                    )
+                    con.execute(f"INSERT INTO {table_name} {rows}")
+                    con.commit()
+                except Exception:
+                    con.rollback()
+                    raise
+                finally:
+                    con.unregister("temp_table")
+                    self._invalidate([table_name])
+            self._record_write(table_name, len(df))
+            return True
         except Exception as e:
-            self._handle_error(f"Error appending to DuckDB table: {e}")
+            self._handle_error("Error upserting to DuckDB table", e)
+            return False
 
 
 if __name__ == "__main__":
@@ -1,69 +1,278 @@
+import numpy as np
 import pandas as pd
 import gspread as gs
 import gspread_dataframe as gd
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from numbers import Real
+from google.auth.exceptions import RefreshError
 
+# per-worksheet delta-sync state, keyed by (sheet_url, sheet_name)
+_sync_state = {}
 
-def google_sheet_auth(sheet_url: str, sheet_name: str, credentials: dict) -> tuple:
+# authorised clients, spreadsheets and worksheets are reused for this many seconds
+HANDLE_TTL = 30 * 60
+
+_handles = {}
+_handles_lock = threading.Lock()
+_auth_round_trips = {"authorize": 0, "open_by_url": 0, "worksheet": 0}
+_clock = time.monotonic
+
+# how each worksheet is normalised after loading: upper-case string columns,
+# and which low-cardinality columns to store as category
+SHEET_NORMALISATION = {
+    "Lifts": {"upper": True, "categorical": ["Exercise", "User"]},
+    "Exercises": {"upper": True, "categorical": []},
+}
+DEFAULT_NORMALISATION = {"upper": True, "categorical": []}
+
+
+def _credentials_key(credentials: dict) -> str:
+    """
+    Stable cache key for a credentials dict without keeping the secret in the key
+    :param credentials: dict, google sheet credentials from service_account.json
+    :return: str, sha256 of the credentials
+    """
+    payload = json.dumps(dict(credentials), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cached_handle(key: tuple, kind: str, create):
+    """
+    Return a cached handle, creating it (and counting the round-trip) if missing or expired
+    :param key: tuple, cache key
+    :param kind: str, round-trip counter to increment on a miss
+    :param create: callable, builds the handle
+    :return: the cached handle
+    """
+    with _handles_lock:
+        cached = _handles.get(key)
+        if cached is not None and _clock() - cached[1] < HANDLE_TTL:
+            return cached[0]
+
+    handle = create()
+    with _handles_lock:
+        _auth_round_trips[kind] += 1
+        _handles[key] = (handle, _clock())
+    return handle
+
+
+def _evict_handles(cred_key: str) -> None:
+    """
+    Drop every cached handle built from one set of credentials
+    :param cred_key: str, key from _credentials_key
+    """
+    with _handles_lock:
+        for key in [key for key in _handles if key[1] == cred_key]:
+            del _handles[key]
+
+
+def clear_handle_cache() -> None:
+    """
+    Drop all cached clients, spreadsheets and worksheets
+    """
+    with _handles_lock:
+        _handles.clear()
+
+
+def auth_round_trips() -> dict:
+    """
+    Number of authorise / open / worksheet round-trips made by this process
+    :return: dict, counts keyed by round-trip kind
+    """
+    with _handles_lock:
+        return dict(_auth_round_trips)
+
+
+@contextmanager
+def track_auth_round_trips():
+    """
+    Count the auth round-trips made inside a with block, e.g. one page render.
+    Counts are process-wide, so concurrent sessions are included.
+    :return: dict, filled with counts keyed by round-trip kind when the block exits
     """
-    Authenticate connection to google sheet and return worksheet object
+    before = auth_round_trips()
+    counts = {}
+    try:
+        yield counts
+    finally:
+        after = auth_round_trips()
+        counts.update({kind: after[kind] - before[kind] for kind in after})
+        counts["total"] = sum(after.values()) - sum(before.values())
+
+
+def _is_auth_error(error: Exception) -> bool:
+    """
+    Whether an error means the cached client needs re-authorising
+    :param error: Exception, the error raised by gspread
+    :return: bool
+    """
+    if isinstance(error, RefreshError):
+        return True
+    if isinstance(error, gs.exceptions.APIError):
+        return getattr(error.response, "status_code", None) in (401, 403)
+    return False
+
+
+def google_sheet_auth(sheet_url: str, sheet_name: str, credentials: dict):
+    """
+    Authenticate connection to google sheet and return worksheet object.
+    Clients, spreadsheets and worksheets are cached for HANDLE_TTL seconds.
     :param sheet_url: str, url of the google sheet
     :param sheet_name: str, name of the worksheet in the google sheet
     :param credentials: dict, google sheet credentials from service_account.json
-    :return: tuple, (gs.Client, gs.Worksheet)
+    :return: gs.Worksheet
+    """
+    cred_key = _credentials_key(credentials)
+
+    def authorize():
+        try:
+            return gs.service_account_from_dict(credentials)
+        except Exception as e:
+            raise ValueError(f"Invalid credentials {e}")
+
+    gc = _cached_handle(("client", cred_key), "authorize", authorize)
+
+    # open from url
+    sh = _cached_handle(
+        ("spreadsheet", cred_key, sheet_url),
+        "open_by_url",
+        lambda: gc.open_by_url(sheet_url),
+    )
+
+    return _cached_handle(
+        ("worksheet", cred_key, sheet_url, sheet_name),
+        "worksheet",
+        lambda: sh.worksheet(sheet_name),
+    )
+
+
+def _with_worksheet(sheet_url: str, sheet_name: str, credentials: dict, action):
+    """
+    Run action on the cached worksheet, re-authorising once on an auth error
+    :param sheet_url: str, url of the google sheet
+    :param sheet_name: str, name of the worksheet in the google sheet
+    :param credentials: dict, google sheet credentials from service_account.json
+    :param action: callable, receives the gs.Worksheet
+    :return: the result of action
     """
     try:
-        gc = gs.service_account_from_dict(credentials)
+        return action(google_sheet_auth(sheet_url, sheet_name, credentials))
     except Exception as e:
-        raise ValueError(f"Invalid credentials {e}")
+        if not _is_auth_error(e):
+            raise
+        _evict_handles(_credentials_key(credentials))
+        return action(google_sheet_auth(sheet_url, sheet_name, credentials))
 
-    # open from url
-    sh = gc.open_by_url(sheet_url)
 
-    return sh.worksheet(sheet_name)
+def normalise_sheet_data(
+    df: pd.DataFrame,
+    upper: bool = True,
+    categorical: list = None,
+    max_category_ratio: float = 0.5,
+) -> pd.DataFrame:
+    """
+    Normalise a worksheet dataframe column by column with vectorised string operations
+    :param df: pd.DataFrame, the worksheet data
+    :param upper: bool, upper-case the string values of object/string columns
+    :param categorical: list, columns to convert to category dtype
+    :param max_category_ratio: float, only convert a column if its unique values are at most this share of its rows
+    :return: pd.DataFrame, the normalised data
+    """
+    df = df.copy()
+    categorical = set(categorical or [])
+
+    for column in df.columns:
+        values = df[column]
+        is_text = values.dtype == object or isinstance(values.dtype, pd.StringDtype)
+
+        if upper and is_text:
+            # upper-case each distinct value once and broadcast back with the codes,
+            # sheet columns repeat the same few exercises and users many times
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            uniques = np.array(
+                [u.upper() if isinstance(u, str) else u for u in uniques] + [None],
+                dtype=object,
+            )
+            values = pd.Series(
+                np.where(codes == -1, values.to_numpy(dtype=object), uniques[codes]),
+                index=values.index,
+                name=column,
+            )
+
+        if (
+            column in categorical
+            and is_text
+            and values.nunique() <= max_category_ratio * len(values)
+        ):
+            values = values.astype("category")
+
+        df[column] = values
+
+    return df
 
 
 def get_google_sheet(
-    sheet_url: str, sheet_name: str, credentials: dict
+    sheet_url: str, sheet_name: str, credentials: dict, normalisation: dict = None
 ) -> pd.DataFrame:
     """
     Retrieve data from google sheet and convert it to a pandas dataframe
     :param sheet_url: str, url of google sheet
     :param sheet_name: str, name of the worksheet in the google sheet
     :param credentials: dict, google sheet credentials from service_account.json
+    :param normalisation: dict, keyword arguments for normalise_sheet_data, defaults to SHEET_NORMALISATION for the worksheet
     :return: pd.DataFrame, the data from the google sheet in a pandas dataframe
     """
-    # select workbook
-    sheet = google_sheet_auth(sheet_url, sheet_name, credentials)
-
-    # create Data Frame
-    df = pd.DataFrame(sheet.get_all_records())
+    # select workbook and create Data Frame
+    df = pd.DataFrame(
+        _with_worksheet(
+            sheet_url, sheet_name, credentials, lambda sheet: sheet.get_all_records()
+        )
+    )
 
     # convert all string columns to upper case
-    df = df.applymap(lambda s: s.upper() if type(s) == str else s)
+    if normalisation is None:
+        normalisation = SHEET_NORMALISATION.get(sheet_name, DEFAULT_NORMALISATION)
+    df = normalise_sheet_data(df, **normalisation)
 
     return df
 
 
-def export_to_google_sheets(
-    sheet_url: str, sheet_name: str, df_new: pd.DataFrame, credentials: dict
-) -> None:
+def _row_keys(df: pd.DataFrame) -> pd.Series:
     """
-    Export dataframe to google sheet
-    :param sheet_url: str, url of the google sheet
-    :param sheet_name: str, name of the worksheet in the google sheet
-    :param df_new: pd.DataFrame, the dataframe containing the data to be exported
-    :param credentials: dict, google sheet credentials from service_account.json
+    Identify rows for delta-sync, by set_id if present else by content hash
+    :param df: pd.DataFrame, rows to identify
+    :return: pd.Series, one string key per row
     """
+    if "set_id" in df.columns:
+        return df["set_id"].astype(str)
+    return pd.util.hash_pandas_object(df, index=False).astype(str)
 
-    # Include some error handling to make sure input dataframe is not empty
-    # if df_new.empty:
-    #     raise ValueError("Input dataframe is empty")
 
-    # select workbook
-    sheet = google_sheet_auth(sheet_url, sheet_name, credentials)
+def _cell_value(value):
+    """
+    Convert a dataframe value to a value the Sheets API accepts, matching gspread_dataframe
+    :param value: the value to convert
+    :return: a number, or the value as a string ("" for nulls)
+    """
+    if pd.isnull(value) is True:
+        return ""
+    if isinstance(value, Real):
+        return value.item() if hasattr(value, "item") else value
+    return str(value)
 
-    # add rows from df
-    df_current = get_google_sheet(sheet_url, sheet_name, credentials)
+
+def rewrite_worksheet(sheet, df_new: pd.DataFrame) -> list:
+    """
+    Rewrite a worksheet with its current rows followed by df_new
+    :param sheet: gs.Worksheet, the worksheet to rewrite
+    :param df_new: pd.DataFrame, the rows to add
+    :return: list, the header written to the worksheet
+    """
+    df_current = pd.DataFrame(sheet.get_all_records())
 
     # concat new data with existing
     final_df = pd.concat([df_current, df_new], join="outer")
@@ -79,3 +288,81 @@ def export_to_google_sheets(
         include_column_header=True,
         resize=True,
     )
+
+    return list(final_df.columns)
+
+
+def sync_worksheet(sheet, df_new: pd.DataFrame, state: dict) -> str:
+    """
+    Push rows of df_new not yet synced to the worksheet.
+
+    New rows are sent in a single append call. The worksheet is only rewritten
+    in full when its header no longer matches the columns of df_new.
+    :param sheet: gs.Worksheet, the worksheet to sync to
+    :param df_new: pd.DataFrame, rows to sync, optionally with a set_id column used as the row key
+    :param state: dict, sync state for this worksheet, updated in place
+    :return: str, "noop", "append" or "rewrite"
+    """
+    keys = _row_keys(df_new)
+    synced_keys = state.setdefault("synced_keys", set())
+    new_rows = ~keys.isin(synced_keys)
+    if not new_rows.any():
+        return "noop"
+
+    df_new = df_new.drop(columns="set_id", errors="ignore").loc[new_rows.values]
+
+    header = state.get("header")
+    if header is None:
+        header = sheet.row_values(1)
+
+    if header and set(header) == set(df_new.columns):
+        values = [
+            [_cell_value(value) for value in row]
+            for row in df_new[header].itertuples(index=False)
+        ]
+        sheet.append_rows(
+            values, value_input_option="USER_ENTERED", table_range="A1"
+        )
+        action = "append"
+    else:
+        # schema drift (or an empty worksheet), fall back to a full rewrite
+        header = rewrite_worksheet(sheet, df_new)
+        action = "rewrite"
+
+    state["header"] = list(header)
+    synced_keys.update(keys[new_rows.values])
+    return action
+
+
+def export_to_google_sheets(
+    sheet_url: str,
+    sheet_name: str,
+    df_new: pd.DataFrame,
+    credentials: dict,
+    mode: str = "delta",
+) -> None:
+    """
+    Export dataframe to google sheet
+    :param sheet_url: str, url of the google sheet
+    :param sheet_name: str, name of the worksheet in the google sheet
+    :param df_new: pd.DataFrame, the dataframe containing the data to be exported
+    :param credentials: dict, google sheet credentials from service_account.json
+    :param mode: str, "delta" to append only rows not yet synced, "full" to rewrite the worksheet
+    """
+
+    # Include some error handling to make sure input dataframe is not empty
+    # if df_new.empty:
+    #     raise ValueError("Input dataframe is empty")
+
+    if mode not in ("delta", "full"):
+        raise ValueError(f"Unknown export mode {mode}")
+
+    def export(sheet):
+        if mode == "delta":
+            return sync_worksheet(
+                sheet, df_new, _sync_state.setdefault((sheet_url, sheet_name), {})
+            )
+        return rewrite_worksheet(sheet, df_new.drop(columns="set_id", errors="ignore"))
+
+    # select workbook
+    _with_worksheet(sheet_url, sheet_name, credentials, export)
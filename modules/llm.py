@@ -0,0 +1,248 @@
+import threading
+import time
+from typing import Iterator, List, Optional
+
+import openai
+from openai import OpenAI
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+# seconds a request may wait to connect or for its next token
+DEFAULT_TIMEOUT = 60.0
+
+
+class OpenAIBackend:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = 2,
+    ) -> None:
+        """
+        Chat completions from an OpenAI-compatible API.
+
+        One OpenAI client is kept for the backend's lifetime, so requests
+        reuse its HTTP connection pool instead of opening a connection each.
+
+        Args:
+            base_url (Optional[str]): API root, defaults to OPENAI_BASE_URL or OpenAI's.
+            api_key (Optional[str]): API key, defaults to OPENAI_API_KEY.
+            timeout (float): Default seconds to wait to connect or for the next token.
+            max_retries (int): Retries of failed connections and 429/5xx responses.
+        """
+        self.client = OpenAI(
+            base_url=base_url, api_key=api_key, timeout=timeout, max_retries=max_retries
+        )
+
+    def stream(
+        self, messages: List[dict], model: str, timeout: Optional[float] = None
+    ) -> Iterator[str]:
+        """
+        Stream a completion's text as it is generated.
+
+        Closing the generator closes the HTTP response, which cancels the
+        completion server-side.
+
+        Args:
+            messages (List[dict]): Chat messages with role and content.
+            model (str): Model name.
+            timeout (Optional[float]): Seconds to wait to connect or for the
+                next token, defaults to the backend's.
+
+        Yields:
+            str: Text deltas.
+
+        Raises:
+            TimeoutError: If the API did not respond in time.
+        """
+        options = {} if timeout is None else {"timeout": timeout}
+        try:
+            response = self.client.chat.completions.create(
+                messages=messages, model=model, stream=True, **options
+            )
+        except openai.APITimeoutError as e:
+            raise TimeoutError("LLM request timed out") from e
+
+        try:
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except openai.APITimeoutError as e:
+            raise TimeoutError("LLM response timed out") from e
+        finally:
+            response.close()
+
+    def complete(
+        self, messages: List[dict], model: str, timeout: Optional[float] = None
+    ) -> str:
+        """
+        Wait for a whole completion in one response.
+
+        Args:
+            messages (List[dict]): Chat messages with role and content.
+            model (str): Model name.
+            timeout (Optional[float]): Seconds to wait for the response,
+                defaults to the backend's.
+
+        Returns:
+            str: Completion text.
+
+        Raises:
+            TimeoutError: If the API did not respond in time.
+        """
+        options = {} if timeout is None else {"timeout": timeout}
+        try:
+            response = self.client.chat.completions.create(
+                messages=messages, model=model, **options
+            )
+        except openai.APITimeoutError as e:
+            raise TimeoutError("LLM request timed out") from e
+        return response.choices[0].message.content or ""
+
+    def close(self) -> None:
+        """Close the HTTP connection pool."""
+        self.client.close()
+
+
+class LLMClient:
+    def __init__(
+        self,
+        backend=None,
+        model: str = DEFAULT_MODEL,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Streams chat completions from a pluggable backend.
+
+        A backend is any object with ``stream(messages, model, timeout)``
+        yielding text deltas, e.g. OpenAIBackend pointed at a local
+        OpenAI-compatible server.
+
+        Args:
+            backend: Backend to call, defaults to an OpenAIBackend created on first use.
+            model (str): Default model name.
+            timeout (float): Default seconds to wait for each token.
+        """
+        self._backend = backend
+        self.model = model
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        with self._lock:
+            if self._backend is None:
+                self._backend = OpenAIBackend(timeout=self.timeout)
+            return self._backend
+
+    def stream(
+        self,
+        messages: List[dict],
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        cancel: Optional[threading.Event] = None,
+        stats: Optional[dict] = None,
+    ) -> Iterator[str]:
+        """
+        Stream a completion, e.g. into st.write_stream.
+
+        Streaming stops when cancel is set or the generator is closed, as
+        Streamlit does when the script is rerun mid-stream, and the backend
+        request is closed with it.
+
+        Args:
+            messages (List[dict]): Chat messages with role and content, other keys are dropped.
+            model (Optional[str]): Model name, defaults to the client's.
+            timeout (Optional[float]): Seconds to wait for each token, defaults to the client's.
+            deadline (Optional[float]): Seconds the whole completion may take.
+            cancel (Optional[threading.Event]): Set to stop streaming.
+            stats (Optional[dict]): Filled with time_to_first_token and total
+                seconds, chunks received and whether the stream was cancelled.
+
+        Yields:
+            str: Text deltas.
+
+        Raises:
+            TimeoutError: If a token or the whole completion took too long.
+        """
+        stats = {} if stats is None else stats
+        stats.update(time_to_first_token=None, chunks=0, cancelled=False)
+        messages = [{"role": m["role"], "content": m["content"]} for m in messages]
+        start = time.perf_counter()
+        chunks = self.backend.stream(
+            messages,
+            model or self.model,
+            self.timeout if timeout is None else timeout,
+        )
+        try:
+            for text in chunks:
+                if cancel is not None and cancel.is_set():
+                    stats["cancelled"] = True
+                    return
+                if deadline is not None and time.perf_counter() - start > deadline:
+                    raise TimeoutError(f"LLM completion took over {deadline}s")
+                if stats["time_to_first_token"] is None:
+                    stats["time_to_first_token"] = time.perf_counter() - start
+                stats["chunks"] += 1
+                yield text
+        except GeneratorExit:
+            stats["cancelled"] = True
+            raise
+        finally:
+            chunks.close()
+            stats["total"] = time.perf_counter() - start
+
+    def complete(
+        self,
+        messages: List[dict],
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        stats: Optional[dict] = None,
+    ) -> str:
+        """
+        Wait for the whole completion, for callers that don't render tokens.
+
+        Uses the backend's ``complete`` if it has one, else joins the stream.
+
+        Args:
+            messages (List[dict]): Chat messages with role and content.
+            model (Optional[str]): Model name, defaults to the client's.
+            timeout (Optional[float]): Seconds to wait, defaults to the client's.
+            stats (Optional[dict]): Filled with the total seconds.
+
+        Returns:
+            str: Completion text.
+        """
+        if not hasattr(self.backend, "complete"):
+            return "".join(self.stream(messages, model, timeout, stats=stats))
+
+        stats = {} if stats is None else stats
+        start = time.perf_counter()
+        try:
+            return self.backend.complete(
+                [{"role": m["role"], "content": m["content"]} for m in messages],
+                model or self.model,
+                self.timeout if timeout is None else timeout,
+            )
+        finally:
+            stats["total"] = time.perf_counter() - start
+
+
+_client = LLMClient()
+
+
+def get_llm_client() -> LLMClient:
+    """Returns the process-wide LLM client shared by every session."""
+    return _client
+
+
+def set_llm_backend(backend) -> None:
+    """
+    Replace the shared client's backend, e.g. with a local OpenAI-compatible server.
+
+    Args:
+        backend: Object with ``stream(messages, model, timeout)`` yielding text deltas.
+    """
+    with _client._lock:
+        _client._backend = backend
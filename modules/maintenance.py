@@ -0,0 +1,193 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class MaintenanceSchedule:
+    def __init__(
+        self,
+        compact_after_rows: int = 10_000,
+        compact_fraction: float = 0.1,
+        checkpoint_after_writes: int = 50,
+        checkpoint_interval: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Decides when a table's physical layout needs maintenance.
+
+        Appended rows land unsorted at the end of a table. Once enough of
+        them pile up the table is compacted back into its sort order.
+        Statistics are refreshed and the WAL checkpointed after a number of
+        writes or some time, whichever comes first.
+
+        Args:
+            compact_after_rows (int): Minimum unsorted rows before compacting.
+            compact_fraction (float): Compact once unsorted rows are also
+                this fraction of the table.
+            checkpoint_after_writes (int): Writes between ANALYZE and CHECKPOINT runs.
+            checkpoint_interval (float): Seconds between ANALYZE and CHECKPOINT
+                runs on a table that is being written to.
+            clock (Callable[[], float]): Time source, overridable for tests.
+        """
+        self.compact_after_rows = compact_after_rows
+        self.compact_fraction = compact_fraction
+        self.checkpoint_after_writes = checkpoint_after_writes
+        self.checkpoint_interval = checkpoint_interval
+        self._clock = clock
+        self._unsorted: Dict[Tuple[str, str], int] = {}
+        self._writes: Dict[Tuple[str, str], int] = {}
+        self._checkpointed: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def record_write(self, db_path: str, table_name: str, rows: int) -> None:
+        """
+        Record rows appended to a table.
+
+        Args:
+            db_path (str): Path of the database file.
+            table_name (str): Name of the table.
+            rows (int): Rows appended.
+        """
+        key = (db_path, table_name)
+        with self._lock:
+            self._unsorted[key] = self._unsorted.get(key, 0) + rows
+            self._writes[key] = self._writes.get(key, 0) + 1
+            self._checkpointed.setdefault(key, self._clock())
+
+    def due(self, db_path: str, table_name: str, table_rows: int) -> List[str]:
+        """
+        Maintenance tasks due for a table.
+
+        Args:
+            db_path (str): Path of the database file.
+            table_name (str): Name of the table.
+            table_rows (int): Current rows in the table.
+
+        Returns:
+            List[str]: "compact" (which includes the rest) or "checkpoint", or nothing.
+        """
+        key = (db_path, table_name)
+        with self._lock:
+            unsorted = self._unsorted.get(key, 0)
+            if unsorted >= max(
+                self.compact_after_rows, self.compact_fraction * table_rows
+            ):
+                return ["compact"]
+            writes = self._writes.get(key, 0)
+            if writes >= self.checkpoint_after_writes or (
+                writes
+                and self._clock() - self._checkpointed[key] >= self.checkpoint_interval
+            ):
+                return ["checkpoint"]
+            return []
+
+    def done(self, db_path: str, table_name: str, task: str) -> None:
+        """
+        Record that a maintenance task ran.
+
+        Args:
+            db_path (str): Path of the database file.
+            table_name (str): Name of the table.
+            task (str): "compact" or "checkpoint".
+        """
+        key = (db_path, table_name)
+        with self._lock:
+            if task == "compact":
+                self._unsorted[key] = 0
+            self._writes[key] = 0
+            self._checkpointed[key] = self._clock()
+
+    def needs_check(self, db_path: str, table_name: str) -> bool:
+        """
+        Whether anything was written since the last maintenance.
+
+        Args:
+            db_path (str): Path of the database file.
+            table_name (str): Name of the table.
+
+        Returns:
+            bool: False if no write was recorded, so due() can be skipped.
+        """
+        with self._lock:
+            return self._writes.get((db_path, table_name), 0) > 0
+
+
+class BackgroundMaintenance:
+    def __init__(self) -> None:
+        """
+        Runs table maintenance on one background thread, off the request path.
+
+        A write only queues a check, so a form save doesn't wait for a
+        compaction of the whole history. One thread means maintenance tasks
+        never run concurrently with each other. A table has at most one
+        queued check, and a write made while its check runs queues another.
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="duckdb-maintenance"
+        )
+        self._queued: set = set()
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, task: Callable[[], None]) -> Optional[Future]:
+        """
+        Queue a maintenance task unless one for the same key is already waiting.
+
+        Args:
+            key (Hashable): What the task maintains, e.g. (db_path, table_name).
+            task (Callable[[], None]): The task. Errors are printed, not raised.
+
+        Returns:
+            Optional[Future]: The queued task, None if one was already waiting.
+        """
+        with self._lock:
+            if key in self._queued:
+                return None
+            self._queued.add(key)
+
+        def run() -> None:
+            with self._lock:
+                self._queued.discard(key)
+            try:
+                task()
+            except Exception as e:
+                print(f"Error: Error maintaining DuckDB table - {e}")
+
+        return self._executor.submit(run)
+
+    def wait(self) -> None:
+        """Block until every task queued so far has run."""
+        self._executor.submit(lambda: None).result()
+
+
+_schedule = MaintenanceSchedule()
+_background = BackgroundMaintenance()
+_table_locks: Dict[Tuple[str, str], threading.RLock] = {}
+_table_locks_lock = threading.Lock()
+
+
+def get_maintenance_schedule() -> MaintenanceSchedule:
+    """Returns the process-wide maintenance schedule."""
+    return _schedule
+
+
+def get_background_maintenance() -> BackgroundMaintenance:
+    """Returns the process-wide background maintenance thread."""
+    return _background
+
+
+def table_write_lock(db_path: str, table_name: str) -> threading.RLock:
+    """
+    Returns the process-wide lock serialising writes to a table with its rewrites.
+
+    A compaction rewrites the table from its own snapshot, so rows another
+    cursor commits while it runs would be lost. Appends, upserts and
+    rewrites of a table all hold its lock.
+
+    Args:
+        db_path (str): Path of the database file.
+        table_name (str): Name of the table.
+    """
+    key = (db_path, table_name)
+    with _table_locks_lock:
+        return _table_locks.setdefault(key, threading.RLock())
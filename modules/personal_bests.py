@@ -0,0 +1,109 @@
+import duckdb as duckdb
+
+# personal_bests holds the heaviest set of each (User, Exercise, Reps) in
+# historic_exercises, ties going to the earliest day. It is kept up to date by
+# DuckDBManager.append_to_table and rebuilt whenever the lifts table is replaced.
+LIFTS_TABLE = "historic_exercises"
+PERSONAL_BESTS_TABLE = "personal_bests"
+PERSONAL_BEST_COLUMNS = "User, Exercise, Reps, Weight, Day, Notes"
+PERSONAL_BEST_KEYS = ["User", "Exercise", "Reps"]
+
+# best set per key among the rows of {source}
+BEST_SETS_QUERY = f"""
+SELECT {PERSONAL_BEST_COLUMNS}
+FROM {{source}}
+WHERE Weight IS NOT NULL
+QUALIFY row_number() OVER (
+    PARTITION BY User, Exercise, Reps ORDER BY Weight DESC, Day ASC
+) = 1
+"""
+
+# joins stored personal bests to candidate rows with the same key
+KEY_MATCHES = " AND ".join(
+    f"{PERSONAL_BESTS_TABLE}.{col} IS NOT DISTINCT FROM candidates.{col}"
+    for col in PERSONAL_BEST_KEYS
+)
+
+
+def tracks_personal_bests(table_name: str, columns) -> bool:
+    """
+    Whether writing these columns to a table has to maintain the personal bests.
+
+    Args:
+        table_name (str): Name of the table written to.
+        columns: Columns of the rows written.
+
+    Returns:
+        bool: True for writes of full lift rows to the lifts table.
+    """
+    return table_name == LIFTS_TABLE and set(
+        PERSONAL_BEST_COLUMNS.split(", ")
+    ).issubset(columns)
+
+
+def rebuild_personal_bests(con: duckdb.DuckDBPyConnection) -> None:
+    """
+    Recompute the personal bests table from the full lift history.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection to the database.
+    """
+    con.execute(
+        f"CREATE OR REPLACE TABLE {PERSONAL_BESTS_TABLE} AS "
+        + BEST_SETS_QUERY.format(source=LIFTS_TABLE)
+    )
+
+
+def update_personal_bests(
+    con: duckdb.DuckDBPyConnection, new_rows: str = "temp_table"
+) -> None:
+    """
+    Fold newly appended lifts into the personal bests table.
+
+    Only the new rows are read: their best set per key replaces the stored
+    one if it is heavier, or equally heavy and earlier. The new rows must
+    already be in the lifts table, so a missing personal bests table is
+    rebuilt from the full history instead.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection to the database.
+        new_rows (str): Table or view holding the appended rows.
+    """
+    exists = con.execute(
+        "SELECT 1 FROM duckdb_tables() WHERE table_name = ?", [PERSONAL_BESTS_TABLE]
+    ).fetchall()
+    if not exists:
+        rebuild_personal_bests(con)
+        return
+
+    candidates = BEST_SETS_QUERY.format(source=new_rows)
+    con.execute(
+        f"""
+        DELETE FROM {PERSONAL_BESTS_TABLE} WHERE EXISTS (
+            SELECT 1 FROM ({candidates}) AS candidates
+            WHERE {KEY_MATCHES}
+            AND (
+                candidates.Weight > {PERSONAL_BESTS_TABLE}.Weight
+                OR (
+                    candidates.Weight = {PERSONAL_BESTS_TABLE}.Weight
+                    AND candidates.Day < {PERSONAL_BESTS_TABLE}.Day
+                )
+            )
+        )
+        """
+    )
+    # stored rows left for a key are at least as good as the candidate
+    con.execute(
+        f"""
+        INSERT INTO {PERSONAL_BESTS_TABLE} BY NAME
+        SELECT * FROM ({candidates}) AS candidates
+        WHERE NOT EXISTS (SELECT 1 FROM {PERSONAL_BESTS_TABLE} WHERE {KEY_MATCHES})
+        """
+    )
+
+
+if __name__ == "__main__":
+    # Repair the personal bests table: python -m modules.personal_bests
+    from modules.duckdb import DuckDBManager
+
+    DuckDBManager().rebuild_personal_bests()
@@ -0,0 +1,275 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# a rough chars-per-token for English and SQL identifiers, no tokenizer needed
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 800
+
+# columns that get a range in the context, text columns get their top values
+_RANGE_TYPES = ("DATE", "TIMESTAMP", "DECIMAL", "DOUBLE", "FLOAT", "INTEGER", "BIGINT")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many tokens a text takes in a prompt.
+
+    Args:
+        text (str): Prompt text.
+
+    Returns:
+        int: Approximate token count, on the high side for plain words.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def profile_table(
+    db_manager, table_name: str, top_n: int = 50, max_distinct: int = 200
+) -> dict:
+    """
+    Profile a table with aggregates, without reading its rows out of DuckDB.
+
+    One query computes the row count, approx_count_distinct of every column
+    and the range of numeric and date columns. Text columns with few enough
+    distinct values get their most frequent values, one GROUP BY each.
+
+    Args:
+        db_manager (DuckDBManager): Manager of the database holding the table.
+        table_name (str): Name of the table.
+        top_n (int): Most frequent values kept per text column.
+        max_distinct (int): Text columns with more distinct values, like
+            free-text notes, get no values.
+
+    Returns:
+        dict: ``rows``, and ``columns`` by name with ``type``, ``pandas_type``,
+            ``distinct`` and either ``range`` or ``values``. Empty if the
+            table is missing or empty.
+    """
+    info = db_manager.get_data(
+        query="SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_name = ? ORDER BY ordinal_position",
+        params=[table_name],
+    )
+    if info is None or info.empty:
+        return {}
+    types = dict(zip(info["column_name"], info["data_type"]))
+
+    aggregates = ["count(*) AS n_rows"]
+    for i, (column, sql_type) in enumerate(types.items()):
+        aggregates.append(f'approx_count_distinct("{column}") AS d{i}')
+        if sql_type.startswith(_RANGE_TYPES):
+            aggregates.append(f'min("{column}")::VARCHAR AS lo{i}')
+            aggregates.append(f'max("{column}")::VARCHAR AS hi{i}')
+    stats = db_manager.get_data(
+        query=f"SELECT {', '.join(aggregates)} FROM {table_name}"
+    )
+    if stats is None or stats["n_rows"][0] == 0:
+        return {}
+    stats = stats.iloc[0]
+
+    # what the viz page's df will hold, from an empty read
+    pandas_types = db_manager.get_data(query=f"SELECT * FROM {table_name} LIMIT 0").dtypes
+
+    columns = {}
+    for i, (column, sql_type) in enumerate(types.items()):
+        profile = {
+            "type": sql_type,
+            "pandas_type": str(pandas_types[column]),
+            "distinct": int(stats[f"d{i}"]),
+        }
+        if f"lo{i}" in stats:
+            profile["range"] = (stats[f"lo{i}"], stats[f"hi{i}"])
+        elif sql_type == "VARCHAR" and profile["distinct"] <= max_distinct:
+            values = db_manager.get_data(
+                query=f"""
+                SELECT "{column}" AS value, count(*) AS n
+                FROM {table_name}
+                WHERE "{column}" IS NOT NULL AND "{column}" <> ''
+                GROUP BY ALL
+                ORDER BY n DESC, value
+                LIMIT {int(top_n)}
+                """
+            )
+            profile["values"] = [] if values is None else list(values["value"])
+        columns[column] = profile
+    return {"rows": int(stats["n_rows"]), "columns": columns}
+
+
+def _render(
+    profile: dict,
+    values: Dict[str, List[str]],
+    table_name: str,
+    table_description: str,
+    name_tag: str,
+    pandas_types: bool,
+) -> str:
+    """
+    Helper to lay out the context, listing only the given values per column.
+    """
+    column_lines = []
+    for column, info in profile["columns"].items():
+        details = [f"{info['distinct']:,} distinct"]
+        if "range" in info:
+            details.append(f"{info['range'][0]} to {info['range'][1]}")
+        column_type = info["pandas_type"] if pandas_types else info["type"]
+        column_lines.append(f"- **{column}**: {column_type} ({', '.join(details)})")
+    columns = "\n".join(column_lines)
+
+    context = f"""
+        Here is the table name <{name_tag}> {table_name} </{name_tag}>
+
+        <tableDescription>{table_description}</tableDescription>
+
+        Here are the columns of the {table_name}, which has {profile['rows']:,} rows
+
+        <columns>\n\n{columns}\n\n</columns>
+        """
+    for column, kept in values.items():
+        if not kept:
+            continue
+        listed = ", ".join(kept)
+        dropped = profile["columns"][column]["distinct"] - len(kept)
+        if dropped > 0:
+            listed += f" and about {dropped:,} more"
+        tag = f"{column.lower()}Values"
+        context += f"""
+        Most frequent values of {column}:
+
+        <{tag}>{listed}</{tag}>
+        """
+    return context
+
+
+def fit_to_budget(
+    profile: dict,
+    table_name: str,
+    table_description: str,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    name_tag: str = "tableName",
+    pandas_types: bool = False,
+) -> str:
+    """
+    Lay out a table profile as prompt context within a token budget.
+
+    The table name, description and columns are always kept. Value lists
+    are trimmed from their least frequent end, longest list first, until
+    the context fits.
+
+    Args:
+        profile (dict): Output of profile_table.
+        table_name (str): Name of the table.
+        table_description (str): Description for the model.
+        token_budget (int): Tokens the context may take, see estimate_tokens.
+        name_tag (str): Tag around the table name, e.g. "DataFrame".
+        pandas_types (bool): List the pandas dtypes of a read instead of SQL types.
+
+    Returns:
+        str: The context.
+    """
+    values = {
+        column: list(info["values"])
+        for column, info in profile["columns"].items()
+        if info.get("values")
+    }
+    while True:
+        context = _render(
+            profile, values, table_name, table_description, name_tag, pandas_types
+        )
+        longest = max(values, key=lambda column: len(values[column]), default=None)
+        if (
+            estimate_tokens(context) <= token_budget
+            or longest is None
+            or not values[longest]
+        ):
+            return context
+        # drop a quarter of the longest list so trimming takes few renders
+        kept = len(values[longest])
+        values[longest] = values[longest][: kept - max(1, kept // 4)]
+
+
+class TableContextBuilder:
+    def __init__(self, max_entries: int = 32) -> None:
+        """
+        Process-wide cache of prompt contexts, shared by every session.
+
+        A context is rebuilt once the table's version changes, i.e. after a
+        write through a DuckDBManager, so prompt size no longer grows with
+        the data and unchanged data is never profiled twice.
+
+        Args:
+            max_entries (int): Contexts kept, least recently used are evicted.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def build(
+        self,
+        db_manager,
+        table_name: str,
+        table_description: str,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        name_tag: str = "tableName",
+        pandas_types: bool = False,
+        top_n: int = 50,
+    ) -> Optional[str]:
+        """
+        Prompt context describing a table, from cache while the table is unchanged.
+
+        Args:
+            db_manager (DuckDBManager): Manager of the database holding the table.
+            table_name (str): Name of the table.
+            table_description (str): Description for the model.
+            token_budget (int): Tokens the context may take.
+            name_tag (str): Tag around the table name.
+            pandas_types (bool): List pandas dtypes instead of SQL types.
+            top_n (int): Most frequent values profiled per text column.
+
+        Returns:
+            Optional[str]: The context, None if the table is missing or empty.
+        """
+        key = (
+            db_manager.db_path,
+            table_name,
+            db_manager.table_version(table_name),
+            table_description,
+            token_budget,
+            name_tag,
+            pandas_types,
+            top_n,
+        )
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        profile = profile_table(db_manager, table_name, top_n=top_n)
+        context = None
+        if profile:
+            context = fit_to_budget(
+                profile,
+                table_name,
+                table_description,
+                token_budget=token_budget,
+                name_tag=name_tag,
+                pandas_types=pandas_types,
+            )
+        with self._lock:
+            self._entries[key] = context
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return context
+
+    def clear(self) -> None:
+        """Drop every cached context."""
+        with self._lock:
+            self._entries.clear()
+
+
+_builder = TableContextBuilder()
+
+
+def get_context_builder() -> TableContextBuilder:
+    """Returns the process-wide context builder shared by every session."""
+    return _builder
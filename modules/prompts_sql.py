@@ -4,6 +4,7 @@ import pandas as pd
 import os
 from modules.util import reduce_dataframe_size, clean_lifts_data
 from modules.duckdb import DuckDBManager
+from modules.prompt_context import DEFAULT_TOKEN_BUDGET, get_context_builder
 
 # Your specific table details
 TABLE_NAME = "historic_exercises"
@@ -51,41 +52,25 @@ Then provide 3 example questions using bullet points.
 """
 
 
-@st.cache_data(show_spinner="Loading AIFit's context...")
 def get_table_context(
     table_name: str,
     table_description: str,
     metadata_query: str = None,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
 ):
+    # schema, cardinalities and top values come from SQL aggregates, cached
+    # until the table is written to and trimmed to the token budget
+    context = get_context_builder().build(
+        DuckDBManager(),
+        table_name,
+        table_description,
+        token_budget=token_budget,
+    )
 
-    # Try to fetch the table
-    df = DuckDBManager().get_data(table_name="historic_exercises")
-
-    # Check if df is not empty
-    if df.empty:
+    # Check the table is not empty
+    if context is None:
         st.error("Error: The DataFrame df is empty.")
     else:
-        # Now, try fetching the table context again
-        columns = DuckDBManager().get_data(
-            query="SELECT column_name, data_type FROM information_schema.columns"
-        )
-
-        columns = "\n".join(
-            [
-                f"- **{columns['column_name'][i]}**: {columns['data_type'][i]}"
-                for i in range(len(columns["column_name"]))
-            ]
-        )
-
-        context = f"""
-        Here is the table name <tableName> {(table_name)} </tableName>
-
-        <tableDescription>{table_description}</tableDescription>
-
-        Here are the columns of the {(table_name)}
-
-        <columns>\n\n{columns}\n\n</columns>
-        """
         if metadata_query:
             # Retrieve metadata information from DuckDB if metadata_query is provided
             try:
@@ -107,6 +92,7 @@ def get_table_context(
 
 def get_system_prompt():
     table_context = get_table_context(
-        table_name=TABLE_NAME, table_description=TABLE_DESCRIPTION
+        table_name=TABLE_NAME,
+        table_description=TABLE_DESCRIPTION,
     )
     return GEN_SQL.format(context=table_context)
@@ -4,6 +4,7 @@ import pandas as pd
 import os
 from modules.util import reduce_dataframe_size, clean_lifts_data
 from modules.duckdb import DuckDBManager
+from modules.prompt_context import DEFAULT_TOKEN_BUDGET, get_context_builder
 
 # Your specific table details
 TABLE_NAME = "historic_exercises"
@@ -38,39 +39,26 @@ For each question from the user, make sure to include a visualization in your re
 Now to get started, please briefly introduce yourself, describe the DataFrame at a high level, and share the available metrics in 2-3 sentences. Then provide 3 example questions using bullet points. """
 
 
-@st.cache(show_spinner="Loading AIFit's context...")
-def get_table_context(table_name: str, table_description: str):
-
-    # Try to fetch the table
-    df = DuckDBManager().get_data(table_name="historic_exercises")
+def get_table_context(
+    table_name: str,
+    table_description: str,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+):
+    # the columns are listed with the dtypes df will have, exercises among
+    # the most frequent values, cached until the table is written to
+    context = get_context_builder().build(
+        DuckDBManager(),
+        table_name,
+        table_description,
+        token_budget=token_budget,
+        name_tag="DataFrame",
+        pandas_types=True,
+    )
 
-    # Check if df is not empty
-    if df.empty:
+    # Check the table is not empty
+    if context is None:
         st.error("Error: The DataFrame df is empty.")
-    else:
-        # Now, try fetching the table context again
-        columns = "\n".join(
-            [f"- **{column}**: {df[column].dtype}" for column in df.columns]
-        )
-
-        unique_exercises = df["Exercise"].unique()
-
-        exercises = "\n".join([f"- **{exercise}**" for exercise in unique_exercises])
-
-        context = f"""
-        Here is the DataFrame name <DataFrame> {(table_name)} </DataFrame>
-
-        <tableDescription>{table_description}</tableDescription>
-
-        Here are the columns of the {(table_name)}
-
-        <columns>\n\n{columns}\n\n</columns>
-
-        Here are the unique exercises:
-
-        <exercises>\n\n{exercises}\n\n</exercises>
-        """
-        return context
+    return context
 
 
 def get_plotly_prompt():
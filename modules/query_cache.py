@@ -0,0 +1,292 @@
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import duckdb as duckdb
+import pandas as pd
+
+# quoted strings and identifiers are kept as written, whitespace elsewhere collapses
+_SQL_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|\s+")
+
+# results of volatile functions change between runs, so queries using them are
+# not cached. The functions come from DuckDB's catalog, these clock keywords and
+# macros are not marked there and can be written without parentheses.
+_VOLATILE_KEYWORDS = (
+    "current_date",
+    "current_time",
+    "current_timestamp",
+    "current_localtime",
+    "current_localtimestamp",
+    "localtime",
+    "localtimestamp",
+)
+_volatile_sql: Optional[re.Pattern] = None
+_volatile_lock = threading.Lock()
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Normalise a query so formatting differences share one cache entry.
+
+    Args:
+        query (str): SQL query.
+
+    Returns:
+        str: Query with whitespace outside quotes collapsed and trailing
+            semicolons removed.
+    """
+    normalized = _SQL_TOKENS.sub(lambda m: m.group(1) or " ", query)
+    return normalized.strip().rstrip(";").strip()
+
+
+def is_select(query: str) -> bool:
+    """
+    Whether a query is a single SELECT statement.
+
+    Args:
+        query (str): SQL query.
+
+    Returns:
+        bool: False for writes, DDL and multiple statements.
+    """
+    try:
+        statements = duckdb.extract_statements(query)
+    except Exception:
+        return False
+    return len(statements) == 1 and statements[0].type == duckdb.StatementType.SELECT
+
+
+def _volatile_pattern(con: duckdb.DuckDBPyConnection) -> re.Pattern:
+    """
+    Helper to build, once per process, a pattern matching calls of functions
+    whose results can change between runs, e.g. random(), today() or now().
+    """
+    global _volatile_sql
+    with _volatile_lock:
+        if _volatile_sql is None:
+            functions = [
+                name
+                for (name,) in con.execute(
+                    "SELECT DISTINCT function_name FROM duckdb_functions() "
+                    "WHERE stability IN ('VOLATILE', 'CONSISTENT_WITHIN_QUERY')"
+                ).fetchall()
+            ]
+            _volatile_sql = re.compile(
+                r"\b(?:(?:"
+                + "|".join(map(re.escape, functions))
+                + r")\s*\(|(?:"
+                + "|".join(_VOLATILE_KEYWORDS)
+                + r")\b)",
+                re.IGNORECASE,
+            )
+        return _volatile_sql
+
+
+def cacheable_tables(con: duckdb.DuckDBPyConnection, query: str) -> Optional[set]:
+    """
+    Tables a read-only query depends on, if its result can be cached.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection the query runs on.
+        query (str): SQL query.
+
+    Returns:
+        Optional[set]: Table names, or None if the query is not a single
+            deterministic SELECT over at least one table.
+    """
+    if not is_select(query) or _volatile_pattern(con).search(query):
+        return None
+    try:
+        tables = con.get_table_names(query)
+    except Exception:
+        return None
+    # catalog queries and table functions read nothing a version can track
+    return tables or None
+
+
+def _result_bytes(result, sample: int = 1000) -> int:
+    if hasattr(result, "estimated_size"):
+        # polars
+        return int(result.estimated_size())
+    if not isinstance(result, pd.DataFrame):
+        return int(result.nbytes)
+    # deep memory_usage walks every string, estimate object columns from a sample
+    size = int(result.memory_usage(deep=False).sum())
+    for column in result.columns[result.dtypes == object]:
+        values = result[column].iloc[:sample]
+        if len(values):
+            per_value = sum(sys.getsizeof(value) for value in values) / len(values)
+            size += int(per_value * len(result))
+    return size
+
+
+def _copy_result(result):
+    # Arrow and polars results are immutable, DataFrames are copied so callers
+    # can't edit the cache. Copying pd.ArrowDtype columns doesn't copy buffers.
+    if isinstance(result, pd.DataFrame):
+        return result.copy()
+    return result
+
+
+class QueryResultCache:
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 1024**2) -> None:
+        """
+        Process-wide cache of query results, shared by every session.
+
+        Every table has a version that writes through DuckDBManager bump.
+        An entry remembers the versions of the tables its query read and is
+        only served while they are unchanged. Writes made outside this
+        process are not seen.
+
+        Args:
+            max_entries (int): Maximum number of cached results.
+            max_bytes (int): Maximum total in-memory size of cached results.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._versions: Dict[Tuple[str, str], int] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def table_version(self, db_path: str, table_name: str) -> Tuple[int, int]:
+        """
+        Current version of a table.
+
+        Args:
+            db_path (str): Path of the database file.
+            table_name (str): Name of the table.
+
+        Returns:
+            Tuple[int, int]: Database-wide and table version, changed by every write.
+        """
+        with self._lock:
+            return self._snapshot(db_path, [table_name])[table_name]
+
+    def _snapshot(self, db_path: str, tables) -> dict:
+        generation = self._generations.get(db_path, 0)
+        return {
+            table: (generation, self._versions.get((db_path, table.lower()), 0))
+            for table in tables
+        }
+
+    def bump(self, db_path: str, tables=None) -> None:
+        """
+        Record a write so results that read the tables are no longer served.
+
+        Args:
+            db_path (str): Path of the database file.
+            tables (Optional[list]): Tables written to, or None if unknown,
+                which invalidates every table of the database.
+        """
+        with self._lock:
+            if tables is None:
+                self._generations[db_path] = self._generations.get(db_path, 0) + 1
+                return
+            for table in tables:
+                key = (db_path, table.lower())
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def get(self, key: tuple):
+        """
+        Look up a result.
+
+        Args:
+            key (tuple): (db_path, normalised query, params, format).
+
+        Returns:
+            The cached result, or None on a miss or a stale entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, versions, _ = entry
+                if self._snapshot(key[0], versions) == versions:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy_result(result)
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, result, tables: set, versions: dict = None) -> None:
+        """
+        Store a result, evicting least recently used entries to stay in budget.
+
+        Args:
+            key (tuple): (db_path, normalised query, params, format).
+            result: DataFrame or Arrow table returned by the query.
+            tables (set): Tables the query read.
+            versions (Optional[dict]): Table versions taken before the query
+                ran, so a write that raced it leaves the entry stale.
+        """
+        size = _result_bytes(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if versions is None:
+                versions = self._snapshot(key[0], tables)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (_copy_result(result), versions, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def versions(self, db_path: str, tables: set) -> dict:
+        """
+        Versions of the tables a query is about to read.
+
+        Args:
+            db_path (str): Path of the database file.
+            tables (set): Table names.
+
+        Returns:
+            dict: Version of each table.
+        """
+        with self._lock:
+            return self._snapshot(db_path, tables)
+
+    def _remove(self, key: tuple) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        """Drop every entry and reset the metrics."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Hit and miss metrics.
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries and bytes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+_query_cache = QueryResultCache()
+
+
+def get_query_cache() -> QueryResultCache:
+    """Returns the process-wide query result cache."""
+    return _query_cache
@@ -0,0 +1,234 @@
+import math
+import os
+import re
+import threading
+import time
+from typing import Optional, Tuple
+
+import duckdb as duckdb
+import pandas as pd
+import pyarrow as pa
+
+from modules.connection_pool import get_pool
+from modules.query_cache import is_select
+
+# estimated cardinality of an operator in EXPLAIN's plan, "EC: 120" or "~120 rows"
+_ESTIMATE = re.compile(r"(?:EC:\s*|~)(\d+)")
+
+# joins DuckDB gives no estimate for, which can produce every pair of input rows
+_PAIRWISE_JOINS = ("CROSS_PRODUCT", "NESTED_LOOP_JOIN", "BLOCKWISE_NL_JOIN")
+# operators without an estimate that always produce a single row
+_SINGLE_ROW = ("UNGROUPED_AGGREGATE",)
+
+def _plan_estimates(plan: str) -> list:
+    """
+    Estimated rows of every operator in an EXPLAIN plan drawn as a box tree.
+
+    Boxes at the same depth share a top line, and a box's parent is the box
+    one depth up that starts furthest right at or left of it.
+    """
+    lines = plan.splitlines()
+    depths, boxes = [], {}
+    for top, line in enumerate(lines):
+        columns = [col for col, char in enumerate(line) if char == "┌"]
+        if not columns:
+            continue
+        depths.append(top)
+        for col in columns:
+            text = []
+            for below in lines[top + 1 :]:
+                if below[col : col + 1] == "└":
+                    break
+                text.append(below[col : line.index("┐", col) + 1])
+            estimate = _ESTIMATE.search(" ".join(text))
+            boxes[(top, col)] = {
+                "name": text[0].strip("│ ├") if text else "",
+                "estimate": int(estimate.group(1)) if estimate else None,
+                "children": [],
+            }
+
+    for parent_top, child_top in zip(depths, depths[1:]):
+        parents = sorted(col for top, col in boxes if top == parent_top)
+        for top, col in boxes:
+            if top == child_top:
+                parent = max(c for c in parents if c <= col)
+                boxes[(parent_top, parent)]["children"].append(boxes[(top, col)])
+
+    def estimate(box: dict) -> int:
+        if "rows" not in box:
+            children = [estimate(child) for child in box["children"]]
+            if box["estimate"] is not None:
+                box["rows"] = box["estimate"]
+            elif box["name"] in _SINGLE_ROW:
+                box["rows"] = 1
+            elif box["name"] in _PAIRWISE_JOINS:
+                box["rows"] = math.prod(children)
+            else:
+                box["rows"] = max(children, default=0)
+        return box["rows"]
+
+    return [estimate(box) for box in boxes.values()]
+
+
+class QueryRejected(RuntimeError):
+    """Generated SQL is not a single SELECT, is too expensive to run, or failed."""
+
+
+class GuardedQueryExecutor:
+    def __init__(
+        self,
+        db_dir: str = "database",
+        db_name: str = "fit.db",
+        max_rows: int = 1000,
+        max_estimated_rows: int = 50_000_000,
+        timeout: float = 10.0,
+        batch_size: int = 1000,
+    ) -> None:
+        """
+        Runs chatbot-generated SQL with bounded rows, plan cost and time.
+
+        Only a single SELECT is accepted. Its EXPLAIN plan is checked first,
+        so a query estimated to produce too many rows anywhere in the plan,
+        e.g. an accidental cross join, is rejected without running. The query
+        runs wrapped in a LIMIT and is interrupted after the timeout. Rows
+        read before a limit was hit are returned with a truncation flag.
+
+        Memory and threads are not capped: DuckDB's memory_limit and threads
+        settings apply to the whole database, so lowering them for one query
+        would also apply to every other session's reads and to background
+        maintenance on the shared connection. The plan check and the timeout
+        bound what a generated query can use instead, and a query that still
+        runs out of the database's memory is returned truncated.
+
+        DuckDB won't open a read-only handle on a file this process already
+        has open, so queries use a cursor from the shared pool and run in a
+        transaction that is always rolled back. Results bypass the result cache.
+
+        Args:
+            db_dir (str): Directory where the database file is stored.
+            db_name (str): Name of the database file.
+            max_rows (int): Rows returned at most.
+            max_estimated_rows (int): Largest estimated cardinality allowed
+                for any operator of the plan.
+            timeout (float): Seconds before the query is interrupted.
+            batch_size (int): Rows fetched at a time, the granularity of
+                partial results.
+        """
+        self.db_path = os.path.join(db_dir, db_name)
+        self.max_rows = max_rows
+        self.max_estimated_rows = max_estimated_rows
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+    def estimate_rows(self, con: duckdb.DuckDBPyConnection, query: str) -> int:
+        """
+        Largest estimated cardinality of any operator in the query's plan.
+
+        Operators without an estimate pass on their largest input's, except
+        ungrouped aggregates, which produce one row, and cross products and
+        nested loop joins, which are taken to produce every pair of input rows.
+
+        Args:
+            con (duckdb.DuckDBPyConnection): Connection the query runs on.
+            query (str): SELECT query.
+
+        Returns:
+            int: Estimated rows, 0 if the plan carries no estimates.
+        """
+        plan = "\n".join(row[-1] for row in con.execute(f"EXPLAIN {query}").fetchall())
+        return max(_plan_estimates(plan), default=0)
+
+    def _fetch(self, con: duckdb.DuckDBPyConnection, query: str) -> Tuple[pa.Table, str]:
+        """
+        Helper method to run the limited query and collect its batches until
+        it ends, times out or runs out of the database's memory.
+        """
+        timed_out = threading.Event()
+
+        def interrupt() -> None:
+            timed_out.set()
+            con.interrupt()
+
+        timer = threading.Timer(self.timeout, interrupt)
+        reader, batches, reason = None, [], None
+        timer.start()
+        try:
+            reader = con.execute(
+                f"SELECT * FROM (\n{query}\n) AS guarded LIMIT {self.max_rows + 1}"
+            ).fetch_record_batch(self.batch_size)
+            for batch in reader:
+                batches.append(batch)
+        except duckdb.OutOfMemoryException:
+            reason = "memory_limit"
+        except Exception as e:
+            # depending on where it lands, the interrupt surfaces as
+            # duckdb.InterruptException or as an Arrow stream error
+            if not timed_out.is_set():
+                raise QueryRejected(f"Query failed: {e}") from e
+            reason = "timeout"
+        finally:
+            timer.cancel()
+
+        if reader is None:
+            return pa.table({}), reason
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+        if table.num_rows > self.max_rows:
+            table, reason = table.slice(0, self.max_rows), "row_limit"
+        return table, reason
+
+    def run(self, query: str, stats: Optional[dict] = None) -> Tuple[pd.DataFrame, bool]:
+        """
+        Run a generated query within the limits.
+
+        Args:
+            query (str): SQL returned by the model.
+            stats (Optional[dict]): Filled with the plan's estimated rows, rows
+                returned, why the result was truncated (None, "row_limit",
+                "timeout" or "memory_limit") and total seconds.
+
+        Returns:
+            Tuple[pd.DataFrame, bool]: The rows read and whether the result
+                was truncated.
+
+        Raises:
+            QueryRejected: If the query is not a single SELECT, its plan is
+                too expensive or it failed for a reason other than a limit.
+        """
+        stats = {} if stats is None else stats
+        start = time.perf_counter()
+        # kept as written, a line comment would swallow collapsed lines
+        query = query.strip().rstrip(";")
+        if not is_select(query):
+            raise QueryRejected("Only a single SELECT statement can be run")
+
+        with get_pool(self.db_path).cursor() as con:
+            con.begin()
+            try:
+                try:
+                    estimated = self.estimate_rows(con, query)
+                except duckdb.Error as e:
+                    raise QueryRejected(f"Query could not be planned: {e}") from e
+                stats["estimated_rows"] = estimated
+                if estimated > self.max_estimated_rows:
+                    raise QueryRejected(
+                        f"Query is estimated to produce {estimated:,} rows, "
+                        f"over the limit of {self.max_estimated_rows:,}"
+                    )
+                table, reason = self._fetch(con, query)
+            finally:
+                con.rollback()
+
+        stats.update(
+            rows=table.num_rows,
+            truncated=reason,
+            total=time.perf_counter() - start,
+        )
+        return table.to_pandas(), reason is not None
+
+
+_executor = GuardedQueryExecutor()
+
+
+def get_query_guard() -> GuardedQueryExecutor:
+    """Returns the process-wide executor for generated queries."""
+    return _executor
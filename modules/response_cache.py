@@ -0,0 +1,251 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from modules.connection_pool import get_pool
+
+RESPONSE_CACHE_DB = "llm_cache.db"
+RESPONSE_CACHE_TABLE = "llm_responses"
+
+# case, spacing and closing punctuation don't change what the model is asked,
+# operators, signs and decimal points do
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """
+    Normalise a question so trivially different wordings share one entry.
+
+    Args:
+        text (str): Question as typed.
+
+    Returns:
+        str: Lower case text with single spaces and no closing ``?``, ``!`` or ``.``.
+    """
+    text = _TRAILING_PUNCTUATION.sub("", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def prompt_version(system_prompt: str) -> str:
+    """
+    Version of a system prompt, changed by any edit to it.
+
+    Args:
+        system_prompt (str): Full system prompt.
+
+    Returns:
+        str: Short hex digest of the prompt.
+    """
+    return hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
+
+
+def conversation_key(messages: List[dict]) -> Tuple[str, str]:
+    """
+    What a reply depends on, besides the data.
+
+    Args:
+        messages (List[dict]): Chat messages, the first being the system prompt.
+
+    Returns:
+        Tuple[str, str]: Prompt version and the normalised rest of the
+            conversation, one ``role: text`` line per message.
+    """
+    conversation = "\n".join(
+        f"{m['role']}: {normalize_question(m['content'])}" for m in messages[1:]
+    )
+    return prompt_version(messages[0]["content"]), conversation
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        db_dir: str = "database",
+        db_name: str = RESPONSE_CACHE_DB,
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Cache of LLM replies in its own DuckDB file, shared by every session.
+
+        Replies are keyed on the system prompt version, the version of the
+        data the prompt describes and the normalised conversation, so a
+        repeated question is answered without calling the model. Writing
+        the cache doesn't touch the app database or its result cache.
+
+        Args:
+            db_dir (str): Directory where the cache file is stored.
+            db_name (str): Name of the cache file.
+            ttl (float): Seconds a reply is served for.
+            max_entries (int): Replies kept, least recently used are evicted.
+            clock (Callable[[], float]): Time source, overridable for tests.
+        """
+        self.db_path = os.path.join(db_dir, db_name)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._data_versions: Dict[Tuple[str, str], tuple] = {}
+        self._lock = threading.Lock()
+        self._created = False
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(db_dir, exist_ok=True)
+
+    @contextmanager
+    def _connect(self):
+        """
+        Helper method to borrow a cursor on the cache file, creating the table on first use.
+        """
+        with get_pool(self.db_path).cursor() as con:
+            if not self._created:
+                con.execute(
+                    f"CREATE TABLE IF NOT EXISTS {RESPONSE_CACHE_TABLE} ("
+                    "prompt_version VARCHAR, data_version VARCHAR, "
+                    "conversation VARCHAR, response VARCHAR, "
+                    "created DOUBLE, last_used DOUBLE, hits INTEGER)"
+                )
+                self._created = True
+            yield con
+
+    def data_version(self, db_manager, table_name: str = "historic_exercises") -> str:
+        """
+        Version of a table's contents that survives restarts.
+
+        Fingerprinting scans the table, so it is only redone after a write
+        through a DuckDBManager changes the table's in-process version.
+
+        Args:
+            db_manager (DuckDBManager): Manager of the database the prompt describes.
+            table_name (str): Name of the table.
+
+        Returns:
+            str: Row count and a hash of every row.
+        """
+        key = (db_manager.db_path, table_name)
+        version = db_manager.table_version(table_name)
+        with self._lock:
+            cached = self._data_versions.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        df = db_manager.get_data(
+            query=f"SELECT count(*) AS n, sum(hash(t)) AS h FROM {table_name} t"
+        )
+        fingerprint = "missing" if df is None else f"{df['n'][0]}:{df['h'][0]}"
+        with self._lock:
+            self._data_versions[key] = (version, fingerprint)
+        return fingerprint
+
+    def get(self, messages: List[dict], data_version: str) -> Optional[str]:
+        """
+        Look up the reply to a conversation.
+
+        Args:
+            messages (List[dict]): Chat messages, the first being the system prompt.
+            data_version (str): Version of the data, from data_version().
+
+        Returns:
+            Optional[str]: The cached reply, None on a miss or an expired entry.
+        """
+        version, conversation = conversation_key(messages)
+        now = self._clock()
+        with self._connect() as con:
+            row = con.execute(
+                f"UPDATE {RESPONSE_CACHE_TABLE} SET last_used = ?, hits = hits + 1 "
+                "WHERE prompt_version = ? AND data_version = ? AND conversation = ? "
+                "AND created >= ? RETURNING response",
+                [now, version, data_version, conversation, now - self.ttl],
+            ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def put(self, messages: List[dict], data_version: str, response: str) -> None:
+        """
+        Store the reply to a conversation, evicting expired and least recently
+        used replies to stay within max_entries.
+
+        Args:
+            messages (List[dict]): Chat messages the reply answers.
+            data_version (str): Version of the data, from data_version().
+            response (str): The model's reply.
+        """
+        version, conversation = conversation_key(messages)
+        now = self._clock()
+        with self._connect() as con:
+            try:
+                con.begin()
+                con.execute(
+                    f"DELETE FROM {RESPONSE_CACHE_TABLE} WHERE created < ? OR "
+                    "(prompt_version = ? AND data_version = ? AND conversation = ?)",
+                    [now - self.ttl, version, data_version, conversation],
+                )
+                con.execute(
+                    f"INSERT INTO {RESPONSE_CACHE_TABLE} VALUES (?, ?, ?, ?, ?, ?, 0)",
+                    [version, data_version, conversation, response, now, now],
+                )
+                con.execute(
+                    f"DELETE FROM {RESPONSE_CACHE_TABLE} WHERE last_used < ("
+                    f"SELECT min(last_used) FROM (SELECT last_used FROM "
+                    f"{RESPONSE_CACHE_TABLE} ORDER BY last_used DESC LIMIT ?))",
+                    [self.max_entries],
+                )
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+
+    def clear(self) -> None:
+        """Drop every reply and reset the metrics."""
+        with self._connect() as con:
+            con.execute(f"DELETE FROM {RESPONSE_CACHE_TABLE}")
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Hit and miss metrics.
+
+        Returns:
+            dict: hits and misses in this process, hit_rate, entries stored
+                and hits recorded across restarts.
+        """
+        with self._connect() as con:
+            entries, stored_hits = con.execute(
+                f"SELECT count(*), coalesce(sum(hits), 0) FROM {RESPONSE_CACHE_TABLE}"
+            ).fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "stored_hits": int(stored_hits),
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Returns the process-wide LLM response cache, stored in database/llm_cache.db."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+
+if __name__ == "__main__":
+    # hit rate of the cache used by the chat pages, run from the repository root
+    print(get_response_cache().stats())
@@ -0,0 +1,257 @@
+import json
+import os
+import queue
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional, Union
+
+import pandas as pd
+import plotly.io as pio
+import pyarrow as pa
+
+_HEADER_SIZE = 4
+_INHERITED_ENV = ("PATH", "PYTHONPATH")
+_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+
+
+class SandboxError(RuntimeError):
+    """Generated code failed, or its worker was killed for exceeding a limit."""
+
+
+class SandboxTimeout(SandboxError):
+    """Generated code ran past the wall-clock timeout."""
+
+
+class _Worker:
+    def __init__(self, max_memory_mb: int, timeout: float) -> None:
+        """
+        One warm worker process.
+        """
+        # only what the worker needs, so generated code can't read the
+        # server's secrets from its environment
+        env = {key: os.environ[key] for key in _INHERITED_ENV if key in os.environ}
+        env["SANDBOX_MAX_MEMORY"] = str(max_memory_mb * 1024**2)
+        self.process = subprocess.Popen(
+            [sys.executable, _WORKER],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=0,
+            env=env,
+        )
+        self.data_key = None
+        # imports happen before the worker says it's ready
+        try:
+            self.receive(time.monotonic() + timeout)
+        except SandboxError:
+            self.kill()
+            raise
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def send(self, header: dict, data: Optional[pa.Buffer] = None) -> None:
+        payload = json.dumps(header).encode()
+        self.process.stdin.write(len(payload).to_bytes(_HEADER_SIZE, "big") + payload)
+        if data is not None:
+            self.process.stdin.write(memoryview(data))
+        self.process.stdin.flush()
+
+    def _read(self, size: int, deadline: float) -> bytes:
+        chunks = []
+        while size:
+            remaining = deadline - time.monotonic()
+            readable = remaining > 0 and select.select(
+                [self.process.stdout], [], [], remaining
+            )[0]
+            if not readable:
+                raise SandboxTimeout("Generated code ran past the time limit")
+            chunk = self.process.stdout.read(size)
+            if not chunk:
+                raise SandboxError(self._exit_reason())
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def _exit_reason(self) -> str:
+        code = self.process.wait()
+        if code == -signal.SIGXCPU:
+            return "Generated code ran past the CPU time limit"
+        if code < 0:
+            return f"Generated code was killed by signal {-code}"
+        return f"Sandbox worker exited with code {code}"
+
+    def receive(self, deadline: float) -> dict:
+        size = int.from_bytes(self._read(_HEADER_SIZE, deadline), "big")
+        return json.loads(self._read(size, deadline))
+
+    def kill(self) -> None:
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+        for pipe in (self.process.stdin, self.process.stdout):
+            pipe.close()
+
+
+def _ipc_buffer(df: Union[pd.DataFrame, pa.Table]) -> pa.Buffer:
+    if isinstance(df, pa.Table):
+        table = df
+    else:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+class PlotlySandbox:
+    def __init__(
+        self,
+        workers: int = 2,
+        cpu_seconds: int = 10,
+        timeout: float = 20.0,
+        max_memory_mb: int = 2048,
+    ) -> None:
+        """
+        Pool of warm worker processes that run generated Plotly code.
+
+        Each snippet runs in a worker with ``df`` in scope, as exec did in the
+        viz page, under a CPU time limit, a wall-clock timeout and an address
+        space limit, so a runaway snippet can't stall the Streamlit server.
+        The data goes over as an Arrow IPC stream and stays in the worker,
+        so repeated snippets on the same data don't resend it. Figures come
+        back as Plotly JSON. Workers that time out or die are replaced.
+
+        Args:
+            workers (int): Worker processes kept warm.
+            cpu_seconds (int): CPU seconds a snippet may use.
+            timeout (float): Seconds a snippet may take, including sending the data.
+            max_memory_mb (int): Address space limit of a worker. Linux doesn't
+                enforce RSS limits, address space bounds it from above.
+        """
+        self.size = workers
+        self.cpu_seconds = cpu_seconds
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self._idle: queue.Queue = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+
+    def start(self, background: bool = False) -> None:
+        """
+        Start the workers now rather than on first use, to take warm-up off a request.
+
+        Args:
+            background (bool): Return at once and start them on a thread.
+        """
+        if background:
+            threading.Thread(target=self.start, daemon=True).start()
+            return
+        while self._spawn():
+            pass
+
+    def _spawn(self) -> bool:
+        with self._lock:
+            if self._started >= self.size:
+                return False
+            self._started += 1
+        try:
+            self._idle.put(_Worker(self.max_memory_mb, self.timeout))
+        except Exception:
+            with self._lock:
+                self._started -= 1
+            raise
+        return True
+
+    def _checkout(self) -> _Worker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        self._spawn()
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise SandboxTimeout("No sandbox worker became free in time") from None
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._lock:
+            self._started -= 1
+
+    def run(
+        self,
+        code: str,
+        df: Union[pd.DataFrame, pa.Table],
+        data_key=None,
+        stats: Optional[dict] = None,
+    ):
+        """
+        Run a snippet and return the figure it left in ``fig``.
+
+        Args:
+            code (str): Python code using ``df``.
+            df (Union[pd.DataFrame, pa.Table]): Data the code sees as a DataFrame.
+            data_key: Version of the data, e.g. DuckDBManager.table_version.
+                A worker already holding data with this key is not sent it again.
+            stats (Optional[dict]): Filled with bytes sent and total seconds.
+
+        Returns:
+            Optional[plotly.graph_objects.Figure]: The figure, None if the code made none.
+
+        Raises:
+            SandboxError: If the code raised or exceeded its CPU or memory limit.
+            SandboxTimeout: If the code exceeded the wall-clock timeout.
+        """
+        stats = {} if stats is None else stats
+        start = time.monotonic()
+        deadline = start + self.timeout
+        worker = self._checkout()
+        healthy = False
+        try:
+            header = {"code": code, "cpu_seconds": self.cpu_seconds}
+            data = None
+            if data_key is None or worker.data_key != repr(data_key):
+                data = _ipc_buffer(df)
+                header.update(data_size=data.size, data_key=repr(data_key))
+            stats["bytes_sent"] = 0 if data is None else data.size
+
+            worker.data_key = None
+            worker.send(header, data)
+            reply = worker.receive(deadline)
+            worker.data_key = reply["data_key"] if data_key is not None else None
+            healthy = worker.alive() and not reply.get("fatal")
+        except (BrokenPipeError, OSError) as e:
+            raise SandboxError(f"Sandbox worker failed: {e}") from e
+        finally:
+            stats["total"] = time.monotonic() - start
+            if healthy:
+                self._idle.put(worker)
+            else:
+                self._replace(worker)
+
+        if "error" in reply:
+            raise SandboxError(reply["error"])
+        if reply["figure"] is None:
+            return None
+        return pio.from_json(reply["figure"])
+
+    def close(self) -> None:
+        """Stop the idle workers."""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._replace(worker)
+
+
+_sandbox = PlotlySandbox()
+
+
+def get_sandbox() -> PlotlySandbox:
+    """Returns the process-wide sandbox shared by every session."""
+    return _sandbox
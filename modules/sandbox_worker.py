@@ -0,0 +1,100 @@
+# Worker process of modules.sandbox, started by path so it doesn't import the
+# app (Streamlit, DuckDB). It imports pandas and Plotly once, then runs one
+# snippet per request under the limits the parent sets.
+import json
+import os
+import resource
+import struct
+import sys
+import traceback
+
+import pandas as pd
+import plotly.basedatatypes
+import plotly.express
+import pyarrow as pa
+
+_HEADER = struct.Struct("!I")
+
+
+def read_exactly(stream, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            raise EOFError("parent closed the pipe")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send(stream, message: dict) -> None:
+    payload = json.dumps(message).encode()
+    stream.write(_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(code: str, df: pd.DataFrame) -> dict:
+    # same namespaces the viz page used with exec
+    local_vars = {"df": df}
+    exec(code, {}, local_vars)
+    fig = local_vars.get("fig")
+    if fig is None:
+        return {"figure": None}
+    return {"figure": fig.to_json()}
+
+
+def main() -> None:
+    requests = sys.stdin.buffer
+    replies = sys.stdout.buffer
+    # anything a snippet prints goes to the server log, not the reply pipe
+    sys.stdout = sys.stderr
+    # there is no browser to show figures in, the parent renders them
+    plotly.basedatatypes.BaseFigure.show = lambda self, *args, **kwargs: None
+
+    max_memory = int(os.environ.get("SANDBOX_MAX_MEMORY", "0"))
+    if max_memory:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+
+    # the first figure loads most of Plotly lazily, do it before the first request
+    plotly.express.line(pd.DataFrame({"x": [0], "y": [0]}), x="x", y="y").to_json()
+
+    data_key, df = None, None
+    send(replies, {"ready": True})
+    while True:
+        try:
+            (size,) = _HEADER.unpack(read_exactly(requests, _HEADER.size))
+            header = json.loads(read_exactly(requests, size))
+        except EOFError:
+            return
+
+        # the data follows as an Arrow IPC stream, unless this worker has it already
+        if header.get("data_size") is not None:
+            data = read_exactly(requests, header["data_size"])
+            with pa.ipc.open_stream(data) as reader:
+                table = reader.read_all()
+            data_key = header.get("data_key")
+            df = table.to_pandas(date_as_object=False)
+
+        # the CPU limit is cumulative, so it is moved past what earlier requests used
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        limit = int(cpu_seconds() + header["cpu_seconds"]) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+        try:
+            reply = run(header["code"], df)
+        except MemoryError:
+            # the heap may be fragmented past use, let the parent replace the worker
+            send(replies, {"error": "Generated code ran past the memory limit", "fatal": True})
+            return
+        except BaseException:
+            reply = {"error": traceback.format_exc(limit=-3)}
+        reply["data_key"] = data_key
+        send(replies, reply)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+# Column types of the app's tables, in column order. Rows are cast to these
+# inside DuckDB when they are written, so reads come back typed and need no
+# cleaning in pandas.
+TABLE_SCHEMAS = {
+    "historic_exercises": {
+        "Day": "DATE",
+        "Exercise": "VARCHAR",
+        "Weight": "DECIMAL(18,3)",
+        "Reps": "INTEGER",
+        "Sets": "INTEGER",
+        "Notes": "VARCHAR",
+        "User": "VARCHAR",
+    },
+    "exercises": {
+        "Day": "VARCHAR",
+        "Exercise": "VARCHAR",
+    },
+}
+
+# Physical layout: the sort order a table is written and compacted in, so
+# DuckDB's zone maps can skip row groups, and ART indexes that can be created
+# on its lookup keys. Index keys should be selective, ART builds on keys with
+# few distinct values, like (User, Exercise) alone, are very slow.
+TABLE_LAYOUTS = {
+    "historic_exercises": {
+        "sort_by": ["User", "Exercise", "Day"],
+        "indexes": {"historic_exercises_lookup": ["User", "Exercise", "Day"]},
+    },
+}
+
+# dates typed into the worksheets, ISO dates are accepted as well
+SHEET_DATE_FORMAT = "%d/%m/%Y"
+
+
+def get_schema(table_name: str) -> Optional[Dict[str, str]]:
+    """
+    Declared schema of a table.
+
+    Args:
+        table_name (str): Name of the table.
+
+    Returns:
+        Optional[Dict[str, str]]: Column types in column order, None if the table has no schema.
+    """
+    return TABLE_SCHEMAS.get(table_name)
+
+
+def get_layout(table_name: str) -> dict:
+    """
+    Declared physical layout of a table.
+
+    Args:
+        table_name (str): Name of the table.
+
+    Returns:
+        dict: ``sort_by`` columns and ``indexes`` by name, both empty if undeclared.
+    """
+    return {"sort_by": [], "indexes": {}, **TABLE_LAYOUTS.get(table_name, {})}
+
+
+def order_by(table_name: str) -> str:
+    """
+    ORDER BY clause writing a table in its declared sort order.
+
+    Args:
+        table_name (str): Name of the table.
+
+    Returns:
+        str: e.g. `` ORDER BY "User", "Exercise", "Day"``, empty if unsorted.
+    """
+    sort_by = get_layout(table_name)["sort_by"]
+    if not sort_by:
+        return ""
+    return " ORDER BY " + ", ".join(f'"{column}"' for column in sort_by)
+
+
+def column_definitions(schema: Dict[str, str]) -> str:
+    """
+    Column definitions for CREATE TABLE.
+
+    Args:
+        schema (Dict[str, str]): Column types in column order.
+
+    Returns:
+        str: e.g. ``"Day" DATE, "Exercise" VARCHAR``.
+    """
+    return ", ".join(f'"{column}" {sql_type}' for column, sql_type in schema.items())
+
+
+def cast_columns(schema: Dict[str, str], columns: List[str]) -> str:
+    """
+    SELECT list casting a source's columns to the declared schema.
+
+    Casts are strict, so a value that does not fit its type fails the whole
+    write instead of turning into NULL. Schema columns the source lacks are
+    NULL.
+
+    Args:
+        schema (Dict[str, str]): Column types in column order.
+        columns (List[str]): Columns of the source.
+
+    Returns:
+        str: One cast expression per schema column, aliased to the column name.
+
+    Raises:
+        ValueError: If the source has a column the schema does not declare.
+    """
+    unknown = [column for column in columns if column not in schema]
+    if unknown:
+        raise ValueError(f"Columns {unknown} are not in the table schema")
+
+    expressions = []
+    for column, sql_type in schema.items():
+        if column not in columns:
+            expression = f"CAST(NULL AS {sql_type})"
+        elif sql_type == "DATE":
+            # ISO dates and timestamps cast directly, sheet dates are dd/mm/yyyy
+            expression = (
+                f'CASE WHEN TRY_CAST("{column}" AS DATE) IS NOT NULL '
+                f'THEN CAST("{column}" AS DATE) '
+                f"ELSE CAST(strptime(CAST(\"{column}\" AS VARCHAR), "
+                f"'{SHEET_DATE_FORMAT}') AS DATE) END"
+            )
+        else:
+            expression = f'CAST("{column}" AS {sql_type})'
+        expressions.append(f'{expression} AS "{column}"')
+    return ", ".join(expressions)
+
+
+def pandas_dtypes(schema: Dict[str, str], dtype_backend: str = "numpy") -> dict:
+    """
+    pandas dtypes matching a schema, for data that did not come from DuckDB.
+
+    DATE columns are left out, they need parsing rather than astype.
+
+    Args:
+        schema (Dict[str, str]): Column types in column order.
+        dtype_backend (str): "numpy" or "pyarrow".
+
+    Returns:
+        dict: dtype of each non-date column.
+    """
+    if dtype_backend == "pyarrow":
+        types = {
+            "VARCHAR": pd.ArrowDtype(pa.string()),
+            "INTEGER": pd.ArrowDtype(pa.int32()),
+            "DECIMAL": pd.ArrowDtype(pa.float64()),
+        }
+    else:
+        types = {"VARCHAR": str, "INTEGER": int, "DECIMAL": float}
+    return {
+        column: types[sql_type.split("(")[0]]
+        for column, sql_type in schema.items()
+        if sql_type != "DATE"
+    }
@@ -0,0 +1,133 @@
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+SET_COLUMNS = ["Day", "Exercise", "Weight", "Reps", "Sets", "Notes", "User"]
+
+
+class SetBuffer:
+    def __init__(
+        self,
+        max_pending: int = 20,
+        max_age: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Buffer of recorded sets waiting to be written to one or more sinks.
+
+        Every set gets a stable id when it is added. Each sink (e.g. "duckdb"
+        or "sheets") remembers which ids it has already written, so a flush
+        only ever sends rows that sink has not seen and reruns cannot write
+        a row twice.
+
+        The record page flushes on every submit, the thresholds are extra
+        triggers, e.g. for sets left pending by a failed write.
+
+        Args:
+            max_pending (int): Flush once this many sets are pending for a sink.
+            max_age (float): Flush once the oldest pending set is this many
+                seconds old.
+            clock (Callable[[], float]): Time source, overridable for tests.
+        """
+        self.max_pending = max_pending
+        self.max_age = max_age
+        self._clock = clock
+        self._records: Dict[str, dict] = {}
+        self._added_at: Dict[str, float] = {}
+        self._written: Dict[str, set] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record: dict, set_id: Optional[str] = None) -> str:
+        """
+        Add a recorded set to the buffer.
+
+        Args:
+            record (dict): Values for the columns in SET_COLUMNS.
+            set_id (str, optional): Id to use instead of a generated one.
+                Adding an id that is already buffered is a no-op.
+
+        Returns:
+            str: The set's id.
+        """
+        set_id = set_id or uuid.uuid4().hex
+        if set_id not in self._records:
+            self._records[set_id] = {col: record.get(col) for col in SET_COLUMNS}
+            self._added_at[set_id] = self._clock()
+        return set_id
+
+    def _pending_ids(self, sink: str) -> list:
+        written = self._written.get(sink, set())
+        return [set_id for set_id in self._records if set_id not in written]
+
+    def pending(self, sink: str) -> pd.DataFrame:
+        """
+        Sets not yet written to a sink.
+
+        Args:
+            sink (str): Name of the sink.
+
+        Returns:
+            pd.DataFrame: Pending sets with a ``set_id`` column.
+        """
+        ids = self._pending_ids(sink)
+        return pd.DataFrame(
+            [{**self._records[set_id], "set_id": set_id} for set_id in ids],
+            columns=SET_COLUMNS + ["set_id"],
+        )
+
+    def should_flush(self, sink: str) -> bool:
+        """
+        Whether the size or age threshold has been reached for a sink.
+
+        Args:
+            sink (str): Name of the sink.
+
+        Returns:
+            bool: True if the sink's pending sets should be written now.
+        """
+        ids = self._pending_ids(sink)
+        if not ids:
+            return False
+        if len(ids) >= self.max_pending:
+            return True
+        oldest = min(self._added_at[set_id] for set_id in ids)
+        return self._clock() - oldest >= self.max_age
+
+    def flush(self, sink: str, writer: Callable[[pd.DataFrame], None]) -> int:
+        """
+        Write all pending sets for a sink in a single call.
+
+        The sets are only marked as written once ``writer`` returns, so a
+        failed write is retried on the next flush.
+
+        Args:
+            sink (str): Name of the sink.
+            writer (Callable[[pd.DataFrame], None]): Receives the pending sets,
+                including the ``set_id`` column.
+
+        Returns:
+            int: Number of sets written.
+        """
+        df = self.pending(sink)
+        if df.empty:
+            return 0
+
+        writer(df)
+        self._written.setdefault(sink, set()).update(df["set_id"])
+        return len(df)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        All sets recorded in this buffer, written or not.
+
+        Returns:
+            pd.DataFrame: Recorded sets with a ``set_id`` column.
+        """
+        return pd.DataFrame(
+            [{**record, "set_id": set_id} for set_id, record in self._records.items()],
+            columns=SET_COLUMNS + ["set_id"],
+        )
@@ -1,36 +1,57 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 import plotly.express as px
-from modules.get_google_sheets_data import get_google_sheet, export_to_google_sheets
+from modules.get_google_sheets_data import (
+    export_to_google_sheets,
+    get_google_sheet,
+    track_auth_round_trips,
+)
 from modules.duckdb import DuckDBManager
+from modules.set_buffer import SetBuffer
+from modules.schema import SHEET_DATE_FORMAT, get_schema, pandas_dtypes
+from modules.dedup import REDUCE_KEYS, latest_by_hash
 import hashlib
-from typing import Optional, Union, Tuple, List
+from typing import Callable, Dict, Optional, Union, Tuple, List
 import os
 
 
-def clean_lifts_data(lifts_df: pd.DataFrame) -> pd.DataFrame:
+def clean_lifts_data(lifts_df: pd.DataFrame, dtype_backend: str = "numpy") -> pd.DataFrame:
     """
-    Cleans the lifts data.
+    Cleans the lifts data to the historic_exercises schema.
+
+    Data read from DuckDB is already typed at ingest and needs no cleaning,
+    this is for lifts that come from elsewhere, e.g. straight from the sheet.
 
     Parameters:
     lifts_df (pd.DataFrame): The DataFrame to clean.
+    dtype_backend (str, optional): "numpy" for NumPy dtypes with object strings and
+        dates, or "pyarrow" for pd.ArrowDtype columns. Default is "numpy".
 
     Returns:
     pd.DataFrame: The cleaned DataFrame.
     """
+    if dtype_backend not in ("numpy", "pyarrow"):
+        raise ValueError(f"Unknown dtype backend {dtype_backend}")
 
     try:
         # Data cleaning operations
         lifts_df = lifts_df.copy()
-        columns_to_dtype = {
-            "Weight": float,
-            "Exercise": str,
-            "Reps": str,
-            "Sets": int,
-            "Notes": str,
-        }
-        lifts_df = lifts_df.astype(columns_to_dtype)
-        lifts_df["Day"] = pd.to_datetime(lifts_df["Day"], format="%d/%m/%Y").dt.date
+        columns_to_dtype = pandas_dtypes(get_schema("historic_exercises"), dtype_backend)
+        lifts_df = lifts_df.astype(
+            {col: dtype for col, dtype in columns_to_dtype.items() if col in lifts_df}
+        )
+
+        if dtype_backend == "pyarrow":
+            # dates read from DuckDB are already dates, sheet dates are dd/mm/yyyy
+            day = lifts_df["Day"]
+            if day.dtype.kind != "M":
+                day = pd.to_datetime(day, format=SHEET_DATE_FORMAT)
+            lifts_df["Day"] = day.astype(pd.ArrowDtype(pa.date32()))
+        else:
+            lifts_df["Day"] = pd.to_datetime(
+                lifts_df["Day"], format=SHEET_DATE_FORMAT
+            ).dt.date
     except Exception as e:
         print(f"Error in cleaning data: {e}")
         return None
@@ -38,20 +59,32 @@ def clean_lifts_data(lifts_df: pd.DataFrame) -> pd.DataFrame:
     return lifts_df
 
 
-def reduce_dataframe_size(lifts_df: pd.DataFrame) -> pd.DataFrame:
+def reduce_dataframe_size(lifts_df: pd.DataFrame, method: str = "hash") -> pd.DataFrame:
     """
-    Reduces the size of the DataFrame by dropping duplicates.
+    Reduces the size of the DataFrame by keeping only the latest run of each set.
+
+    A set is a repeat if it has the same Weight, Reps, Sets and Exercise.
+    DuckDBManager.get_reduced_lifts does the same in SQL.
 
     Parameters:
     lifts_df (pd.DataFrame): The DataFrame to reduce.
+    method (str, optional): "hash" groups rows by a hash of the set and keeps
+        its latest Day, without sorting, rows stay in input order. "sort" is
+        the original sort and drop_duplicates, ordered by Weight, Reps and
+        Sets descending. Default is "hash".
 
     Returns:
     pd.DataFrame: The reduced DataFrame.
     """
     if not isinstance(lifts_df, pd.DataFrame):
         raise ValueError("Input should be a pandas DataFrame")
+    if method not in ("hash", "sort"):
+        raise ValueError(f"Unknown reduce method {method}")
 
     try:
+        if method == "hash":
+            return latest_by_hash(lifts_df, REDUCE_KEYS, order_column="Day")
+
         # Drop exact duplicates
         lifts_df = lifts_df.drop_duplicates()
 
@@ -60,9 +93,7 @@ def reduce_dataframe_size(lifts_df: pd.DataFrame) -> pd.DataFrame:
             by=["Weight", "Reps", "Sets", "Exercise", "Day"],
             ascending=[False, False, False, True, False],
         )
-        lifts_df = lifts_df.drop_duplicates(
-            subset=["Weight", "Reps", "Sets", "Exercise"], keep="first"
-        )
+        lifts_df = lifts_df.drop_duplicates(subset=REDUCE_KEYS, keep="first")
     except Exception as e:
         print(f"Error in reducing DataFrame size: {e}")
         return None
@@ -70,20 +101,50 @@ def reduce_dataframe_size(lifts_df: pd.DataFrame) -> pd.DataFrame:
     return lifts_df
 
 
+def get_set_buffer() -> SetBuffer:
+    """Returns the session's buffer of recorded sets, creating it if needed."""
+    if "set_buffer" not in st.session_state:
+        st.session_state.set_buffer = SetBuffer()
+    return st.session_state.set_buffer
+
+
 def add_df_to_session_state() -> None:
-    """Adds a pandas DataFrame to the session state data."""
-    row = pd.DataFrame(
+    """Adds the submitted set to the session's set buffer, to be saved on this rerun."""
+    st.session_state.sets_submitted = True
+    get_set_buffer().add(
         {
-            "Day": [st.session_state.input_date],
-            "Exercise": [st.session_state.input_exercise],
-            "Weight": [st.session_state.input_weight],
-            "Reps": [st.session_state.input_reps],
-            "Sets": [st.session_state.input_sets],
-            "Notes": [st.session_state.input_notes],
-            "User": [st.session_state.input_name],
+            "Day": st.session_state.input_date,
+            "Exercise": st.session_state.input_exercise,
+            "Weight": st.session_state.input_weight,
+            "Reps": st.session_state.input_reps,
+            "Sets": st.session_state.input_sets,
+            "Notes": st.session_state.input_notes,
+            "User": st.session_state.input_name,
         }
     )
-    st.session_state.data = pd.concat([st.session_state.data, row])
+
+
+def flush_recorded_sets(
+    set_buffer: SetBuffer,
+    writers: Dict[str, Callable[[pd.DataFrame], None]],
+    force: bool = False,
+) -> Dict[str, int]:
+    """
+    Flush pending sets to each sink whose threshold has been reached.
+
+    Parameters:
+    set_buffer (SetBuffer): The buffer of recorded sets.
+    writers (Dict[str, Callable]): Writer for each sink, keyed by sink name.
+    force (bool, optional): Flush every sink regardless of thresholds. Default is False.
+
+    Returns:
+    Dict[str, int]: Number of sets written to each sink that was flushed.
+    """
+    written = {}
+    for sink, writer in writers.items():
+        if force or set_buffer.should_flush(sink):
+            written[sink] = set_buffer.flush(sink, writer)
+    return written
 
 
 def hash_password(password: str) -> str:
@@ -150,14 +211,18 @@ def load_sheets_data(
     """
     try:
         # Load data from Google Sheets
-        lifts_df = get_google_sheet(
-            sheet_url=sheet_url, credentials=google_sheet_cred_dict, sheet_name="Lifts"
-        )
-        exercises_df = get_google_sheet(
-            sheet_url=sheet_url,
-            credentials=google_sheet_cred_dict,
-            sheet_name="Exercises",
-        )
+        with track_auth_round_trips() as auth_counts:
+            lifts_df = get_google_sheet(
+                sheet_url=sheet_url,
+                credentials=google_sheet_cred_dict,
+                sheet_name="Lifts",
+            )
+            exercises_df = get_google_sheet(
+                sheet_url=sheet_url,
+                credentials=google_sheet_cred_dict,
+                sheet_name="Exercises",
+            )
+        print(f"Google Sheets auth round-trips loading data: {auth_counts['total']}")
         exercise_list_master = exercises_df["Exercise"].unique()
 
         return lifts_df, exercises_df, exercise_list_master
@@ -199,23 +264,34 @@ def load_data_to_duckdb(
     lifts_df: pd.DataFrame,
     exercises_df: pd.DataFrame,
     duckdb_manager: Optional[DuckDBManager] = None,
-) -> None:
+) -> Dict[str, Dict[str, float]]:
     """
     Load data to DuckDB using the DuckDB manager.
 
+    Rows are cast to the declared schema once here, so later reads need no cleaning.
+
     Parameters:
     lifts_df (pd.DataFrame): The dataframe containing lift data.
     exercises_df (pd.DataFrame): The dataframe containing exercise data.
     duckdb_manager (DuckDBManager, optional): The DuckDB manager. If None, a new DuckDB manager is created.
+
+    Returns:
+    Dict[str, Dict[str, float]]: Seconds spent in each ingest stage, per table.
     """
+    timings = {}
     try:
         if duckdb_manager is None:
             duckdb_manager = DuckDBManager()
 
-        duckdb_manager.setup_table("historic_exercises", lifts_df)
-        duckdb_manager.setup_table("exercises", exercises_df)
+        timings["historic_exercises"] = duckdb_manager.bulk_ingest(
+            "historic_exercises", lifts_df, replace=True
+        )
+        timings["exercises"] = duckdb_manager.bulk_ingest(
+            "exercises", exercises_df, replace=True
+        )
     except Exception as e:
         print(f"An error occurred: {e}")
+    return timings
 
 
 def select_session(exercises_df: pd.DataFrame) -> str:
@@ -406,7 +482,6 @@ def record_sets(
         if duckdb and duckdb_manager is None:
             duckdb_manager = DuckDBManager()
 
-        lifts_df = clean_lifts_data(lifts_df)
         session_choice = select_session(exercises_df)
         make_choice = select_exercise(exercises_df, session_choice)
         user_choice = select_user(lifts_df)
@@ -414,21 +489,7 @@ def record_sets(
         if session_choice == "MISC":
             add_misc_exercise()
 
-        if "data" not in st.session_state:
-            data = pd.DataFrame(
-                {
-                    "Day": [],
-                    "Exercise": [],
-                    "Weight": [],
-                    "Reps": [],
-                    "Sets": [],
-                    "Notes": [],
-                    "User": [],
-                }
-            )
-            st.session_state.data = data
-
-        data = st.session_state.data
+        set_buffer = get_set_buffer()
 
         # If make_choice is a string, put it in a list
         if isinstance(make_choice, str):
@@ -436,35 +497,62 @@ def record_sets(
 
         create_form(make_choice)
 
+        writers = {}
         if sheets:
-            export_to_google_sheets(
+            writers["sheets"] = lambda df: export_to_google_sheets(
                 sheet_url=sheet_url,
-                df_new=data,
+                df_new=df,
                 credentials=google_sheet_cred_dict,
                 sheet_name="Lifts",
             )
 
         if duckdb:
-            # Add data to DuckDB
-            duckdb_manager.append_to_table(df=data, table_name="historic_exercises")
+
+            def append_sets(df: pd.DataFrame) -> None:
+                # Add data to DuckDB, keeping the sets pending if the insert fails
+                if not duckdb_manager.append_to_table(
+                    df=df.drop(columns="set_id"), table_name="historic_exercises"
+                ):
+                    raise RuntimeError("Could not append sets to DuckDB")
+
+            writers["duckdb"] = append_sets
+
+        # A submitted set is saved right away, in one insert per sink. The
+        # thresholds also retry sets whose earlier write failed.
+        submitted = st.session_state.pop("sets_submitted", False)
+        with track_auth_round_trips() as auth_counts:
+            written = flush_recorded_sets(set_buffer, writers, force=submitted)
+        if sheets and auth_counts["total"]:
+            print(f"Google Sheets auth round-trips saving sets: {auth_counts['total']}")
+        if any(written.values()):
+            st.success(f"Saved {max(written.values())} set(s).")
+
+        pending = max(len(set_buffer.pending(sink)) for sink in writers)
+        if pending:
+            st.caption(f"{pending} set(s) waiting to be saved.")
     except Exception as e:
         print(f"An error occurred: {e}")
 
 
-def performance_tracking(lifts_df: pd.DataFrame, exercise_list_master: list) -> None:
+def performance_tracking(
+    exercise_list_master: list, duckdb_manager: Optional[DuckDBManager] = None
+) -> None:
     """
     Track the performance of exercises.
 
     Parameters:
-    lifts_df (pd.DataFrame): The dataframe containing lift data.
     exercise_list_master (list): The list of exercises.
+    duckdb_manager (DuckDBManager, optional): The DuckDB manager. If None, a new DuckDB manager is created.
     """
+    if duckdb_manager is None:
+        duckdb_manager = DuckDBManager()
+
     # Filter data for performance tracking
     selected_exercise = st.selectbox(
         "Select an exercise for performance tracking:",
         exercise_list_master,
     )
-    selected_lifts = lifts_df[lifts_df["Exercise"] == selected_exercise]
+    selected_lifts = duckdb_manager.get_exercise_history(selected_exercise)
 
     # Plotting the performance tracking chart
     fig = px.line(
@@ -480,26 +568,28 @@ def performance_tracking(lifts_df: pd.DataFrame, exercise_list_master: list) ->
     st.plotly_chart(fig, use_container_width=True)
 
 
-def user_pb_comparison(lifts_df: pd.DataFrame, exercise_list_master: list) -> None:
+def user_pb_comparison(
+    exercise_list_master: list, duckdb_manager: Optional[DuckDBManager] = None
+) -> None:
     """
     Compare the personal bests of users.
 
     Parameters:
-    lifts_df (pd.DataFrame): The dataframe containing lift data.
     exercise_list_master (list): The list of exercises.
+    duckdb_manager (DuckDBManager, optional): The DuckDB manager. If None, a new DuckDB manager is created.
     """
+    if duckdb_manager is None:
+        duckdb_manager = DuckDBManager()
+
     # Filter data for user PB comparison
     selected_exercises = st.multiselect(
         "Select exercises for PB comparison:",
         exercise_list_master,
         default=["BENCH PRESS", "SQUAT", "DEADLIFT"],
     )
-    selected_lifts = lifts_df[lifts_df["Exercise"].isin(selected_exercises)]
 
-    # Sorting and dropping duplicates to get user's all-time PBs
-    user_pbs = selected_lifts.sort_values(
-        by=["User", "Exercise", "Weight", "Day"], ascending=[False, False, False, True]
-    ).drop_duplicates(["User", "Exercise"])
+    # User's all-time PBs, computed in DuckDB
+    user_pbs = duckdb_manager.get_personal_bests(selected_exercises)
 
     # Plotting the user PB comparison chart
     fig = px.bar(
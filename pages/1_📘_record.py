@@ -51,11 +51,11 @@ def main():
 
     # Display fetched data and exercise list
     st.subheader("Performance Tracking")
-    performance_tracking(lifts_df, exercise_list_master)
+    performance_tracking(exercise_list_master)
 
     # User PB Comparison
     st.subheader("User PB Comparison")
-    user_pb_comparison(lifts_df, exercise_list_master)
+    user_pb_comparison(exercise_list_master)
 
 
 if __name__ == "__main__":
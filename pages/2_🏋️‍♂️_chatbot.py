@@ -1,6 +1,9 @@
-from openai import OpenAI
 import streamlit as st
+from modules.chat_history import compact_history
+from modules.llm import get_llm_client
+from modules.response_cache import get_response_cache
 from modules.prompts_sql import get_system_prompt
+from modules.query_guard import QueryRejected, get_query_guard
 from modules.util import reduce_dataframe_size, clean_lifts_data, check_password
 from modules.duckdb import DuckDBManager
 import re
@@ -36,27 +39,41 @@ if check_password():
     if prompts := st.chat_input():
         st.session_state.messages.append({"role": "user", "content": prompts})
 
-    # display the existing chat messages
+    # display the existing chat messages, older turns are kept as a digest
+    # and query results as previews, so this doesn't grow with the conversation
     for message in st.session_state.messages:
+        if message.get("digest"):
+            with st.expander("Earlier conversation"):
+                st.text(message["content"])
+            continue
         with st.chat_message(message["role"]):
             st.write(message["content"])
+            if message.get("results") is not None:
+                st.dataframe(message["results"])
+                st.caption(
+                    f"First {len(message['results'])} of {message['result_rows']} rows"
+                )
 
     # If last message is not from assistant, we need to generate a new response
     if st.session_state.messages[-1]["role"] != "assistant":
-        # Call LLM
+        # Repeated questions about unchanged data are answered from the cache
+        response_cache = get_response_cache()
+        data_version = response_cache.data_version(DuckDBManager())
+        response = response_cache.get(st.session_state.messages, data_version)
+
+        # Otherwise stream the reply from the shared LLM client as it is
+        # generated. A rerun mid-stream closes the generator, which cancels the request.
+        stats = {}
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                r = OpenAI().chat.completions.create(
-                    messages=[
-                        {"role": m["role"], "content": m["content"]}
-                        for m in st.session_state.messages
-                    ],
-                    model="gpt-3.5-turbo",
+            if response is None:
+                response = st.write_stream(
+                    get_llm_client().stream(st.session_state.messages, stats=stats)
                 )
-                response = r.choices[0].message.content
+                response_cache.put(st.session_state.messages, data_version, response)
+            else:
                 st.write(response)
 
-        message = {"role": "assistant", "content": response}
+        message = {"role": "assistant", "content": response, "stats": stats}
 
         # Use regular expression to search for a SQL query pattern in the 'response' string
         sql_match = re.search(r"```sql\n(.*)\n```", response, re.DOTALL)
@@ -70,12 +87,27 @@ if check_password():
             sql = sql_match.group(1)
             st.write(sql)
 
-            # Execute the SQL query using DuckDB connection and store the results
-            message["results"] = DuckDBManager().get_data(query=sql)
-
-            # Display the results
-            if message["results"] is not None:
+            # Execute the generated SQL with bounded rows, cost, time and
+            # memory, and store the results
+            query_stats = {}
+            try:
+                message["results"], truncated = get_query_guard().run(
+                    sql, stats=query_stats
+                )
+            except QueryRejected as e:
+                st.error(f"Could not run the query: {e}")
+            else:
+                # Display the results
+                if truncated:
+                    st.warning(
+                        f"Showing the first {query_stats['rows']} rows, the query "
+                        f"was stopped ({query_stats['truncated'].replace('_', ' ')})."
+                    )
                 st.dataframe(message["results"])
 
-    # Append the assistant's message (including SQL results) to the chat messages
-    st.session_state.messages.append(message)
+        # Append the assistant's message (including SQL results) to the chat messages
+        st.session_state.messages.append(message)
+
+        # Fold turns beyond the recent window into a digest, so later
+        # requests stay small
+        st.session_state.messages = compact_history(st.session_state.messages)
@@ -1,5 +1,8 @@
-from openai import OpenAI
 import streamlit as st
+from modules.chat_history import compact_history
+from modules.llm import get_llm_client
+from modules.response_cache import get_response_cache
+from modules.sandbox import SandboxError, get_sandbox
 from modules.prompts_viz import get_plotly_prompt
 from modules.duckdb import DuckDBManager
 from modules.util import reduce_dataframe_size, clean_lifts_data, check_password
@@ -37,38 +40,43 @@ if check_password():
     if prompts := st.chat_input():
         st.session_state.messages.append({"role": "user", "content": prompts})
 
-    # display the existing chat messages
+    # display the existing chat messages, older turns are kept as a digest
+    # so this doesn't grow with the conversation
     for message in st.session_state.messages:
+        if message.get("digest"):
+            with st.expander("Earlier conversation"):
+                st.text(message["content"])
+            continue
         with st.chat_message(message["role"]):
             st.write(message["content"])
 
     # If last message is not from assistant, we need to generate a new response
     if st.session_state.messages[-1]["role"] != "assistant":
-        # Call LLM
+        # Warm up the code sandbox while the reply is generated
+        get_sandbox().start(background=True)
+
+        # Repeated questions about unchanged data are answered from the cache
+        response_cache = get_response_cache()
+        data_version = response_cache.data_version(DuckDBManager())
+        response = response_cache.get(st.session_state.messages, data_version)
+
+        # Otherwise stream the reply from the shared LLM client as it is
+        # generated. A rerun mid-stream closes the generator, which cancels the request.
+        stats = {}
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                r = OpenAI().chat.completions.create(
-                    messages=[
-                        {"role": m["role"], "content": m["content"]}
-                        for m in st.session_state.messages
-                    ],
-                    model="gpt-3.5-turbo",
+            if response is None:
+                response = st.write_stream(
+                    get_llm_client().stream(st.session_state.messages, stats=stats)
                 )
-                response = r.choices[0].message.content
+                response_cache.put(st.session_state.messages, data_version, response)
+            else:
                 st.write(response)
 
-        message = {"role": "assistant", "content": response}
+        message = {"role": "assistant", "content": response, "stats": stats}
 
         # Use regular expression to search for a SQL query pattern in the 'response' string
         python_match = re.search(r"```python\n(.*)\n```", response, re.DOTALL)
 
-        # Execute the SQL query using DuckDB connection and store the results
-        df = DuckDBManager().get_data(table_name="historic_exercises")
-
-        # Prepare a dictionary to capture local variables after exec
-        local_vars = {"df": df}
-        global_vars = {}
-
         # List of Plotly-specific keywords
         plotly_keywords = ["plotly", "px", "go", "fig"]
 
@@ -80,13 +88,25 @@ if check_password():
             # Check if the Python code contains Plotly-specific keywords
             if any(keyword in python_code for keyword in plotly_keywords):
 
-                # Execute Python
-                exec(python_code, global_vars, local_vars)
-
-                # Check if 'fig' variable (commonly used for Plotly figures) is in local variables
-                if "fig" in local_vars:
-                    # Display the figure in Streamlit
-                    st.plotly_chart(local_vars["fig"])
+                # The generated code needs the whole table as df, only load it
+                # when there is code to run. Repeat loads come from the result cache.
+                db_manager = DuckDBManager()
+                df = db_manager.get_data(table_name="historic_exercises")
+
+                # Run it in a sandboxed worker process, which keeps df between
+                # snippets until the table changes, and get back the figure
+                try:
+                    fig = get_sandbox().run(
+                        python_code,
+                        df,
+                        data_key=db_manager.table_version("historic_exercises"),
+                    )
+                except SandboxError as e:
+                    st.error(f"Could not run the visualization code: {e}")
+                else:
+                    if fig is not None:
+                        # Display the figure in Streamlit
+                        st.plotly_chart(fig)
             else:
                 st.error(
                     "The provided code does not seem to be a Plotly visualization. Please provide valid Plotly code."
@@ -94,3 +114,7 @@ if check_password():
 
         # Append the assistant's message (including SQL results) to the chat messages
         st.session_state.messages.append(message)
+
+        # Fold turns beyond the recent window into a digest, so later
+        # requests stay small
+        st.session_state.messages = compact_history(st.session_state.messages)
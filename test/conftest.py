@@ -0,0 +1,17 @@
+import pytest
+
+from modules.connection_pool import close_all_pools
+from modules.duckdb import DuckDBManager
+from modules.maintenance import get_background_maintenance
+from modules.query_cache import get_query_cache
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    # a database of its own, with no results cached by earlier tests
+    get_query_cache().clear()
+    yield DuckDBManager(db_dir=str(tmp_path))
+    # queued maintenance would otherwise reopen a pool on the removed directory
+    get_background_maintenance().wait()
+    close_all_pools()
+    get_query_cache().clear()
@@ -0,0 +1,92 @@
+import datetime
+import threading
+import time
+
+
+class FakeResponse:
+    status_code = 429
+    content = b'{"errors": [{"message": "Too Many Requests"}]}'
+    headers = {"Retry-After": "0"}
+
+
+def activity_payload(day):
+    n = int(day[-2:]) % 3
+    return {
+        "activities": [
+            {
+                "activityId": 90013 + i,
+                "name": "Walk" if i == 0 else "Run",
+                "calories": 100 + i,
+                "steps": 1000 * (i + 1),
+                "startDate": day,
+            }
+            for i in range(n)
+        ]
+    }
+
+
+def sleep_payload(day, minutes=5):
+    start = datetime.datetime.strptime(day, "%Y-%m-%d") - datetime.timedelta(minutes=2)
+    return {
+        "sleep": [
+            {
+                "dateOfSleep": day,
+                "startTime": start.strftime("%Y-%m-%dT%H:%M:%S.000"),
+                "isMainSleep": True,
+                "efficiency": 90,
+                "duration": minutes * 60000,
+                "minutesAsleep": minutes - 1,
+                "minutesAwake": 1,
+                "awakeCount": 1,
+                "restlessCount": 0,
+                "restlessDuration": 0,
+                "timeInBed": minutes,
+                "minuteData": [
+                    {
+                        "dateTime": (start + datetime.timedelta(minutes=m)).strftime(
+                            "%H:%M:%S"
+                        ),
+                        "value": "2" if m == 1 else "1",
+                    }
+                    for m in range(minutes)
+                ],
+            }
+        ]
+    }
+
+
+class FakeFitbit:
+    """Stand-in for fitbit.Fitbit with injected latency and optional 429s."""
+
+    def __init__(self, latency=0.0, rate_limited_days=()):
+        self.latency = latency
+        self.rate_limited_days = set(rate_limited_days)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _request(self, endpoint, date, payload):
+        with self._lock:
+            self.calls.append((endpoint, date))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.latency)
+            if (endpoint, date) in self.rate_limited_days:
+                from fitbit.exceptions import HTTPTooManyRequests
+
+                self.rate_limited_days.discard((endpoint, date))
+                error = HTTPTooManyRequests(FakeResponse())
+                error.retry_after_secs = 0
+                raise error
+            return payload(date)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def activities(self, date):
+        return self._request("activities", date, activity_payload)
+
+    def sleep(self, date):
+        return self._request("sleep", date, sleep_payload)
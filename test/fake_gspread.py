@@ -0,0 +1,80 @@
+import json
+
+
+class FakeWorksheet:
+    """In-memory stand-in for gspread.Worksheet that counts API calls and bytes."""
+
+    def __init__(self, title="Lifts", rows=None):
+        self.title = title
+        self.values = [list(row) for row in rows or []]
+        self.row_count = max(len(self.values), 1000)
+        self.col_count = 26
+        self.calls = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def _record(self, name, sent=None, received=None):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if sent is not None:
+            self.bytes_sent += len(json.dumps(sent, default=str))
+        if received is not None:
+            self.bytes_received += len(json.dumps(received, default=str))
+
+    @property
+    def api_calls(self):
+        return sum(self.calls.values())
+
+    def row_values(self, row, **kwargs):
+        values = self.values[row - 1] if len(self.values) >= row else []
+        self._record("row_values", received=values)
+        return list(values)
+
+    def get_all_values(self, **kwargs):
+        self._record("get_all_values", received=self.values)
+        return [list(row) for row in self.values]
+
+    def get_all_records(self, **kwargs):
+        self._record("get_all_records", received=self.values)
+        if len(self.values) < 2:
+            return []
+        header = self.values[0]
+        return [dict(zip(header, row)) for row in self.values[1:]]
+
+    def append_rows(self, values, value_input_option="RAW", **kwargs):
+        self._record("append_rows", sent=values)
+        self.values.extend(list(row) for row in values)
+
+    def clear(self):
+        self._record("clear")
+        self.values = []
+
+    def resize(self, rows=None, cols=None):
+        self._record("resize")
+        self.row_count = rows or self.row_count
+        self.col_count = cols or self.col_count
+
+    def update_cells(self, cell_list, value_input_option="RAW"):
+        self._record("update_cells", sent=[cell.value for cell in cell_list])
+        for cell in cell_list:
+            while len(self.values) < cell.row:
+                self.values.append([])
+            row = self.values[cell.row - 1]
+            while len(row) < cell.col:
+                row.append("")
+            row[cell.col - 1] = cell.value
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets):
+        self.worksheets = worksheets
+
+    def worksheet(self, title):
+        return self.worksheets[title]
+
+
+class FakeClient:
+    def __init__(self, spreadsheets):
+        self.spreadsheets = spreadsheets
+
+    def open_by_url(self, url):
+        return self.spreadsheets[url]
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIServer:
+    """Local OpenAI-compatible chat completions server that streams canned tokens.
+
+    Records every request body and the client port it arrived on, so tests can
+    tell whether connections were reused.
+    """
+
+    def __init__(self, tokens=None, first_token_delay=0.0, token_delay=0.0):
+        self.tokens = list(tokens or ["Hello", " from", " the", " fake", " model."])
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.requests = []
+        self.client_ports = []
+        self.disconnects = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def connections(self):
+        return len(set(self.client_ports))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests.append(body)
+                fake.client_ports.append(self.client_address[1])
+                if body.get("stream"):
+                    self._stream(body["model"])
+                else:
+                    self._complete(body["model"])
+
+            def _complete(self, model):
+                time.sleep(fake.first_token_delay + fake.token_delay * len(fake.tokens))
+                payload = json.dumps(
+                    {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": model,
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {
+                                    "role": "assistant",
+                                    "content": "".join(fake.tokens),
+                                },
+                                "finish_reason": "stop",
+                            }
+                        ],
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, model):
+                events = [
+                    b"data: "
+                    + json.dumps(
+                        {
+                            "id": "chatcmpl-fake",
+                            "object": "chat.completion.chunk",
+                            "created": 0,
+                            "model": model,
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "delta": {"content": token},
+                                    "finish_reason": None,
+                                }
+                            ],
+                        }
+                    ).encode()
+                    + b"\n\n"
+                    for token in fake.tokens
+                ]
+                events.append(b"data: [DONE]\n\n")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(sum(map(len, events))))
+                self.end_headers()
+                time.sleep(fake.first_token_delay)
+                try:
+                    for i, event in enumerate(events):
+                        if i:
+                            time.sleep(fake.token_delay)
+                        self.wfile.write(event)
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    fake.disconnects += 1
+                    self.close_connection = True
+
+        return Handler
@@ -0,0 +1,102 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from modules.util import clean_lifts_data
+
+
+def lifts_table():
+    return pa.table(
+        {
+            "Day": pa.array(pd.to_datetime(["2024-01-01", "2024-01-02"]).date),
+            "Exercise": ["SQUAT", "SQUAT"],
+            "Weight": [100.0, 105.0],
+            "Reps": pa.array([5, 5], pa.int32()),
+            "Sets": pa.array([3, 3], pa.int32()),
+            "Notes": ["", "felt strong"],
+            "User": ["JM", "JM"],
+        }
+    )
+
+
+@pytest.fixture
+def manager(db_manager):
+    db_manager.setup_table("historic_exercises", lifts_table())
+    return db_manager
+
+
+def test_arrow_formats(manager):
+    table = manager.get_data(table_name="historic_exercises", format="arrow")
+    assert isinstance(table, pa.Table)
+    assert table.schema.field("Exercise").type == pa.string()
+
+    df = manager.get_data(table_name="historic_exercises", format="pandas_arrow")
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+    assert df["Notes"].tolist() == ["", "felt strong"]
+
+    # each format is cached separately
+    df = manager.get_data(table_name="historic_exercises")
+    assert df["Exercise"].dtype == object
+    assert manager.cache_stats()["entries"] == 3
+
+
+def test_polars_format(manager):
+    pytest.importorskip("polars")
+    df = manager.get_data(table_name="historic_exercises", format="polars")
+    assert df.shape == (2, 7)
+
+
+def test_unknown_format(manager):
+    with pytest.raises(ValueError):
+        manager.get_data(table_name="historic_exercises", format="csv")
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        lambda table: table,
+        lambda table: table.to_batches()[0],
+        lambda table: pa.RecordBatchReader.from_batches(table.schema, table.to_batches()),
+    ],
+)
+def test_writes_accept_arrow(manager, rows):
+    table = lifts_table().slice(1).set_column(2, "Weight", pa.array([110.0]))
+    assert manager.append_to_table(rows(table), "historic_exercises")
+    assert manager.upsert_to_table(rows(table), "historic_exercises", ["Day"])
+
+    df = manager.get_data(table_name="historic_exercises")
+    assert df["Weight"].tolist() == [100.0, 110.0]
+    assert manager.get_personal_bests(["SQUAT"])["Weight"].tolist() == [110.0]
+
+
+def test_empty_arrow_write(manager):
+    assert not manager.append_to_table(lifts_table().slice(0, 0), "historic_exercises")
+    with pytest.raises(ValueError):
+        manager.setup_table("historic_exercises", lifts_table().slice(0, 0))
+
+
+@pytest.mark.parametrize("format", ["pandas", "pandas_arrow"])
+def test_clean_lifts_data_pyarrow_backend(manager, format):
+    lifts_df = manager.get_data(table_name="historic_exercises", format=format)
+    df = clean_lifts_data(lifts_df, dtype_backend="pyarrow")
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+    assert df["Day"].dtype == pd.ArrowDtype(pa.date32())
+    assert df["Reps"].tolist() == [5, 5]
+
+
+def test_clean_lifts_data_parses_sheet_dates():
+    df = pd.DataFrame(
+        {
+            "Day": ["31/01/2024"],
+            "Exercise": ["SQUAT"],
+            "Weight": ["100"],
+            "Reps": [5],
+            "Sets": ["3"],
+            "Notes": [""],
+            "User": ["JM"],
+        }
+    )
+    numpy_df = clean_lifts_data(df)
+    arrow_df = clean_lifts_data(df, dtype_backend="pyarrow")
+    assert arrow_df["Day"].tolist() == numpy_df["Day"].tolist()
+    assert arrow_df["Weight"].tolist() == numpy_df["Weight"].tolist() == [100.0]
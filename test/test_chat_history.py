@@ -0,0 +1,76 @@
+import pandas as pd
+
+from modules.chat_history import DIGEST_HEADER, compact_history, preview_results
+
+SYSTEM = {"role": "assistant", "content": "You are AIFit."}
+
+
+def turn(i):
+    return [
+        {"role": "user", "content": f"Question {i}?"},
+        {
+            "role": "assistant",
+            "content": f"Here you go.\n```sql\nSELECT {i}\nFROM historic_exercises\n```",
+            "results": pd.DataFrame({"n": range(100)}),
+        },
+    ]
+
+
+def conversation(n_turns):
+    return [SYSTEM] + [m for i in range(n_turns) for m in turn(i)]
+
+
+def test_short_conversation_is_kept():
+    messages = compact_history(conversation(2), window=4)
+    assert [m["content"] for m in messages] == [
+        m["content"] for m in conversation(2)
+    ]
+    assert len(messages[-1]["results"]) == 5
+    assert messages[-1]["result_rows"] == 100
+
+
+def test_older_turns_become_a_digest():
+    messages = compact_history(conversation(5), window=4)
+    assert messages[0] == SYSTEM
+    digest = messages[1]
+    assert digest["digest"]
+    assert digest["content"].splitlines() == [
+        DIGEST_HEADER,
+        "- User asked: Question 0?",
+        "  Ran: SELECT 0 FROM historic_exercises (100 rows)",
+        "- User asked: Question 1?",
+        "  Ran: SELECT 1 FROM historic_exercises (100 rows)",
+        "- User asked: Question 2?",
+        "  Ran: SELECT 2 FROM historic_exercises (100 rows)",
+    ]
+    assert [m["content"] for m in messages[2:]][::2] == ["Question 3?", "Question 4?"]
+
+
+def test_size_stays_bounded():
+    messages = [SYSTEM]
+    for i in range(50):
+        messages = compact_history(messages + turn(i), window=4, max_digest_chars=300)
+    assert len(messages) == 6
+    assert len(messages[1]["content"]) <= len(DIGEST_HEADER) + 1 + 300
+    # the newest dropped turn is still in the digest
+    assert "Question 47?" in messages[1]["content"]
+
+
+def test_window_starts_at_a_question():
+    messages = compact_history(conversation(3), window=3)
+    assert messages[2]["role"] == "user"
+    assert len(messages) == 4
+
+
+def test_summarize_rewrites_the_digest():
+    messages = compact_history(
+        conversation(4), window=2, summarize=lambda digest: "Squats mostly."
+    )
+    assert messages[1]["content"] == f"{DIGEST_HEADER}\nSquats mostly."
+
+
+def test_preview_results_is_idempotent():
+    message = {"role": "assistant", "content": "", "results": pd.DataFrame({"n": range(9)})}
+    preview_results(preview_results(message, rows=3), rows=3)
+    assert len(message["results"]) == 3
+    assert message["result_rows"] == 9
@@ -0,0 +1,78 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from modules.connection_pool import (
+    DuckDBConnectionPool,
+    PoolTimeoutError,
+    get_pool,
+)
+from modules.duckdb import DuckDBManager
+
+
+@pytest.fixture
+def manager(db_manager):
+    # the pool is opened by its first cursor, so this manager sizes it
+    manager = DuckDBManager(db_dir=db_manager.db_dir, pool_size=2)
+    manager.setup_table(
+        "historic_exercises",
+        pd.DataFrame({"Exercise": ["SQUAT", "BENCH PRESS"], "Weight": [100.0, 80.0]}),
+    )
+    return manager
+
+
+def test_managers_share_one_pool(manager):
+    other = DuckDBManager(db_dir=manager.db_dir)
+    assert get_pool(manager.db_path) is get_pool(other.db_path)
+    assert len(other.get_data(table_name="historic_exercises")) == 2
+
+
+def test_concurrent_reads(manager):
+    results = []
+
+    def read():
+        for _ in range(20):
+            results.append(len(manager.get_data(table_name="historic_exercises")))
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [2] * 160
+
+
+def test_append_is_visible_to_other_cursors(manager):
+    manager.append_to_table(
+        pd.DataFrame({"Exercise": ["DEADLIFT"], "Weight": [140.0]}),
+        "historic_exercises",
+    )
+    assert len(manager.get_data(table_name="historic_exercises")) == 3
+    assert manager.get_data(table_name="temp_table") is None
+
+
+def test_pool_size_is_enforced(tmp_path):
+    pool = DuckDBConnectionPool(str(tmp_path / "pool.db"), pool_size=1)
+    pool.checkout_timeout = 0.1
+    with pool.cursor():
+        with pytest.raises(PoolTimeoutError):
+            with pool.cursor():
+                pass
+    pool.close()
+
+
+def test_unhealthy_cursor_is_replaced(tmp_path):
+    pool = DuckDBConnectionPool(str(tmp_path / "pool.db"), pool_size=1)
+    with pool.cursor() as cursor:
+        cursor.close()
+    with pool.cursor() as cursor:
+        assert cursor.execute("SELECT 42").fetchone() == (42,)
+    pool.close()
+
+
+def test_close_and_reopen(manager):
+    assert manager.health_check()
+    manager.close()
+    assert len(manager.get_data(table_name="historic_exercises")) == 2
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from benchmarks.generators import synthetic_lifts
+from modules.dedup import REDUCE_KEYS, latest_by_hash, row_hash
+from modules.util import reduce_dataframe_size
+
+COMPARED = REDUCE_KEYS + ["Day"]
+
+
+def canonical(df):
+    return df[COMPARED].sort_values(COMPARED).reset_index(drop=True)
+
+
+@pytest.fixture
+def lifts_df():
+    # few distinct sets, so most repeat, plus some exact duplicates
+    df = synthetic_lifts(2000, seed=3)
+    df["Weight"] = df["Weight"] // 50 * 50.0
+    df["Reps"] = df["Reps"] % 3 + 1
+    return pd.concat([df, df.iloc[:100]], ignore_index=True)
+
+
+def test_hash_matches_sort(lifts_df):
+    expected = reduce_dataframe_size(lifts_df, method="sort")
+    reduced = reduce_dataframe_size(lifts_df)
+    assert len(reduced) < len(lifts_df)
+    assert canonical(reduced).equals(canonical(expected))
+    # input order is kept
+    assert reduced.index.is_monotonic_increasing
+
+
+def test_sql_matches_sort(db_manager, lifts_df):
+    db_manager.setup_table("historic_exercises", lifts_df)
+    stored = db_manager.get_data(table_name="historic_exercises")
+    expected = reduce_dataframe_size(stored, method="sort")
+    assert canonical(db_manager.get_reduced_lifts()).equals(canonical(expected))
+
+
+def test_latest_by_hash_keeps_first_tie_and_missing_days():
+    df = pd.DataFrame(
+        {
+            "Day": ["2024-01-01", "2024-01-02", "2024-01-02", None],
+            "Exercise": ["SQUAT", "SQUAT", "SQUAT", "DEADLIFT"],
+            "Weight": [100.0, 100.0, 100.0, 140.0],
+            "Reps": [5, 5, 5, 3],
+            "Sets": [3, 3, 3, 1],
+            "Notes": ["", "first", "second", ""],
+            "User": ["JM", "JM", "AB", "JM"],
+        }
+    )
+    reduced = latest_by_hash(df, REDUCE_KEYS)
+    assert reduced["Notes"].tolist() == ["first", ""]
+
+
+def test_row_hash_depends_on_key_columns_only(lifts_df):
+    hashes = row_hash(lifts_df, REDUCE_KEYS)
+    changed = lifts_df.assign(Notes="edited")
+    assert hashes.dtype == "uint64"
+    assert hashes.equals(row_hash(changed, REDUCE_KEYS))
+
+
+def test_unknown_method(lifts_df):
+    with pytest.raises(ValueError):
+        reduce_dataframe_size(lifts_df, method="bogus")
@@ -0,0 +1,135 @@
+import datetime
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fitbit"))
+
+from concurrent_fetch import TokenBucket, fetch_days  # noqa: E402
+from fake_fitbit import FakeFitbit  # noqa: E402
+from get_fitbit_data import FitbitAnalysis  # noqa: E402
+from modules.connection_pool import close_all_pools  # noqa: E402
+from response_cache import FitbitResponseCache  # noqa: E402
+
+
+@pytest.fixture
+def cache(tmp_path):
+    yield FitbitResponseCache(db_dir=str(tmp_path))
+    close_all_pools()
+
+
+@pytest.fixture
+def make_analysis(cache):
+    def make(fake, **kwargs):
+        return FitbitAnalysis("client", "secret", fit=fake, cache=cache, **kwargs)
+
+    return make
+
+
+def test_days_are_fetched_concurrently_in_order(make_analysis):
+    fake = FakeFitbit(latency=0.05)
+    analysis = make_analysis(fake, max_workers=10)
+    days = analysis.get_days_list(20)
+
+    start = time.perf_counter()
+    responses = analysis.fetch_days("sleep", days)
+    elapsed = time.perf_counter() - start
+
+    assert [r["sleep"][0]["dateOfSleep"] for r in responses] == days
+    assert fake.max_active > 1
+    assert elapsed < 20 * 0.05 / 2
+
+
+def test_activity_frame_matches_days(make_analysis):
+    fake = FakeFitbit(latency=0.01)
+    analysis = make_analysis(fake)
+    activity = analysis.get_x_days_activity(10)
+    assert activity.columns.to_list() == ["id", "Name", "Start_Date", "Calories", "Steps"]
+    assert len(activity) == sum(
+        int(day[-2:]) % 3 for day in analysis.get_days_list(10)
+    )
+
+
+def test_429_is_retried(make_analysis):
+    fake = FakeFitbit(rate_limited_days={("activities", "2024-01-02")})
+    analysis = make_analysis(fake)
+    responses = analysis.fetch_days("activities", ["2024-01-01", "2024-01-02"])
+    assert len(responses) == 2
+    assert fake.calls.count(("activities", "2024-01-02")) == 2
+
+
+def test_retries_are_bounded():
+    def always_fails(day):
+        raise ValueError(day)
+
+    sleeps = []
+    with pytest.raises(ValueError):
+        fetch_days(
+            always_fails, ["d"], retry_on=(ValueError,), max_retries=2, sleep=sleeps.append
+        )
+    assert len(sleeps) == 2
+    assert sleeps[1] > sleeps[0]
+
+
+def test_token_bucket_limits_rate():
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(6):
+        bucket.acquire()
+
+    # two tokens of burst, then one every half second
+    assert now[0] == pytest.approx(2.0)
+
+
+def test_sleep_endpoints_share_cached_responses(make_analysis):
+    fake = FakeFitbit()
+    analysis = make_analysis(fake)
+    analysis.get_x_days_sleep(30)
+    analysis.get_x_days_sleep_agg(30)
+    assert len(fake.calls) == 30
+
+    # a later refresh only fetches days not cached yet
+    make_analysis(fake).get_x_days_sleep_agg(31)
+    assert len(fake.calls) == 31
+
+
+def test_unfinished_day_expires_after_ttl(tmp_path):
+    now = [datetime.datetime(2024, 1, 2, 9, 0)]
+    cache = FitbitResponseCache(
+        db_dir=str(tmp_path),
+        today_ttl=datetime.timedelta(minutes=15),
+        clock=lambda: now[0],
+    )
+    fetched = []
+
+    def fetch_missing(days):
+        fetched.extend(days)
+        return [{"day": day, "at": str(now[0])} for day in days]
+
+    days = ["2024-01-01", "2024-01-02"]
+    cache.fetch("sleep", days, fetch_missing)
+    now[0] += datetime.timedelta(minutes=10)
+    cache.fetch("sleep", days, fetch_missing)
+    assert fetched == days
+
+    # today's response goes stale, yesterday's is final
+    now[0] += datetime.timedelta(minutes=10)
+    cache.fetch("sleep", days, fetch_missing)
+    assert fetched == days + ["2024-01-02"]
+
+    # once the day is over, the response fetched during it is refreshed once more
+    now[0] = datetime.datetime(2024, 1, 3, 9, 0)
+    responses = cache.fetch("sleep", days, fetch_missing)
+    assert fetched == days + ["2024-01-02", "2024-01-02"]
+    assert responses[1]["at"] == "2024-01-03 09:00:00"
+    cache.fetch("sleep", days, fetch_missing)
+    assert len(fetched) == 4
+    close_all_pools()
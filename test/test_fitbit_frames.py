@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fitbit"))
+
+from fake_fitbit import activity_payload, sleep_payload  # noqa: E402
+from frames import (  # noqa: E402
+    ACTIVITY_DTYPES,
+    SLEEP_AGG_DTYPES,
+    SLEEP_MINUTE_DTYPES,
+    ColumnarBuilder,
+    build_activity_frame,
+    build_sleep_agg_frame,
+    build_sleep_frame,
+)
+
+DAYS = ["2024-01-03", "2024-01-02", "2024-01-01"]
+
+
+def test_activity_frame_dtypes_and_rows():
+    df = build_activity_frame([activity_payload(day) for day in DAYS])
+    assert df.dtypes.astype(str).to_dict() == ACTIVITY_DTYPES
+    assert df["Start_Date"].dt.strftime("%Y-%m-%d").tolist() == [
+        "2024-01-02",
+        "2024-01-02",
+        "2024-01-01",
+    ]
+    assert df["Steps"].tolist() == [1000, 2000, 1000]
+
+
+def test_sleep_agg_frame_matches_row_by_row_concat():
+    responses = [sleep_payload(day) for day in DAYS]
+    df = build_sleep_agg_frame(responses)
+    assert df.dtypes.astype(str).to_dict() == SLEEP_AGG_DTYPES
+
+    expected = pd.DataFrame([r["sleep"][0] for r in responses])[list(SLEEP_AGG_DTYPES)]
+    expected["dateOfSleep"] = pd.to_datetime(expected["dateOfSleep"])
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_sleep_frame_has_one_row_per_minute():
+    df = build_sleep_frame([sleep_payload(day, minutes=4) for day in DAYS])
+    assert len(df) == 12
+    assert df.dtypes.astype(str).to_dict() == SLEEP_MINUTE_DTYPES
+    assert df["State_Detail"].tolist()[:4] == ["Asleep", "Awake", "Asleep", "Asleep"]
+    assert df["Date"].dt.strftime("%Y-%m-%d").tolist()[::4] == DAYS
+
+
+def test_sleep_frame_times_wrap_past_midnight():
+    df = build_sleep_frame([sleep_payload("2024-01-02", minutes=4)])
+    assert df["Time"].dt.strftime("%Y-%m-%d %H:%M").tolist() == [
+        "2024-01-01 23:58",
+        "2024-01-01 23:59",
+        "2024-01-02 00:00",
+        "2024-01-02 00:01",
+    ]
+
+
+def test_empty_builder():
+    df = ColumnarBuilder(SLEEP_AGG_DTYPES).to_frame()
+    assert df.empty
+    assert df.dtypes.astype(str).to_dict() == SLEEP_AGG_DTYPES
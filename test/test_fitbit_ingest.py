@@ -0,0 +1,55 @@
+import datetime
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fitbit"))
+
+from fake_fitbit import FakeFitbit  # noqa: E402
+from get_fitbit_data import FitbitAnalysis  # noqa: E402
+from ingest_fitbit_data import ingest_fitbit_data, set_high_water_mark  # noqa: E402
+from response_cache import FitbitResponseCache  # noqa: E402
+
+
+@pytest.fixture
+def fitinst(tmp_path):
+    return FitbitAnalysis(
+        "client",
+        "secret",
+        fit=FakeFitbit(),
+        cache=FitbitResponseCache(db_dir=str(tmp_path / "cache")),
+    )
+
+
+def count(db_manager, table_name):
+    return db_manager.get_data(query=f"SELECT count(*) AS n FROM {table_name}")["n"][0]
+
+
+def test_first_run_backfills_then_nothing_to_do(db_manager, fitinst):
+    written = ingest_fitbit_data(fitinst, db_manager, backfill_days=10)
+    assert written["fitbit_sleep_summary"] == 10
+    assert written["fitbit_sleep_runs"] == 30
+    assert count(db_manager, "fitbit_activity") == written["fitbit_activity"] > 0
+
+    calls = len(fitinst.fit.calls)
+    assert ingest_fitbit_data(fitinst, db_manager, backfill_days=10) == {
+        "fitbit_activity": 0,
+        "fitbit_sleep_summary": 0,
+        "fitbit_sleep_runs": 0,
+    }
+    assert len(fitinst.fit.calls) == calls
+
+
+def test_only_days_after_high_water_are_fetched(db_manager, fitinst):
+    ingest_fitbit_data(fitinst, db_manager, backfill_days=10)
+    days = fitinst.get_days_list(10)
+
+    # pretend the last three days were never ingested
+    set_high_water_mark(db_manager, datetime.date.fromisoformat(days[3]))
+    fitinst.cache = FitbitResponseCache(db_dir=db_manager.db_dir + "/other_cache")
+
+    written = ingest_fitbit_data(fitinst, db_manager, backfill_days=10)
+    assert written["fitbit_sleep_summary"] == 3
+    assert count(db_manager, "fitbit_sleep_summary") == 10
+    assert count(db_manager, "fitbit_sleep_runs") == 30
@@ -0,0 +1,54 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from modules.connection_pool import get_pool
+from modules.duckdb import DuckDBManager
+
+QUERY = "SELECT * FROM numbers ORDER BY n"
+
+
+@pytest.fixture
+def manager(db_manager):
+    # the pool is opened by its first cursor, so this manager sizes it
+    manager = DuckDBManager(db_dir=db_manager.db_dir, pool_size=2)
+    manager.execute_query("CREATE TABLE numbers AS SELECT range AS n FROM range(2500)")
+    return manager
+
+
+def test_batches_cover_the_result(manager):
+    batches = list(manager.iter_batches(QUERY, batch_size=1000))
+    assert [batch.num_rows for batch in batches] == [1000, 1000, 500]
+    assert all(isinstance(batch, pa.RecordBatch) for batch in batches)
+    assert pa.Table.from_batches(batches)["n"].to_pylist() == list(range(2500))
+
+
+@pytest.mark.parametrize("format", ["pandas", "pandas_arrow"])
+def test_dataframe_chunks(manager, format):
+    chunks = list(
+        manager.iter_batches(
+            "SELECT * FROM numbers WHERE n < ? ORDER BY n",
+            batch_size=100,
+            params=[250],
+            format=format,
+        )
+    )
+    assert all(isinstance(chunk, pd.DataFrame) for chunk in chunks)
+    assert pd.concat(chunks)["n"].sum() == sum(range(250))
+
+
+def test_cursor_is_returned_when_closed_early(manager):
+    pool = get_pool(manager.db_path)
+    for _ in range(3):
+        batches = manager.iter_batches(QUERY, batch_size=10)
+        next(batches)
+        batches.close()
+    with pool.cursor():
+        with pool.cursor():
+            pass
+
+
+def test_only_selects(manager):
+    with pytest.raises(ValueError):
+        next(manager.iter_batches("DELETE FROM numbers"))
+    assert len(manager.get_data(table_name="numbers")) == 2500
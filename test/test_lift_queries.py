@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from benchmarks.generators import USERS, synthetic_lifts
+
+
+@pytest.fixture
+def lifts_df():
+    return synthetic_lifts(2_000)
+
+
+@pytest.fixture
+def manager(db_manager, lifts_df):
+    db_manager.setup_table("historic_exercises", lifts_df)
+    return db_manager
+
+
+def test_exercise_history_returns_only_plotted_rows(manager, lifts_df):
+    df = manager.get_exercise_history("SQUAT")
+    expected = lifts_df[lifts_df["Exercise"] == "SQUAT"]
+    assert df.columns.tolist() == ["Day", "Weight", "Reps", "Notes", "User"]
+    assert len(df) == len(expected)
+    assert df["Day"].is_monotonic_increasing
+    assert df["Weight"].sum() == expected["Weight"].sum()
+
+
+def test_personal_bests_match_pandas(manager, lifts_df):
+    selected = ["BENCH PRESS", "SQUAT", "DEADLIFT"]
+    df = manager.get_personal_bests(selected)
+
+    # the original drop_duplicates version from user_pb_comparison
+    expected = (
+        lifts_df[lifts_df["Exercise"].isin(selected)]
+        .sort_values(
+            by=["User", "Exercise", "Weight", "Day"],
+            ascending=[False, False, False, True],
+        )
+        .drop_duplicates(["User", "Exercise"])
+    )
+    assert len(df) == len(selected) * len(USERS)
+    columns = ["User", "Exercise", "Weight", "Day"]
+    pd.testing.assert_frame_equal(
+        df[columns].reset_index(drop=True),
+        # Day is stored as a DATE, which comes back in microseconds
+        expected[columns].reset_index(drop=True).astype({"Day": "datetime64[us]"}),
+    )
+
+
+def test_weight_ties_go_to_earliest_day_then_most_reps(manager):
+    manager.setup_table(
+        "historic_exercises",
+        pd.DataFrame(
+            {
+                "Day": pd.to_datetime(["2024-01-02", "2024-01-01", "2024-01-01"]),
+                "Exercise": "SQUAT",
+                "Weight": 100.0,
+                "Reps": [10, 3, 5],
+                "Sets": 3,
+                "Notes": "",
+                "User": "JM",
+            }
+        ),
+    )
+    df = manager.get_personal_bests(["SQUAT"])
+    assert df[["Day", "Reps"]].values.tolist() == [[pd.Timestamp("2024-01-01"), 5]]
+
+
+def test_no_exercises_selected(manager):
+    assert manager.get_personal_bests([]).empty
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from fake_openai import FakeOpenAIServer
+from modules.llm import LLMClient, OpenAIBackend
+
+MESSAGES = [
+    {"role": "assistant", "content": "system prompt"},
+    {"role": "user", "content": "Where am I progressing the best?", "results": None},
+]
+
+
+def client_for(server, **kwargs):
+    backend = OpenAIBackend(base_url=server.base_url, api_key="test", max_retries=0)
+    return LLMClient(backend=backend, **kwargs)
+
+
+def test_stream_yields_tokens_and_stats():
+    with FakeOpenAIServer(first_token_delay=0.05, token_delay=0.01) as server:
+        stats = {}
+        tokens = list(client_for(server).stream(MESSAGES, stats=stats))
+
+    assert tokens == server.tokens
+    assert stats["chunks"] == len(server.tokens)
+    assert 0.05 <= stats["time_to_first_token"] < stats["total"]
+    assert not stats["cancelled"]
+    # extra message keys are not sent
+    assert server.requests[0]["messages"][1] == {
+        "role": "user",
+        "content": "Where am I progressing the best?",
+    }
+    assert server.requests[0]["stream"] is True
+
+
+def test_requests_reuse_one_connection():
+    with FakeOpenAIServer() as server:
+        client = client_for(server)
+        stats = {}
+        for _ in range(3):
+            assert client.complete(MESSAGES, stats=stats) == "Hello from the fake model."
+    assert len(server.requests) == 3
+    assert server.connections == 1
+    assert "stream" not in server.requests[0]
+    assert stats["total"] > 0
+
+
+def test_cancel_stops_streaming():
+    cancel = threading.Event()
+    with FakeOpenAIServer(token_delay=0.05) as server:
+        stats = {}
+        received = []
+        for token in client_for(server).stream(MESSAGES, cancel=cancel, stats=stats):
+            received.append(token)
+            cancel.set()
+
+    assert received == server.tokens[:1]
+    assert stats["cancelled"]
+
+
+def test_closing_the_generator_cancels():
+    with FakeOpenAIServer(token_delay=0.05) as server:
+        stats = {}
+        stream = client_for(server).stream(MESSAGES, stats=stats)
+        next(stream)
+        stream.close()
+    assert stats["cancelled"]
+    assert stats["chunks"] == 1
+
+
+def test_token_timeout():
+    with FakeOpenAIServer(first_token_delay=1.0) as server:
+        with pytest.raises(TimeoutError):
+            client_for(server, timeout=0.2).complete(MESSAGES)
+
+
+def test_deadline():
+    with FakeOpenAIServer(token_delay=0.1) as server:
+        with pytest.raises(TimeoutError):
+            "".join(client_for(server).stream(MESSAGES, deadline=0.15))
+
+
+def test_pluggable_backend():
+    class EchoBackend:
+        def stream(self, messages, model, timeout):
+            yield from messages[-1]["content"].split()
+
+    client = LLMClient(backend=EchoBackend())
+    assert client.complete([{"role": "user", "content": "a b c"}]) == "abc"
@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+
+from benchmarks.generators import synthetic_lifts
+
+
+def lifts(rows):
+    return pd.DataFrame(
+        [
+            {
+                "Day": pd.Timestamp(day),
+                "Exercise": exercise,
+                "Weight": weight,
+                "Reps": reps,
+                "Sets": 3,
+                "Notes": "",
+                "User": user,
+            }
+            for day, exercise, weight, reps, user in rows
+        ]
+    )
+
+
+@pytest.fixture
+def manager(db_manager):
+    db_manager.setup_table(
+        "historic_exercises",
+        lifts(
+            [
+                ("2024-01-01", "SQUAT", 100.0, 5, "JM"),
+                ("2024-01-02", "SQUAT", 90.0, 5, "JM"),
+                ("2024-01-01", "SQUAT", 110.0, 3, "JM"),
+            ]
+        ),
+    )
+    return db_manager
+
+
+def personal_bests(manager):
+    return manager.get_data(
+        query="SELECT User, Exercise, Reps, Weight, Day FROM personal_bests "
+        "ORDER BY ALL"
+    )
+
+
+def test_setup_builds_one_row_per_user_exercise_and_reps(manager):
+    assert personal_bests(manager).values.tolist() == [
+        ["JM", "SQUAT", 3, 110.0, pd.Timestamp("2024-01-01")],
+        ["JM", "SQUAT", 5, 100.0, pd.Timestamp("2024-01-01")],
+    ]
+
+
+def test_append_only_replaces_beaten_bests(manager):
+    assert manager.append_to_table(
+        lifts(
+            [
+                ("2024-02-01", "SQUAT", 105.0, 5, "JM"),  # new PB
+                ("2024-02-01", "SQUAT", 110.0, 3, "JM"),  # tie, later day
+                ("2024-02-01", "SQUAT", 60.0, 8, "JM"),  # new rep count
+                ("2024-02-01", "SQUAT", 80.0, 5, "AB"),  # new user
+            ]
+        ),
+        "historic_exercises",
+    )
+    assert personal_bests(manager).values.tolist() == [
+        ["AB", "SQUAT", 5, 80.0, pd.Timestamp("2024-02-01")],
+        ["JM", "SQUAT", 3, 110.0, pd.Timestamp("2024-01-01")],
+        ["JM", "SQUAT", 5, 105.0, pd.Timestamp("2024-02-01")],
+        ["JM", "SQUAT", 8, 60.0, pd.Timestamp("2024-02-01")],
+    ]
+
+
+def test_incremental_matches_rebuild(manager):
+    for seed in range(5):
+        manager.append_to_table(synthetic_lifts(200, seed=seed), "historic_exercises")
+    incremental = personal_bests(manager)
+
+    manager.execute_query("DELETE FROM personal_bests")
+    manager.rebuild_personal_bests()
+    pd.testing.assert_frame_equal(incremental, personal_bests(manager))
+
+
+def test_missing_table_is_rebuilt(manager):
+    manager.execute_query("DROP TABLE personal_bests")
+    manager.append_to_table(
+        lifts([("2024-02-01", "DEADLIFT", 150.0, 1, "JM")]), "historic_exercises"
+    )
+    assert len(personal_bests(manager)) == 3
+
+    manager.execute_query("DROP TABLE personal_bests")
+    assert manager.get_personal_bests(["SQUAT"])["Weight"].tolist() == [110.0]
+
+
+def test_failed_append_leaves_bests_untouched(manager):
+    before = personal_bests(manager)
+    bad = lifts([("2024-02-01", "SQUAT", 200.0, 5, "JM")]).assign(Extra=1)
+    assert not manager.append_to_table(bad, "historic_exercises")
+    pd.testing.assert_frame_equal(before, personal_bests(manager))
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from modules.prompt_context import (
+    TableContextBuilder,
+    estimate_tokens,
+    fit_to_budget,
+    profile_table,
+)
+
+
+@pytest.fixture
+def manager(db_manager):
+    n_rows = 300
+    db_manager.setup_table(
+        "historic_exercises",
+        pd.DataFrame(
+            {
+                "Day": pd.date_range("2024-01-01", periods=n_rows).date,
+                # EXERCISE 0 is the most frequent
+                "Exercise": [f"EXERCISE {i % 40 if i % 2 else 0}" for i in range(n_rows)],
+                "Weight": [float(i % 50) for i in range(n_rows)],
+                "Reps": [5] * n_rows,
+                "Sets": [3] * n_rows,
+                "Notes": [f"note {i}" for i in range(n_rows)],
+                "User": ["JM", "AB", "CD"] * 100,
+            }
+        ),
+    )
+    return db_manager
+
+
+def test_profile_uses_aggregates(manager):
+    profile = profile_table(manager, "historic_exercises")
+    assert profile["rows"] == 300
+    columns = profile["columns"]
+    assert list(columns) == ["Day", "Exercise", "Weight", "Reps", "Sets", "Notes", "User"]
+    assert columns["Day"]["type"] == "DATE"
+    assert columns["Day"]["range"] == ("2024-01-01", "2024-10-26")
+    assert columns["Exercise"]["values"][0] == "EXERCISE 0"
+    assert sorted(columns["User"]["values"]) == ["AB", "CD", "JM"]
+    # free text has too many distinct values to list
+    assert "values" not in columns["Notes"]
+
+
+def test_missing_table_has_no_profile(manager):
+    assert profile_table(manager, "missing") == {}
+
+
+def test_context_fits_the_budget(manager):
+    profile = profile_table(manager, "historic_exercises")
+    full = fit_to_budget(profile, "historic_exercises", "Lifts.", token_budget=10_000)
+    assert "EXERCISE 39" in full
+
+    budget = estimate_tokens(full) - 20
+    trimmed = fit_to_budget(profile, "historic_exercises", "Lifts.", token_budget=budget)
+    assert estimate_tokens(trimmed) <= budget
+    # columns and the most frequent values are kept
+    assert "**Notes**" in trimmed
+    assert "EXERCISE 0" in trimmed
+    assert "more" in trimmed
+
+
+def test_context_is_cached_per_table_version(manager):
+    builder = TableContextBuilder()
+    first = builder.build(manager, "historic_exercises", "Lifts.")
+    assert builder.build(manager, "historic_exercises", "Lifts.") is first
+
+    manager.append_to_table(
+        pd.DataFrame(
+            {
+                "Day": ["2025-01-01"],
+                "Exercise": ["NEW EXERCISE"],
+                "Weight": [1.0],
+                "Reps": [1],
+                "Sets": [1],
+                "Notes": [""],
+                "User": ["JM"],
+            }
+        ),
+        "historic_exercises",
+    )
+    assert "NEW EXERCISE" in builder.build(manager, "historic_exercises", "Lifts.")
@@ -0,0 +1,126 @@
+import duckdb as duckdb
+import pandas as pd
+import pytest
+
+from modules.duckdb import DuckDBManager
+from modules.query_cache import (
+    QueryResultCache,
+    cacheable_tables,
+    normalize_sql,
+)
+
+QUERY = "SELECT * FROM historic_exercises WHERE Exercise = 'SQUAT'"
+
+
+@pytest.fixture
+def manager(db_manager):
+    db_manager.setup_table(
+        "historic_exercises",
+        pd.DataFrame({"Exercise": ["SQUAT", "BENCH PRESS"], "Weight": [100.0, 80.0]}),
+    )
+    return db_manager
+
+
+def squat():
+    return pd.DataFrame({"Exercise": ["SQUAT"], "Weight": [120.0]})
+
+
+def test_normalize_sql_keeps_quoted_text():
+    assert (
+        normalize_sql("SELECT  *\n  FROM t\tWHERE a = 'x  y';")
+        == "SELECT * FROM t WHERE a = 'x  y'"
+    )
+
+
+def test_repeated_query_is_a_hit_across_managers(manager):
+    manager.get_data(query=QUERY)
+    other = DuckDBManager(db_dir=manager.db_dir)
+    reformatted = "SELECT *  FROM historic_exercises\n WHERE Exercise = 'SQUAT';"
+    assert len(other.get_data(query=reformatted)) == 1
+    stats = manager.cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["entries"] == 1 and stats["bytes"] > 0
+
+
+def test_params_are_part_of_the_key(manager):
+    query = "SELECT * FROM historic_exercises WHERE Exercise = ?"
+    assert len(manager.get_data(query=query, params=["SQUAT"])) == 1
+    assert len(manager.get_data(query=query, params=["DEADLIFT"])) == 0
+    assert manager.cache_stats()["hits"] == 0
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda m: m.append_to_table(squat(), "historic_exercises"),
+        lambda m: m.upsert_to_table(squat(), "historic_exercises", ["Exercise"]),
+        lambda m: m.setup_table("historic_exercises", squat()),
+        lambda m: m.execute_query("DELETE FROM historic_exercises"),
+        lambda m: m.get_data(query="DELETE FROM historic_exercises"),
+    ],
+)
+def test_writes_invalidate(manager, write):
+    before = manager.get_data(query=QUERY)
+    version = manager.table_version("historic_exercises")
+    write(manager)
+    assert manager.table_version("historic_exercises") != version
+    assert not manager.get_data(query=QUERY).equals(before)
+    assert manager.cache_stats()["hits"] == 0
+
+
+def test_write_to_other_table_keeps_entry(manager):
+    manager.setup_table("exercises", pd.DataFrame({"Exercise": ["SQUAT"]}))
+    manager.get_data(query=QUERY)
+    manager.append_to_table(pd.DataFrame({"Exercise": ["LUNGES"]}), "exercises")
+    manager.get_data(query=QUERY)
+    assert manager.cache_stats()["hits"] == 1
+
+
+def test_cached_frames_are_not_shared(manager):
+    manager.get_data(query=QUERY)["Weight"] = 0.0
+    assert manager.get_data(query=QUERY)["Weight"].tolist() == [100.0]
+
+
+def test_uncacheable_queries(manager):
+    manager.get_data(query="SELECT random() AS r FROM historic_exercises")
+    manager.get_data(query="SELECT table_name FROM duckdb_tables()")
+    DuckDBManager(db_dir=manager.db_dir, cache=False).get_data(query=QUERY)
+    assert manager.cache_stats()["entries"] == 0
+
+
+@pytest.mark.parametrize(
+    "clock",
+    [
+        "today()",
+        "get_current_timestamp()",
+        "transaction_timestamp()",
+        "current_localtimestamp()",
+        "current_date",
+        "now ()",
+    ],
+)
+def test_clock_functions_are_not_cached(clock):
+    con = duckdb.connect()
+    con.execute("CREATE TABLE t (d DATE, uuid INTEGER)")
+    assert cacheable_tables(con, f"SELECT * FROM t WHERE d >= {clock} - 30") is None
+    # a column named like a function is not a call
+    assert cacheable_tables(con, "SELECT uuid FROM t") == {"t"}
+
+
+def test_lru_and_byte_eviction():
+    cache = QueryResultCache(max_entries=2)
+    frames = {name: pd.DataFrame({"a": range(10)}) for name in "xyz"}
+    for name, df in frames.items():
+        cache.put(("db", name, "None", "pandas"), df, {"t"})
+        if name == "y":
+            cache.get(("db", "x", "None", "pandas"))
+    assert cache.get(("db", "y", "None", "pandas")) is None
+    assert cache.get(("db", "x", "None", "pandas")) is not None
+    assert cache.stats()["evictions"] == 1
+
+    size = cache.stats()["bytes"] // 2
+    cache = QueryResultCache(max_bytes=size * 2)
+    for name, df in frames.items():
+        cache.put(("db", name, "None", "pandas"), df, {"t"})
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] <= size * 2
@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+
+from modules.duckdb import DuckDBManager
+from modules.query_guard import GuardedQueryExecutor, QueryRejected
+
+
+@pytest.fixture
+def db_dir(db_manager):
+    db_manager.setup_table(
+        "historic_exercises",
+        pd.DataFrame(
+            {
+                "Exercise": ["SQUAT", "BENCH PRESS", "DEADLIFT"] * 10,
+                "Weight": [float(w) for w in range(30)],
+            }
+        ),
+    )
+    return db_manager.db_dir
+
+
+def test_small_query_is_not_truncated(db_dir):
+    guard = GuardedQueryExecutor(db_dir=db_dir)
+    stats = {}
+    df, truncated = guard.run(
+        "SELECT Exercise, max(Weight) AS Weight FROM historic_exercises "
+        "GROUP BY Exercise ORDER BY Weight DESC;",
+        stats=stats,
+    )
+    assert not truncated
+    assert list(df["Exercise"]) == ["DEADLIFT", "BENCH PRESS", "SQUAT"]
+    assert stats["rows"] == 3
+    assert stats["truncated"] is None
+
+
+def test_row_limit_truncates(db_dir):
+    guard = GuardedQueryExecutor(db_dir=db_dir, max_rows=5)
+    stats = {}
+    df, truncated = guard.run("SELECT * FROM historic_exercises", stats=stats)
+    assert truncated
+    assert len(df) == 5
+    assert stats["truncated"] == "row_limit"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "DELETE FROM historic_exercises",
+        "CREATE TABLE copy AS SELECT * FROM historic_exercises",
+        "SELECT 1; DROP TABLE historic_exercises",
+    ],
+)
+def test_only_a_select_runs(db_dir, query):
+    with pytest.raises(QueryRejected, match="single SELECT"):
+        GuardedQueryExecutor(db_dir=db_dir).run(query)
+    assert len(DuckDBManager(db_dir=db_dir).get_data(table_name="historic_exercises")) == 30
+
+
+def test_expensive_plan_is_rejected(db_dir):
+    guard = GuardedQueryExecutor(db_dir=db_dir, max_estimated_rows=100)
+    with pytest.raises(QueryRejected, match="estimated"):
+        guard.run(
+            "SELECT * FROM historic_exercises a, historic_exercises b, historic_exercises c"
+        )
+
+
+def test_timeout_interrupts(db_dir):
+    guard = GuardedQueryExecutor(
+        db_dir=db_dir, timeout=0.2, max_estimated_rows=10**15
+    )
+    stats = {}
+    df, truncated = guard.run("SELECT count(*) FROM range(1000000000000)", stats=stats)
+    assert truncated
+    assert stats["truncated"] == "timeout"
+    assert stats["total"] < 5
+
+
+def test_errors_and_settings_are_left_alone(db_dir):
+    with pytest.raises(QueryRejected, match="planned"):
+        GuardedQueryExecutor(db_dir=db_dir).run("SELECT missing FROM historic_exercises")
+
+    # database-wide settings would also apply to other sessions' queries
+    db_manager = DuckDBManager(db_dir=db_dir, cache=False)
+    query = (
+        "SELECT name, value FROM duckdb_settings() "
+        "WHERE name IN ('memory_limit', 'threads') ORDER BY name"
+    )
+    before = db_manager.get_data(query=query)
+    during, _ = GuardedQueryExecutor(db_dir=db_dir).run(query)
+    assert during.values.tolist() == before.values.tolist()
+    pd.testing.assert_frame_equal(db_manager.get_data(query=query), before)
+
+
+def test_scalar_subquery_join_is_cheap(db_dir):
+    guard = GuardedQueryExecutor(db_dir=db_dir, max_estimated_rows=100)
+    stats = {}
+    df, truncated = guard.run(
+        "SELECT * FROM historic_exercises, (SELECT max(Weight) AS best FROM historic_exercises)",
+        stats=stats,
+    )
+    assert len(df) == 30
+    assert stats["estimated_rows"] == 30
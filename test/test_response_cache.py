@@ -0,0 +1,110 @@
+import pandas as pd
+import pytest
+
+from modules.connection_pool import close_all_pools
+from modules.duckdb import DuckDBManager
+from modules.response_cache import ResponseCache, normalize_question
+
+SYSTEM = {"role": "assistant", "content": "You are AIFit. Table: historic_exercises"}
+
+
+def conversation(question, system=SYSTEM):
+    return [system, {"role": "user", "content": question}]
+
+
+@pytest.fixture
+def clock():
+    return [1000.0]
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    yield ResponseCache(
+        db_dir=str(tmp_path), ttl=60, max_entries=2, clock=lambda: clock[0]
+    )
+    close_all_pools()
+
+
+def test_normalize_question():
+    assert (
+        normalize_question("  Where am I   progressing the BEST?? ")
+        == "where am i progressing the best"
+    )
+
+
+def test_operators_and_numbers_are_kept(cache):
+    assert normalize_question("Sets at 102.5kg?") == "sets at 102.5kg"
+    assert normalize_question("Sets at 102.5kg?") != normalize_question("Sets at 102 5kg")
+
+    cache.put(conversation("Show sets with Weight > 100"), "v1", "```sql\nSELECT 1\n```")
+    assert cache.get(conversation("Show sets with Weight < 100"), "v1") is None
+    assert cache.get(conversation("show sets with weight > 100?"), "v1") is not None
+
+
+def test_hit_on_normalised_question(cache):
+    assert cache.get(conversation("Where am I progressing the best?"), "v1") is None
+    cache.put(conversation("Where am I progressing the best?"), "v1", "```sql\nSELECT 1\n```")
+
+    assert (
+        cache.get(conversation("where am i progressing the best"), "v1")
+        == "```sql\nSELECT 1\n```"
+    )
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert stats["stored_hits"] == 1
+
+
+def test_prompt_and_data_versions_are_part_of_the_key(cache):
+    cache.put(conversation("q"), "v1", "reply")
+    edited = {"role": "assistant", "content": SYSTEM["content"] + " edited"}
+    assert cache.get(conversation("q", system=edited), "v1") is None
+    assert cache.get(conversation("q"), "v2") is None
+    # follow-ups are keyed on the whole conversation
+    follow_up = conversation("q") + [
+        {"role": "assistant", "content": "reply"},
+        {"role": "user", "content": "and deadlift?"},
+    ]
+    assert cache.get(follow_up, "v1") is None
+
+
+def test_ttl(cache, clock):
+    cache.put(conversation("q"), "v1", "reply")
+    clock[0] += 61
+    assert cache.get(conversation("q"), "v1") is None
+
+
+def test_evicts_least_recently_used(cache, clock):
+    for question in ["a", "b"]:
+        cache.put(conversation(question), "v1", question)
+        clock[0] += 1
+    assert cache.get(conversation("a"), "v1") == "a"
+    clock[0] += 1
+    cache.put(conversation("c"), "v1", "c")
+
+    assert cache.get(conversation("b"), "v1") is None
+    assert cache.get(conversation("a"), "v1") == "a"
+    assert cache.stats()["entries"] == 2
+
+
+def test_data_version_follows_writes(tmp_path, cache):
+    manager = DuckDBManager(db_dir=str(tmp_path / "app"))
+    lifts = pd.DataFrame(
+        {
+            "Day": ["2024-01-01"],
+            "Exercise": ["SQUAT"],
+            "Weight": [100.0],
+            "Reps": [5],
+            "Sets": [3],
+            "Notes": [""],
+            "User": ["JM"],
+        }
+    )
+    manager.setup_table("historic_exercises", lifts)
+    before = cache.data_version(manager)
+    assert cache.data_version(manager) == before
+    # fingerprints survive restarts, a new cache agrees
+    assert ResponseCache(db_dir=str(tmp_path)).data_version(manager) == before
+
+    manager.append_to_table(lifts.assign(Weight=105.0), "historic_exercises")
+    assert cache.data_version(manager) != before
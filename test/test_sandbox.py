@@ -0,0 +1,93 @@
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from modules.sandbox import PlotlySandbox, SandboxError, SandboxTimeout
+
+PLOT = """
+import plotly.express as px
+fig = px.line(df, x='Day', y='Weight')
+fig.show()
+"""
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    sandbox = PlotlySandbox(workers=1, cpu_seconds=1, timeout=3, max_memory_mb=1024)
+    sandbox.start()
+    yield sandbox
+    sandbox.close()
+
+
+@pytest.fixture
+def lifts_df():
+    return pd.DataFrame(
+        {
+            "Day": pd.date_range("2024-01-01", periods=3),
+            "Exercise": ["SQUAT"] * 3,
+            "Weight": [100.0, 102.5, 105.0],
+        }
+    )
+
+
+def test_returns_figure(sandbox, lifts_df):
+    fig = sandbox.run(PLOT, lifts_df)
+    assert isinstance(fig, go.Figure)
+    assert list(fig.data[0].y) == [100.0, 102.5, 105.0]
+
+
+def test_no_figure(sandbox, lifts_df):
+    assert sandbox.run("total = df['Weight'].sum()", lifts_df) is None
+
+
+def test_data_is_sent_once_per_key(sandbox, lifts_df):
+    first, second, changed = {}, {}, {}
+    sandbox.run(PLOT, lifts_df, data_key=("v", 1), stats=first)
+    sandbox.run(PLOT, lifts_df, data_key=("v", 1), stats=second)
+    fig = sandbox.run(
+        PLOT,
+        lifts_df.assign(Weight=1.0),
+        data_key=("v", 2),
+        stats=changed,
+    )
+    assert first["bytes_sent"] > 0
+    assert second["bytes_sent"] == 0
+    assert changed["bytes_sent"] > 0
+    assert list(fig.data[0].y) == [1.0, 1.0, 1.0]
+
+
+def test_errors_are_reported(sandbox, lifts_df):
+    with pytest.raises(SandboxError, match="ZeroDivisionError"):
+        sandbox.run("fig = 1 / 0", lifts_df)
+    # the worker is still usable
+    assert sandbox.run(PLOT, lifts_df) is not None
+
+
+@pytest.mark.parametrize(
+    "code, error, match",
+    [
+        ("while True:\n    pass", SandboxError, "CPU time"),
+        ("import time\ntime.sleep(10)", SandboxTimeout, "time limit"),
+        ("blob = bytearray(2 * 1024**3)", SandboxError, "memory"),
+    ],
+)
+def test_limits_replace_the_worker(sandbox, lifts_df, code, error, match):
+    with pytest.raises(error, match=match):
+        sandbox.run(code, lifts_df)
+    assert sandbox.run(PLOT, lifts_df) is not None
+
+
+def test_worker_env_has_no_secrets(monkeypatch, lifts_df):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-secret")
+    sandbox = PlotlySandbox(workers=1, timeout=3)
+    sandbox.start()
+    try:
+        fig = sandbox.run(
+            "import os\nimport plotly.graph_objects as go\n"
+            "fig = go.Figure(layout_title_text=','.join(sorted(os.environ)))",
+            lifts_df,
+        )
+    finally:
+        sandbox.close()
+    assert "OPENAI_API_KEY" not in fig.layout.title.text
+    assert "SANDBOX_MAX_MEMORY" in fig.layout.title.text
@@ -0,0 +1,95 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from modules.schema import TABLE_SCHEMAS, cast_columns
+from modules.util import load_data_to_duckdb
+
+
+def sheet_lifts():
+    # everything is text in the worksheet
+    return pd.DataFrame(
+        {
+            "Day": ["31/01/2024", "01/02/2024"],
+            "Exercise": ["SQUAT", "SQUAT"],
+            "Weight": ["100", "102.5"],
+            "Reps": ["5", "5"],
+            "Sets": ["3", "3"],
+            "Notes": ["", "felt strong"],
+            "User": ["JM", "JM"],
+        }
+    )
+
+
+def column_types(db_manager, table_name):
+    df = db_manager.get_data(
+        query="SELECT column_name, data_type FROM duckdb_columns() WHERE table_name = ?",
+        params=[table_name],
+    )
+    return dict(zip(df["column_name"], df["data_type"]))
+
+
+def test_ingest_types_sheet_rows(db_manager):
+    timings = load_data_to_duckdb(
+        sheet_lifts(),
+        pd.DataFrame({"Day": ["LOWER A"], "Exercise": ["SQUAT"]}),
+        duckdb_manager=db_manager,
+    )
+    assert set(timings["historic_exercises"]) == {
+        "register",
+        "insert",
+        "personal_bests",
+        "total",
+    }
+    assert set(timings["exercises"]) == {"register", "insert", "total"}
+    assert column_types(db_manager, "historic_exercises") == TABLE_SCHEMAS[
+        "historic_exercises"
+    ]
+
+    df = db_manager.get_data(table_name="historic_exercises")
+    assert df["Day"].dt.date.tolist() == [
+        datetime.date(2024, 1, 31),
+        datetime.date(2024, 2, 1),
+    ]
+    assert df["Reps"].tolist() == [5, 5]
+    assert df["Weight"].tolist() == [100.0, 102.5]
+
+
+def test_append_casts_and_fills_missing_columns(db_manager):
+    db_manager.setup_table("historic_exercises", sheet_lifts())
+    rows = sheet_lifts().drop(columns=["Notes", "Sets"]).assign(Day="2024-02-02")
+    assert db_manager.append_to_table(rows, "historic_exercises")
+
+    df = db_manager.get_data(
+        query="SELECT * FROM historic_exercises WHERE Day = DATE '2024-02-02'"
+    )
+    assert len(df) == 2
+    assert df["Notes"].isna().all()
+    assert db_manager.get_personal_bests(["SQUAT"])["Weight"].tolist() == [102.5]
+
+
+def test_bad_values_fail_the_whole_append(db_manager):
+    db_manager.setup_table("historic_exercises", sheet_lifts())
+    rows = sheet_lifts().assign(Reps=["5", "five"])
+    assert not db_manager.append_to_table(rows, "historic_exercises")
+    assert len(db_manager.get_data(table_name="historic_exercises")) == 2
+
+
+def test_unknown_columns_are_rejected():
+    with pytest.raises(ValueError):
+        cast_columns(TABLE_SCHEMAS["exercises"], ["Day", "Exercise", "Muscle"])
+
+
+def test_upsert_matches_typed_keys(db_manager):
+    db_manager.setup_table("historic_exercises", sheet_lifts())
+    rows = sheet_lifts().iloc[:1].assign(Weight="110")
+    assert db_manager.upsert_to_table(rows, "historic_exercises", ["Day", "Exercise"])
+    assert db_manager.get_data(
+        query="SELECT Weight FROM historic_exercises ORDER BY Day"
+    )["Weight"].tolist() == [110.0, 102.5]
+
+
+def test_tables_without_schema_take_rows_as_they_are(db_manager):
+    db_manager.setup_table("other", pd.DataFrame({"a": ["1"]}))
+    assert column_types(db_manager, "other") == {"a": "VARCHAR"}
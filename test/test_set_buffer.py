@@ -0,0 +1,103 @@
+import datetime
+
+import pytest
+
+from modules.set_buffer import SET_COLUMNS, SetBuffer
+from modules.util import flush_recorded_sets
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_set(i):
+    return {
+        "Day": datetime.date(2024, 1, 1),
+        "Exercise": "SQUAT",
+        "Weight": 100 + i,
+        "Reps": 8,
+        "Sets": 3,
+        "Notes": "",
+        "User": "JM",
+    }
+
+
+@pytest.fixture
+def manager(db_manager):
+    db_manager.execute_query(
+        "CREATE TABLE historic_exercises (Day DATE, Exercise VARCHAR, "
+        "Weight DECIMAL(18,3), Reps INTEGER, Sets INTEGER, Notes VARCHAR, User VARCHAR)"
+    )
+    return db_manager
+
+
+def test_add_is_idempotent_for_known_ids():
+    buffer = SetBuffer()
+    set_id = buffer.add(make_set(0))
+    assert buffer.add(make_set(1), set_id=set_id) == set_id
+    assert len(buffer) == 1
+
+
+def test_flush_writes_each_set_once_per_sink():
+    buffer = SetBuffer()
+    for i in range(3):
+        buffer.add(make_set(i))
+
+    batches = {"duckdb": [], "sheets": []}
+    writers = {sink: batches[sink].append for sink in batches}
+
+    assert flush_recorded_sets(buffer, writers, force=True) == {"duckdb": 3, "sheets": 3}
+    assert flush_recorded_sets(buffer, writers, force=True) == {"duckdb": 0, "sheets": 0}
+    assert [len(df) for df in batches["duckdb"]] == [3]
+    assert list(batches["sheets"][0].columns) == SET_COLUMNS + ["set_id"]
+
+
+def test_failed_write_stays_pending():
+    buffer = SetBuffer()
+    buffer.add(make_set(0))
+
+    def failing_writer(df):
+        raise RuntimeError("offline")
+
+    with pytest.raises(RuntimeError):
+        buffer.flush("duckdb", failing_writer)
+    assert len(buffer.pending("duckdb")) == 1
+
+
+def test_age_threshold_triggers_flush():
+    clock = FakeClock()
+    buffer = SetBuffer(max_pending=100, max_age=60, clock=clock)
+    buffer.add(make_set(0))
+    assert not buffer.should_flush("duckdb")
+    clock.now = 61
+    assert buffer.should_flush("duckdb")
+
+
+def test_thousand_reruns_write_each_row_once(manager):
+    clock = FakeClock()
+    buffer = SetBuffer(max_pending=25, max_age=300, clock=clock)
+    inserts = []
+
+    def append_sets(df):
+        inserts.append(len(df))
+        assert manager.append_to_table(
+            df=df.drop(columns="set_id"), table_name="historic_exercises"
+        )
+
+    recorded = 0
+    for rerun in range(1000):
+        clock.now += 1
+        # a set is submitted on every tenth rerun, the rest are widget reruns
+        if rerun % 10 == 0:
+            buffer.add(make_set(rerun))
+            recorded += 1
+        flush_recorded_sets(buffer, {"duckdb": append_sets}, force=rerun == 999)
+
+    rows = manager.get_data(query="SELECT count(*) AS n FROM historic_exercises")
+    assert rows["n"][0] == recorded == 100
+    assert sum(inserts) == recorded
+    assert len(inserts) == 4
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+from google.auth.exceptions import RefreshError
+
+import modules.get_google_sheets_data as sheets
+from fake_gspread import FakeClient, FakeSpreadsheet, FakeWorksheet
+from modules.util import load_sheets_data
+
+URL = "https://docs.google.com/spreadsheets/d/fake"
+CREDENTIALS = {"client_email": "bot@example.com", "private_key": "secret"}
+
+
+@pytest.fixture
+def spreadsheet(monkeypatch):
+    spreadsheet = FakeSpreadsheet(
+        {
+            "Lifts": FakeWorksheet(
+                "Lifts", [["Day", "Exercise", "User"], ["01/01/2024", "squat", "jm"]]
+            ),
+            "Exercises": FakeWorksheet("Exercises", [["Day", "Exercise"], ["A", "squat"]]),
+        }
+    )
+    authorised = []
+
+    def service_account_from_dict(credentials):
+        authorised.append(credentials)
+        return FakeClient({URL: spreadsheet})
+
+    monkeypatch.setattr(sheets.gs, "service_account_from_dict", service_account_from_dict)
+    sheets.clear_handle_cache()
+    spreadsheet.authorised = authorised
+    yield spreadsheet
+    sheets.clear_handle_cache()
+
+
+def test_page_render_reuses_client_and_worksheets(spreadsheet):
+    with sheets.track_auth_round_trips() as first_render:
+        lifts_df, exercises_df, exercises = load_sheets_data(URL, CREDENTIALS)
+    assert lifts_df["Exercise"].tolist() == ["SQUAT"]
+    assert first_render == {"authorize": 1, "open_by_url": 1, "worksheet": 2, "total": 4}
+
+    with sheets.track_auth_round_trips() as second_render:
+        load_sheets_data(URL, CREDENTIALS)
+        sheets.export_to_google_sheets(
+            URL,
+            "Lifts",
+            pd.DataFrame({"Day": ["02/01/2024"], "Exercise": ["BENCH"], "User": ["JM"]}),
+            CREDENTIALS,
+        )
+    assert second_render["total"] == 0
+    assert len(spreadsheet.authorised) == 1
+
+
+def test_handles_expire_after_ttl(spreadsheet, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(sheets, "_clock", lambda: now[0])
+    sheets.google_sheet_auth(URL, "Lifts", CREDENTIALS)
+    now[0] = sheets.HANDLE_TTL + 1
+    with sheets.track_auth_round_trips() as counts:
+        sheets.google_sheet_auth(URL, "Lifts", CREDENTIALS)
+    assert counts["authorize"] == 1
+
+
+def test_auth_error_refreshes_client(spreadsheet):
+    sheets.get_google_sheet(URL, "Lifts", CREDENTIALS)
+    worksheet = spreadsheet.worksheets["Lifts"]
+    original = worksheet.get_all_records
+    failures = [RefreshError("token expired")]
+
+    def get_all_records(**kwargs):
+        if failures:
+            raise failures.pop()
+        return original(**kwargs)
+
+    worksheet.get_all_records = get_all_records
+    with sheets.track_auth_round_trips() as counts:
+        df = sheets.get_google_sheet(URL, "Lifts", CREDENTIALS)
+    assert len(df) == 1
+    assert counts["authorize"] == 1
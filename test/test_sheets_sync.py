@@ -0,0 +1,108 @@
+import pandas as pd
+
+from fake_gspread import FakeWorksheet
+from modules.get_google_sheets_data import normalise_sheet_data, sync_worksheet
+
+HEADER = ["Day", "Exercise", "Weight", "Reps", "Sets", "Notes", "User"]
+
+
+def make_rows(n, start=0):
+    return pd.DataFrame(
+        {
+            "Day": ["01/01/2024"] * n,
+            "Exercise": ["SQUAT"] * n,
+            "Weight": [100 + i for i in range(start, start + n)],
+            "Reps": [8] * n,
+            "Sets": [3] * n,
+            "Notes": [""] * n,
+            "User": ["JM"] * n,
+        }
+    )
+
+
+def history(n):
+    return [HEADER] + make_rows(n).astype(object).values.tolist()
+
+
+def test_delta_sync_appends_only_new_rows():
+    sheet = FakeWorksheet(rows=history(500))
+    state = {}
+
+    assert sync_worksheet(sheet, make_rows(2, start=1000), state) == "append"
+    assert sheet.calls == {"row_values": 1, "append_rows": 1}
+    assert len(sheet.values) == 503
+    assert sheet.values[-1][2] == 1101
+
+    # payload is proportional to the new rows, not to the sheet history
+    assert sheet.bytes_sent < 200
+    assert sheet.bytes_received < 200
+
+
+def test_resending_rows_is_a_noop():
+    sheet = FakeWorksheet(rows=history(10))
+    state = {}
+    rows = make_rows(3, start=100)
+    rows["set_id"] = ["a", "b", "c"]
+
+    sync_worksheet(sheet, rows, state)
+    calls = sheet.api_calls
+    assert sync_worksheet(sheet, rows, state) == "noop"
+    assert sheet.api_calls == calls
+
+    rows.loc[3] = make_rows(1, start=200).iloc[0].tolist() + ["d"]
+    assert sync_worksheet(sheet, rows, state) == "append"
+    assert len(sheet.values) == 15
+    # header is cached after the first sync
+    assert sheet.calls["row_values"] == 1
+
+
+def test_columns_are_aligned_to_the_sheet_header():
+    sheet = FakeWorksheet(rows=history(1))
+    sync_worksheet(sheet, make_rows(1, start=5)[HEADER[::-1]], {})
+    assert sheet.values[-1] == ["01/01/2024", "SQUAT", 105, 8, 3, "", "JM"]
+
+
+def test_schema_drift_falls_back_to_full_rewrite():
+    sheet = FakeWorksheet(rows=history(3))
+    rows = make_rows(1, start=10).assign(RPE=7)
+
+    assert sync_worksheet(sheet, rows, {}) == "rewrite"
+    assert sheet.calls["clear"] == 1
+    assert sheet.values[0] == HEADER + ["RPE"]
+    assert len(sheet.values) == 5
+
+
+def test_empty_sheet_gets_header():
+    sheet = FakeWorksheet()
+    state = {}
+    assert sync_worksheet(sheet, make_rows(2), state) == "rewrite"
+    assert sheet.values[0] == HEADER
+    assert sync_worksheet(sheet, make_rows(1, start=9), state) == "append"
+    assert len(sheet.values) == 4
+
+
+def test_normalise_matches_per_cell_upper():
+    df = pd.DataFrame(
+        {
+            "Exercise": ["squat", "Bench Press", "squat", "squat"],
+            "Notes": ["easy", 5, None, "rpe 8"],
+            "Weight": [100, 80, 100, 105],
+            "User": ["jm", "jm", "ab", "jm"],
+        }
+    )
+    expected = df.map(lambda s: s.upper() if type(s) == str else s)
+
+    result = normalise_sheet_data(df)
+    pd.testing.assert_frame_equal(result, expected)
+
+    result = normalise_sheet_data(df, categorical=["Exercise", "User", "Weight"])
+    assert result["Exercise"].dtype == "category"
+    assert result["User"].dtype == "category"
+    assert result["Weight"].dtype == "int64"
+    assert result["Exercise"].tolist() == ["SQUAT", "BENCH PRESS", "SQUAT", "SQUAT"]
+
+
+def test_normalise_skips_high_cardinality_columns():
+    df = pd.DataFrame({"Notes": ["a", "b", "c", "d"]})
+    result = normalise_sheet_data(df, categorical=["Notes"])
+    assert result["Notes"].dtype == object
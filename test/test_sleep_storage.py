@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fitbit"))
+
+from fake_fitbit import sleep_payload  # noqa: E402
+from frames import build_sleep_frame  # noqa: E402
+from ingest_fitbit_data import setup_fitbit_tables  # noqa: E402
+from sleep_storage import (  # noqa: E402
+    SLEEP_RUNS_TABLE,
+    decode_sleep_runs,
+    encode_sleep_runs,
+    export_sleep_runs_parquet,
+    load_sleep_runs,
+    sleep_memory_report,
+)
+
+DAYS = ["2024-02-02", "2024-02-01", "2024-01-31"]
+
+
+@pytest.fixture
+def sleep_df():
+    return build_sleep_frame([sleep_payload(day, minutes=6) for day in DAYS])
+
+
+@pytest.fixture
+def db_manager(db_manager):
+    setup_fitbit_tables(db_manager)
+    return db_manager
+
+
+def sorted_minutes(df):
+    return df.sort_values("Time").reset_index(drop=True)
+
+
+def test_runs_round_trip(sleep_df):
+    runs = encode_sleep_runs(sleep_df)
+    # states 1, 2, 1, 1, 1, 1 are three runs per night
+    assert len(runs) == 9
+    assert runs["minutes"].sum() == len(sleep_df)
+    pd.testing.assert_frame_equal(decode_sleep_runs(runs), sorted_minutes(sleep_df))
+
+
+def test_missing_minutes_start_a_new_run(sleep_df):
+    runs = encode_sleep_runs(sleep_df.drop(index=[3]))
+    assert len(runs) == 10
+    pd.testing.assert_frame_equal(
+        decode_sleep_runs(runs), sorted_minutes(sleep_df.drop(index=[3]))
+    )
+
+
+def test_empty_runs_round_trip(sleep_df):
+    runs = encode_sleep_runs(sleep_df.iloc[:0])
+    assert runs.empty
+    assert decode_sleep_runs(runs).empty
+
+
+def test_load_runs_from_duckdb(db_manager, sleep_df):
+    runs = encode_sleep_runs(sleep_df)
+    assert db_manager.append_to_table(runs, SLEEP_RUNS_TABLE)
+
+    loaded = load_sleep_runs(db_manager, start_date="2024-02-01")
+    assert isinstance(loaded["minutes"].dtype, pd.ArrowDtype)
+    assert loaded["Date"].astype(str).unique().tolist() == ["2024-02-01", "2024-02-02"]
+    assert loaded["minutes"].sum() == 12
+
+
+def test_export_parquet_by_month(db_manager, sleep_df, tmp_path):
+    db_manager.append_to_table(encode_sleep_runs(sleep_df), SLEEP_RUNS_TABLE)
+    export_sleep_runs_parquet(db_manager, str(tmp_path / "sleep"))
+    assert sorted(os.listdir(tmp_path / "sleep")) == ["month=2024-01", "month=2024-02"]
+
+
+def test_memory_report_shows_runs_are_smaller(sleep_df):
+    legacy = sleep_df.astype({"State": str, "Time": str, "Date": str, "State_Detail": str})
+    report = sleep_memory_report(
+        {"legacy": legacy, "compact": sleep_df, "runs": encode_sleep_runs(sleep_df)}
+    )
+    assert report.loc["compact", "bytes"] < report.loc["legacy", "bytes"]
+    assert report.loc["runs", "bytes"] < report.loc["compact", "bytes"]
+    assert report.loc["runs", "rows"] == 9
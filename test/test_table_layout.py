@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from modules.maintenance import MaintenanceSchedule, get_background_maintenance
+
+LIFT_COLUMNS = ["Day", "Exercise", "Weight", "Reps", "Sets", "Notes", "User"]
+
+
+def lifts(rows):
+    return pd.DataFrame(rows, columns=LIFT_COLUMNS)
+
+
+UNSORTED = lifts(
+    [
+        ["2024-01-03", "SQUAT", 100.0, 5, 3, "", "JM"],
+        ["2024-01-01", "BENCH PRESS", 60.0, 5, 3, "", "JM"],
+        ["2024-01-02", "SQUAT", 80.0, 5, 3, "", "AB"],
+        ["2024-01-01", "SQUAT", 95.0, 5, 3, "", "JM"],
+    ]
+)
+SORTED_KEYS = [
+    ("AB", "SQUAT", "2024-01-02"),
+    ("JM", "BENCH PRESS", "2024-01-01"),
+    ("JM", "SQUAT", "2024-01-01"),
+    ("JM", "SQUAT", "2024-01-03"),
+]
+
+
+@pytest.fixture
+def schedule(monkeypatch):
+    schedule = MaintenanceSchedule(compact_after_rows=3, checkpoint_after_writes=2)
+    monkeypatch.setattr("modules.duckdb.get_maintenance_schedule", lambda: schedule)
+    return schedule
+
+
+def storage_order(db_manager):
+    # rowid follows physical order
+    df = db_manager.get_data(
+        query="SELECT User, Exercise, strftime(Day, '%Y-%m-%d') AS Day "
+        "FROM historic_exercises ORDER BY rowid"
+    )
+    return list(df.itertuples(index=False, name=None))
+
+
+def index_names(db_manager):
+    df = db_manager.get_data(
+        query="SELECT index_name FROM duckdb_indexes() WHERE table_name = ?",
+        params=["historic_exercises"],
+    )
+    return list(df["index_name"])
+
+
+def test_setup_table_writes_sort_order(db_manager):
+    db_manager.setup_table("historic_exercises", UNSORTED)
+    assert storage_order(db_manager) == SORTED_KEYS
+
+
+def test_compact_table_sorts_and_keeps_indexes(db_manager):
+    db_manager.setup_table("historic_exercises", UNSORTED.iloc[:1])
+    db_manager.append_to_table(UNSORTED.iloc[1:], "historic_exercises")
+    assert db_manager.create_indexes("historic_exercises") == [
+        "historic_exercises_lookup"
+    ]
+
+    timings = db_manager.compact_table("historic_exercises")
+
+    assert set(timings) == {"rewrite", "analyze", "checkpoint", "total"}
+    assert storage_order(db_manager) == SORTED_KEYS
+    assert index_names(db_manager) == ["historic_exercises_lookup"]
+
+
+def test_setup_table_keeps_indexes(db_manager):
+    db_manager.setup_table("historic_exercises", UNSORTED)
+    db_manager.create_indexes("historic_exercises")
+    db_manager.setup_table("historic_exercises", UNSORTED)
+    assert index_names(db_manager) == ["historic_exercises_lookup"]
+    assert db_manager.drop_indexes("historic_exercises") == [
+        "historic_exercises_lookup"
+    ]
+    assert index_names(db_manager) == []
+
+
+def test_appends_trigger_compaction(db_manager, schedule):
+    db_manager.setup_table("historic_exercises", UNSORTED.iloc[:1])
+    db_manager.append_to_table(UNSORTED.iloc[1:2], "historic_exercises")
+    assert storage_order(db_manager)[0] == ("JM", "SQUAT", "2024-01-03")
+
+    db_manager.append_to_table(UNSORTED.iloc[2:], "historic_exercises")
+    # maintenance runs off the write path
+    get_background_maintenance().wait()
+    assert storage_order(db_manager) == SORTED_KEYS
+    assert not schedule.needs_check(db_manager.db_path, "historic_exercises")
+
+
+def test_appends_during_compaction_are_kept(db_manager, monkeypatch):
+    db_manager.setup_table("historic_exercises", UNSORTED)
+    rewriting = threading.Event()
+    index_definitions = db_manager._index_definitions
+
+    # hold the rewrite open once its transaction has started
+    def slow_index_definitions(con, table_name):
+        indexes = index_definitions(con, table_name)
+        rewriting.set()
+        time.sleep(0.5)
+        return indexes
+
+    monkeypatch.setattr(db_manager, "_index_definitions", slow_index_definitions)
+    compaction = threading.Thread(
+        target=db_manager.compact_table, args=("historic_exercises",)
+    )
+    compaction.start()
+    rewriting.wait()
+    assert db_manager.append_to_table(UNSORTED.iloc[:1], "historic_exercises")
+    compaction.join()
+
+    assert len(db_manager.get_data(table_name="historic_exercises")) == 5
+
+
+def test_schedule_checkpoints_after_writes():
+    now = [0.0]
+    schedule = MaintenanceSchedule(
+        compact_after_rows=100,
+        checkpoint_after_writes=3,
+        checkpoint_interval=60,
+        clock=lambda: now[0],
+    )
+    schedule.record_write("db", "t", 1)
+    assert schedule.due("db", "t", 1000) == []
+    now[0] = 61
+    assert schedule.due("db", "t", 1000) == ["checkpoint"]
+
+    schedule.done("db", "t", "checkpoint")
+    schedule.record_write("db", "t", 1)
+    schedule.record_write("db", "t", 1)
+    schedule.record_write("db", "t", 1)
+    assert schedule.due("db", "t", 1000) == ["checkpoint"]
+    schedule.record_write("db", "t", 200)
+    assert schedule.due("db", "t", 1000) == ["compact"]
+    # a large table needs a larger share of unsorted rows
+    assert schedule.due("db", "t", 100_000) == ["checkpoint"]
@@ -1,22 +1,26 @@
 from modules.duckdb import DuckDBManager
+from modules.schema import TABLE_SCHEMAS, cast_columns, column_definitions
 
-
+# Cast existing tables to the declared schema in modules.schema. New rows are
+# typed at ingest, this is only needed for tables written before that.
 db_manager = DuckDBManager()
 
-table_name = "historic_exercises"
+for table_name, schema in TABLE_SCHEMAS.items():
+    columns = db_manager.get_data(
+        query="SELECT column_name FROM duckdb_columns() WHERE table_name = ?",
+        params=[table_name],
+    )["column_name"].tolist()
+    if not columns:
+        continue
 
-query = f"""
-    CREATE OR REPLACE TABLE {table_name} AS
-    SELECT
-        CAST("Day" AS DATE) AS "Day",
-        CAST("Exercise" AS VARCHAR) AS "Exercise",
-        CAST("Weight" AS DECIMAL) AS "Weight",
-        CAST("Reps" AS INTEGER) AS "Reps",
-        CAST("Sets" AS INTEGER) AS "Sets",
-        CAST("Notes" AS VARCHAR) AS "Notes",
-        CAST("User" AS VARCHAR) AS "User"
-    FROM {table_name}
-"""
+    # execute_query
+    db_manager.execute_query(
+        query=f"""
+        CREATE OR REPLACE TABLE {table_name}_typed ({column_definitions(schema)});
+        INSERT INTO {table_name}_typed SELECT {cast_columns(schema, columns)} FROM {table_name};
+        DROP TABLE {table_name};
+        ALTER TABLE {table_name}_typed RENAME TO {table_name};
+        """
+    )
 
-# execute_query
-db_manager.execute_query(query=query)
+db_manager.rebuild_personal_bests()